@@ -0,0 +1,95 @@
+// Shared service-area map shell. Each page ships a static SVG map and a small JSON payload:
+// <div data-service-area="/assets/data/service-areas/miami-<hash>.json"><svg>...</svg></div>
+// Leaflet, tiles and the payload are only fetched once the visitor interacts with the map.
+(function () {
+    'use strict';
+
+    var LEAFLET_VERSION = '1.9.4';
+    var LEAFLET_BASE = 'https://unpkg.com/leaflet@' + LEAFLET_VERSION + '/dist/';
+    var METERS_PER_MILE = 1609.34;
+    var leafletReady = null;
+
+    function loadLeaflet() {
+        if (window.L) {
+            return Promise.resolve(window.L);
+        }
+        if (!leafletReady) {
+            leafletReady = new Promise(function (resolve, reject) {
+                var css = document.createElement('link');
+                css.rel = 'stylesheet';
+                css.href = LEAFLET_BASE + 'leaflet.css';
+                document.head.appendChild(css);
+
+                var script = document.createElement('script');
+                script.src = LEAFLET_BASE + 'leaflet.js';
+                script.async = true;
+                script.onload = function () { resolve(window.L); };
+                script.onerror = function (error) {
+                    leafletReady = null;
+                    reject(error);
+                };
+                document.head.appendChild(script);
+            });
+        }
+        return leafletReady;
+    }
+
+    function renderMap(element, area, L) {
+        // Replace the static SVG placeholder
+        element.innerHTML = '';
+        var map = L.map(element).setView(area.center, area.zoom || 10);
+        L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
+            attribution: '&copy; OpenStreetMap contributors',
+            maxZoom: 18
+        }).addTo(map);
+
+        L.marker(area.center)
+            .bindPopup('<b>' + area.name + '</b><br>Main Office')
+            .addTo(map);
+
+        L.circle(area.center, {
+            radius: area.radius_miles * METERS_PER_MILE,
+            color: 'blue',
+            fill: true
+        }).bindPopup('Service Area').addTo(map);
+
+        area.markers.forEach(function (marker) {
+            L.marker([marker.lat, marker.lon])
+                .bindPopup('<b>' + marker.name + '</b><br>' + marker.distance + ' miles from ' + area.name)
+                .addTo(map);
+        });
+    }
+
+    function loadMap(element) {
+        if (element.dataset.mapLoaded) {
+            return;
+        }
+        element.dataset.mapLoaded = 'true';
+
+        Promise.all([
+            fetch(element.dataset.serviceArea).then(function (response) { return response.json(); }),
+            loadLeaflet()
+        ]).then(function (results) {
+            renderMap(element, results[0], results[1]);
+        }).catch(function () {
+            delete element.dataset.mapLoaded;
+        });
+    }
+
+    function init() {
+        document.querySelectorAll('[data-service-area]').forEach(function (element) {
+            var load = function () { loadMap(element); };
+            var button = element.querySelector('[data-service-area-load]');
+            (button || element).addEventListener('click', load);
+            // Start fetching as soon as the visitor shows intent
+            element.addEventListener('pointerenter', loadLeaflet, { once: true });
+            element.addEventListener('touchstart', loadLeaflet, { once: true, passive: true });
+        });
+    }
+
+    if (document.readyState === 'loading') {
+        document.addEventListener('DOMContentLoaded', init);
+    } else {
+        init();
+    }
+})();
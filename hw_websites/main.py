@@ -1,43 +1,54 @@
 import os
 from dotenv import load_dotenv
-from hw_websites.server.generate_pages import EnhancedPageGenerator
-from hw_websites.server.server import app
+from hw_websites.server.build_executor import BuildExecutor
+from hw_websites.server.build_manifest import BuildManifest
+from hw_websites.server.generate_pages import (
+    EnhancedPageGenerator,
+    enhanced_page_fingerprint,
+    enhanced_page_output,
+    generate_enhanced_page_job,
+    init_page_generator
+)
+from hw_websites.server.utils.content_checker import LANGUAGETOOL_SERVERS_ENV
+from hw_websites.server.utils.image_pipeline import OPTIMIZED_DIRNAME, ImagePipeline, variant_urls
+from hw_websites.server.utils.performance_monitor import PerformanceMonitor
+from hw_websites.server.utils.quality_scorer import CorpusQualityScorer
+from hw_websites.server.utils.review_generator import ReviewGenerator
 
-def main():
-    # Load environment variables
-    load_dotenv()
-
-    # Initialize the page generator
-    generator = EnhancedPageGenerator()
-
-    # Define site data
-    sites_data = {
-        'hwroads.com': {
-            'cities': ['Miami', 'Fort Lauderdale', 'West Palm Beach'],
-            'company_name': 'HW Roads',
-            'service_type': 'road construction',
-            'industry_terms': [
-                'road construction',
-                'highway development',
-                'infrastructure projects'
-            ]
-        },
-        'hwasphaltfl.com': {
-            'cities': ['Orlando', 'Tampa', 'Jacksonville'],
-            'company_name': 'HW Asphalt FL',
-            'service_type': 'asphalt paving',
-            'industry_terms': [
-                'asphalt paving',
-                'parking lot construction',
-                'driveway installation'
-            ]
-        }
+# Define site data
+SITES_DATA = {
+    'hwroads.com': {
+        'cities': ['Miami', 'Fort Lauderdale', 'West Palm Beach'],
+        'company_name': 'HW Roads',
+        'service_type': 'road construction',
+        'industry_terms': [
+            'road construction',
+            'highway development',
+            'infrastructure projects'
+        ]
+    },
+    'hwasphaltfl.com': {
+        'cities': ['Orlando', 'Tampa', 'Jacksonville'],
+        'company_name': 'HW Asphalt FL',
+        'service_type': 'asphalt paving',
+        'industry_terms': [
+            'asphalt paving',
+            'parking lot construction',
+            'driveway installation'
+        ]
     }
+}
 
-    # Generate sites
+# Root directory of the generated sites; the deployer points it at its build directory
+OUTPUT_ROOT = os.getenv('OUTPUT_ROOT', 'output')
+
+def build_page_jobs(sites_data, output_root=OUTPUT_ROOT):
+    """Turn the site x city matrix into independent page jobs"""
+    page_jobs = []
     for site_name, data in sites_data.items():
         for city in data['cities']:
-            page_data = {
+            page_jobs.append({
+                'site_name': site_name,
                 'company_name': data['company_name'],
                 'location': city,
                 'service_type': data['service_type'],
@@ -47,7 +58,8 @@ def main():
                     f'assets/images/{site_name}/project2.jpg',
                     f'assets/images/{site_name}/project3.jpg'
                 ],
-                'output_dir': f'output/{site_name}/{city.lower()}',
+                'site_dir': os.path.join(output_root, site_name),
+                'output_dir': os.path.join(output_root, site_name, city.lower()),
                 'url': f'https://{site_name}',
                 'content': f'Content for {data["company_name"]} in {city}',
                 'service': {
@@ -59,22 +71,107 @@ def main():
                         'Municipal Projects'
                     ]
                 }
-            }
+            })
+    return page_jobs
+
+def main():
+    # Load environment variables
+    load_dotenv()
+
+    generator = EnhancedPageGenerator()
+    if os.getenv('STARTUP_REPORT') == '1':
+        # Report what every component costs to import and initialize
+        print(generator.startup_report(load_all=True))
+        return
+
+    page_jobs = build_page_jobs(SITES_DATA)
+
+    # Incremental mode only re-renders pages whose inputs changed since the last build
+    manifest = None
+    if os.getenv('INCREMENTAL_BUILD') == '1':
+        manifest = BuildManifest.for_output_root(OUTPUT_ROOT)
+    # The review store version changes whenever reviews are added
+    reviews = ReviewGenerator().store.version
+
+    # Fingerprint the page inputs before meta descriptions and image variants are derived from them
+    digests = {}
+    stale_jobs = []
+    for data in page_jobs:
+        output_path = enhanced_page_output(data)
+        digests[output_path] = enhanced_page_fingerprint(data, reviews)
+        if manifest is None or not manifest.is_current(output_path, digests[output_path]):
+            stale_jobs.append(data)
+
+    # Summarize the meta descriptions of the pages to rebuild in batches before fanning out
+    generator.prepare_meta_descriptions(stale_jobs, batch_size=int(os.getenv('SUMMARY_BATCH_SIZE', 8)))
+    if generator.seo_generator.cache is not None:
+        print(f"Inference cache: {generator.seo_generator.cache.stats()}")
+
+    # Optimize every unique image across all sites once, in parallel, before the pages are built;
+    # variants are written into each site's assets/images/optimized/ directory
+    image_sites = {image: data['site_dir'] for data in stale_jobs for image in data['images']}
+    images = ImagePipeline(workers=int(os.getenv('IMAGE_WORKERS', os.cpu_count() or 1))).run(
+        ImagePipeline.collect(stale_jobs),
+        output_dir_of=lambda image: os.path.join(image_sites[image], 'assets', 'images', OPTIMIZED_DIRNAME)
+    )
+    print(images.summary())
+    # Pages link to the variants by their site-relative URLs, never by build machine paths
+    for data in stale_jobs:
+        data['optimized_images'] = {
+            image: variant_urls(images.variants.get(image, {}))
+            for image in data['images']
+        }
+
+    # Start one small pool of LanguageTool servers for the whole build; every worker connects to it
+    # instead of starting its own JVMs, so a build runs pool_size servers however many workers it has
+    grammar_pool = None
+    if stale_jobs:
+        grammar_pool = generator.content_checker.preload()
+        os.environ[LANGUAGETOOL_SERVERS_ENV] = ','.join(grammar_pool.urls())
+
+    # Generate sites on a pool of build workers, each with its own page generator
+    # (template is None for now; you'll need to create a Jinja2 template)
+    executor = BuildExecutor(workers=int(os.getenv('BUILD_WORKERS', os.cpu_count() or 1)))
+
+    report = executor.run(
+        page_jobs,
+        generate_enhanced_page_job,
+        initializer=init_page_generator,
+        group_key=lambda data: data['site_name'],
+        manifest=manifest,
+        output_of=enhanced_page_output,
+        digest_of=lambda data: digests[enhanced_page_output(data)]
+    )
+    if grammar_pool is not None:
+        grammar_pool.close()
+
+    # Probe every generated site in one concurrent batch once pages are built
+    metrics = PerformanceMonitor().measure_pages(data['url'] for data in page_jobs)
+
+    # Log results
+    for data, result in zip(page_jobs, report.results):
+        if result is None:
+            continue
+        print(f"Generated {data['site_name']} for {data['location']}")
+        print(f"Performance metrics: {metrics[data['url']]}")
+        print(f"Quality metrics: {result['quality']}")
 
-            # Generate enhanced page
-            result = generator.generate_enhanced_page(
-                template=None,  # You'll need to create a Jinja2 template
-                data=page_data
-            )
+    # Score the readability of every built page, including skipped ones, for tracking between builds
+    pages = {}
+    for data in page_jobs:
+        output_path = enhanced_page_output(data)
+        if os.path.exists(output_path):
+            with open(output_path, 'r', encoding='utf-8') as f:
+                pages[output_path] = f.read()
+    if pages:
+        CorpusQualityScorer().score_to_csv(pages, os.path.join(OUTPUT_ROOT, 'quality-report.csv'))
 
-            # Log results
-            print(f"Generated {site_name} for {city}")
-            print(f"Performance metrics: {result['metrics']}")
-            print(f"Quality metrics: {result['quality']}")
+    print(report.summary())
 
 if __name__ == "__main__":
     # Run the Flask app in a separate thread
     from threading import Thread
+    from hw_websites.server.server import app
     server = Thread(target=app.run)
     server.start()
 
@@ -0,0 +1,186 @@
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+from hw_websites.server.build_manifest import BuildManifest
+from hw_websites.server.generate_pages import page_fingerprint, plan_site, render_page
+from hw_websites.server.utils.content_linker import BlogLinkingSession
+from hw_websites.server.utils.link_index import DEFAULT_INDEX_PATH
+
+@dataclass
+class BuildReport:
+    total: int = 0
+    completed: int = 0
+    skipped: int = 0
+    deleted: List[str] = field(default_factory=list)
+    elapsed: float = 0.0
+    workers: int = 1
+    results: List[Any] = field(default_factory=list)
+    errors: Dict[int, str] = field(default_factory=dict)
+    groups: Counter = field(default_factory=Counter)
+
+    @property
+    def failed(self) -> int:
+        return len(self.errors)
+
+    def summary(self) -> str:
+        """Format a combined summary of the build"""
+        lines = [
+            f"Built {self.completed}/{self.total} pages in {self.elapsed:.2f}s "
+            f"on {self.workers} worker(s), {self.failed} failed"
+        ]
+        if self.skipped or self.deleted:
+            lines.append(
+                f"Incremental: {self.completed} rebuilt, {self.skipped} skipped, "
+                f"{len(self.deleted)} deleted"
+            )
+        for group, count in sorted(self.groups.items()):
+            lines.append(f"  {group}: {count} pages")
+        for index, error in sorted(self.errors.items()):
+            lines.append(f"  job {index} failed: {error}")
+        return '\n'.join(lines)
+
+def _run_chunk(func, chunk):
+    """Run a chunk of jobs in a worker process"""
+    outcomes = []
+    for index, job in chunk:
+        try:
+            outcomes.append((index, func(job), None))
+        except Exception as e:
+            outcomes.append((index, None, f"{type(e).__name__}: {e}"))
+    return outcomes
+
+def _failed_chunk(chunk, error):
+    return [(index, None, error) for index, _ in chunk]
+
+def _site_of(job):
+    return getattr(job, 'site_name', None)
+
+def _filepath_of(job):
+    return job.filepath
+
+class BuildExecutor:
+    def __init__(self, workers: Optional[int] = None, chunksize: int = 8, progress: bool = True):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.chunksize = max(1, chunksize)
+        self.progress = progress
+
+    def run(
+        self,
+        jobs: List[Any],
+        func: Callable = render_page,
+        initializer: Optional[Callable] = None,
+        group_key: Callable = _site_of,
+        manifest: Optional[BuildManifest] = None,
+        output_of: Callable = _filepath_of,
+        digest_of: Callable = page_fingerprint
+    ) -> BuildReport:
+        """Run independent jobs on a process pool and collect results in job order
+
+        With a manifest, jobs whose output was already built from the same
+        inputs are skipped and outputs no longer in the build are deleted.
+        """
+        start_time = time.time()
+        report = BuildReport(total=len(jobs), workers=self.workers)
+        results = [None] * len(jobs)
+
+        indexed = list(enumerate(jobs))
+        digests = {}
+        if manifest is not None:
+            pending = []
+            for index, job in indexed:
+                digest = digest_of(job)
+                if manifest.is_current(output_of(job), digest):
+                    report.skipped += 1
+                else:
+                    digests[index] = digest
+                    pending.append((index, job))
+            indexed = pending
+        chunks = [
+            indexed[i:i + self.chunksize]
+            for i in range(0, len(indexed), self.chunksize)
+        ]
+
+        if self.workers == 1:
+            try:
+                if initializer is not None:
+                    initializer()
+            except Exception as e:
+                # Without an initialized worker every page fails the same way
+                error = f"worker initialization failed: {type(e).__name__}: {e}"
+                for chunk in chunks:
+                    self._collect(report, results, jobs, group_key, _failed_chunk(chunk, error))
+            else:
+                for chunk in chunks:
+                    self._collect(report, results, jobs, group_key, _run_chunk(func, chunk))
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=initializer) as pool:
+                futures = {pool.submit(_run_chunk, func, chunk): chunk for chunk in chunks}
+                for future in as_completed(futures):
+                    try:
+                        outcomes = future.result()
+                    except BrokenProcessPool as e:
+                        # A worker died, e.g. its initializer raised; report its pages instead of aborting
+                        outcomes = _failed_chunk(futures[future], f"worker process failed: {e}")
+                    self._collect(report, results, jobs, group_key, outcomes)
+
+        if manifest is not None:
+            for index, digest in digests.items():
+                if index not in report.errors:
+                    manifest.record(output_of(jobs[index]), digest)
+            report.deleted = manifest.prune()
+            manifest.save()
+
+        report.results = results
+        report.elapsed = time.time() - start_time
+        return report
+
+    def _collect(self, report, results, jobs, group_key, outcomes):
+        """Record finished jobs and print progress"""
+        for index, result, error in outcomes:
+            if error is None:
+                results[index] = result
+                report.completed += 1
+                report.groups[group_key(jobs[index])] += 1
+            else:
+                report.errors[index] = error
+
+        if self.progress:
+            done = report.skipped + report.completed + report.failed
+            print(f"[{done}/{report.total}] pages built")
+
+def plan_build(
+    sites: Dict[str, List[str]],
+    output_root: str = 'output',
+    link_index_path: Optional[str] = None
+) -> List:
+    """Turn the site x city matrix into independent page jobs"""
+    jobs = []
+    for site_name, cities in sites.items():
+        # Blog linking does not depend on the city, so it is shared per site;
+        # each site keeps its own index since syncing drops pages missing from its corpus
+        site_index_path = os.path.join(link_index_path, site_name) if link_index_path else None
+        linking_session = BlogLinkingSession(index_path=site_index_path)
+        # Synced here so workers share the saved index read-only instead of racing to update it
+        linking_session.sync_index()
+        for city_name in cities:
+            site_path = os.path.join(output_root, site_name, city_name.lower())
+            jobs.extend(plan_site(site_name, city_name, site_path, linking_session))
+    return jobs
+
+def build_sites(
+    sites: Dict[str, List[str]],
+    output_root: str = 'output',
+    workers: Optional[int] = None,
+    incremental: bool = False
+) -> BuildReport:
+    """Build every site and city in parallel"""
+    # Incremental builds also keep the link index and only re-index changed posts
+    jobs = plan_build(sites, output_root, DEFAULT_INDEX_PATH if incremental else None)
+    manifest = BuildManifest.for_output_root(output_root) if incremental else None
+    report = BuildExecutor(workers=workers).run(jobs, manifest=manifest)
+    print(report.summary())
+    return report
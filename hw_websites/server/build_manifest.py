@@ -0,0 +1,53 @@
+import hashlib
+import json
+import os
+from typing import Dict, List
+
+MANIFEST_FILENAME = '.build-manifest.json'
+
+def fingerprint(*inputs) -> str:
+    """Hash the inputs a page is rendered from"""
+    payload = json.dumps(inputs, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class BuildManifest:
+    """Input hashes of every output page from the last build"""
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, str] = {}
+        self._seen = set()
+
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    @classmethod
+    def for_output_root(cls, output_root: str) -> 'BuildManifest':
+        return cls(os.path.join(output_root, MANIFEST_FILENAME))
+
+    def is_current(self, output_path: str, digest: str) -> bool:
+        """Check whether an output page was already built from the same inputs"""
+        self._seen.add(output_path)
+        return self.entries.get(output_path) == digest and os.path.exists(output_path)
+
+    def record(self, output_path: str, digest: str):
+        self._seen.add(output_path)
+        self.entries[output_path] = digest
+
+    def prune(self) -> List[str]:
+        """Delete output pages that are no longer part of the build"""
+        deleted = []
+        for output_path in sorted(set(self.entries) - self._seen):
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            del self.entries[output_path]
+            deleted.append(output_path)
+        return deleted
+
+    def save(self):
+        """Write the manifest atomically"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
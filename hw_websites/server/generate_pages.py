@@ -1,40 +1,47 @@
+import importlib.util
 import os
-from hw_websites.server.utils.content_linker import ContentLinker
-from hw_websites.server.utils.seo_content_generator import SEOContentGenerator
-from hw_websites.server.utils.image_optimizer import ImageOptimizer
-from hw_websites.server.utils.schema_generator import SchemaGenerator
-from hw_websites.server.utils.performance_monitor import PerformanceMonitor
-from hw_websites.server.utils.content_checker import ContentQualityChecker
-from hw_websites.server.utils.location_manager import LocationManager
-from hw_websites.server.utils.review_generator import ReviewGenerator
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+from typing import List, Optional
+from hw_websites.server.build_manifest import fingerprint
+from hw_websites.server.utils.content_linker import BlogLinkingSession, generate_blog_content
+from hw_websites.server.utils.gazetteer import DEFAULT_GAZETTEER_PATH
+from hw_websites.server.utils.lazy_loader import LazyComponent, startup_timer
+from hw_websites.server.utils.stage_graph import StageGraph
 
 def create_directory(path):
     os.makedirs(path, exist_ok=True)
 
-def generate_html_file(filepath, title, site_name, city_name, content=None):
-    if content is None:
-        content = f"<h1>{title}</h1>"
-
-    # Define site-specific styles
-    if site_name == 'hwroads.com':
-        header_class = "bg-blue-800 text-white"
-        nav_class = "bg-blue-700 text-white"
-        button_class = "bg-blue-600 text-white"
-        footer_class = "bg-blue-800 text-white"
-        stylesheet = "https://cdn.jsdelivr.net/npm/tailwindcss@2.2.19/dist/tailwind.min.css"
-    elif site_name == 'hwasphaltfl.com':
-        header_class = "bg-gray-800 text-white"
-        nav_class = "bg-gray-700 text-white"
-        button_class = "bg-yellow-500 text-gray-900"
-        footer_class = "bg-gray-800 text-white"
-        stylesheet = "https://cdn.jsdelivr.net/npm/tailwindcss@2.2.19/dist/tailwind.min.css"
-    else:
-        # Default styles
-        header_class = "bg-blue-800 text-white"
-        nav_class = "bg-blue-700 text-white"
-        button_class = "bg-blue-600 text-white"
-        footer_class = "bg-blue-800 text-white"
-        stylesheet = "https://cdn.jsdelivr.net/npm/tailwindcss@2.2.19/dist/tailwind.min.css"
+SITE_STYLES = {
+    'hwroads.com': {
+        'header_class': "bg-blue-800 text-white",
+        'nav_class': "bg-blue-700 text-white",
+        'button_class': "bg-blue-600 text-white",
+        'footer_class': "bg-blue-800 text-white",
+        'stylesheet': "https://cdn.jsdelivr.net/npm/tailwindcss@2.2.19/dist/tailwind.min.css"
+    },
+    'hwasphaltfl.com': {
+        'header_class': "bg-gray-800 text-white",
+        'nav_class': "bg-gray-700 text-white",
+        'button_class': "bg-yellow-500 text-gray-900",
+        'footer_class': "bg-gray-800 text-white",
+        'stylesheet': "https://cdn.jsdelivr.net/npm/tailwindcss@2.2.19/dist/tailwind.min.css"
+    }
+}
+
+# Default styles
+DEFAULT_SITE_STYLE = SITE_STYLES['hwroads.com']
+
+def _render_page_source(site_name, city_name, content):
+    """Render the full page markup for a site"""
+    style = SITE_STYLES.get(site_name, DEFAULT_SITE_STYLE)
+    header_class = style['header_class']
+    nav_class = style['nav_class']
+    button_class = style['button_class']
+    footer_class = style['footer_class']
+    stylesheet = style['stylesheet']
 
     # Define structured data
     structured_data = f"""
@@ -81,8 +88,7 @@ def generate_html_file(filepath, title, site_name, city_name, content=None):
     </script>
     """
 
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(f"""<!DOCTYPE html>
+    return f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -164,27 +170,87 @@ def generate_html_file(filepath, title, site_name, city_name, content=None):
     <!-- Swiper JS -->
     <script src="https://cdn.jsdelivr.net/npm/swiper@8/swiper-bundle.min.js"></script>
     <script>
-        new Swiper('.swiper-container', {
+        new Swiper('.swiper-container', {{
             loop: true,
-            pagination: {
+            pagination: {{
                 el: '.swiper-pagination',
-            },
-            navigation: {
+            }},
+            navigation: {{
                 nextEl: '.swiper-button-next',
                 prevEl: '.swiper-button-prev',
-            },
-            autoplay: {
+            }},
+            autoplay: {{
                 delay: 5000,
-            },
-        });
+            }},
+        }});
     </script>
     <script src="/assets/js/scripts.js"></script>
 </body>
-</html>""")
+</html>"""
+
+class SiteLayout:
+    """Page layout for one site, compiled once into static chunks and page slots"""
+    CITY_SLOT = '\x00city\x00'
+    CONTENT_SLOT = '\x00content\x00'
+    _SLOT_PATTERN = re.compile(r'\x00(city|content)\x00')
+
+    def __init__(self, site_name):
+        self.site_name = site_name
+
+        # Render the layout once with slot markers and split it around them
+        source = _render_page_source(site_name, self.CITY_SLOT, self.CONTENT_SLOT)
+        parts = self._SLOT_PATTERN.split(source)
+        self.chunks = parts[0::2]
+        self.slots = parts[1::2]
+        self.fingerprint = fingerprint(self.chunks, self.slots)
+
+    def render(self, city_name, content):
+        """Splice the page slots into the static layout chunks"""
+        values = {'city': city_name, 'content': content}
+        parts = [self.chunks[0]]
+        for slot, chunk in zip(self.slots, self.chunks[1:]):
+            parts.append(values[slot])
+            parts.append(chunk)
+        return ''.join(parts)
+
+@lru_cache(maxsize=None)
+def get_site_layout(site_name):
+    """Get the compiled layout for a site"""
+    return SiteLayout(site_name)
+
+def generate_html_file(filepath, title, site_name, city_name, content=None):
+    if content is None:
+        content = f"<h1>{title}</h1>"
 
-def generate_site(site_name, city_name):
-    site_path = site_name
+    layout = get_site_layout(site_name)
+    with open(filepath, 'w', encoding='utf-8') as f:
+        f.write(layout.render(city_name, content))
+
+@dataclass(frozen=True)
+class PageJob:
+    """A single page to render, independent of every other page in the build"""
+    filepath: str
+    title: str
+    site_name: str
+    city_name: str
+    content: Optional[str] = None
+
+def render_page(job: PageJob) -> str:
+    """Render a page job to disk"""
+    generate_html_file(job.filepath, job.title, job.site_name, job.city_name, job.content)
+    return job.filepath
+
+def page_fingerprint(job: PageJob) -> str:
+    """Hash every input a page job is rendered from"""
+    layout = get_site_layout(job.site_name)
+    return fingerprint(layout.fingerprint, job.title, job.city_name, job.content)
+
+def plan_site(site_name, city_name, site_path=None, linking_session=None) -> List[PageJob]:
+    """Create the directory structure for a site and list its page jobs"""
+    if site_path is None:
+        site_path = site_name
     create_directory(site_path)
+    jobs = []
 
     # Create blog posts with research content and internal linking
     blog_path = os.path.join(site_path, 'blog')
@@ -199,18 +265,22 @@ def generate_site(site_name, city_name):
         "Top 5 Road Construction Services in South East Florida"
     ]
 
+    # Index and link the blog corpus once for the whole site
+    if linking_session is None:
+        linking_session = BlogLinkingSession()
+
     for i, title in enumerate(blog_titles, 1):
         filename = f'post{i}.html'
         filepath = os.path.join(blog_path, filename)
-        content = generate_blog_content(title)  # This now includes internal linking
-        generate_html_file(filepath, title, site_name, city_name, content)
+        content = generate_blog_content(title, linking_session)  # This now includes internal linking
+        jobs.append(PageJob(filepath, title, site_name, city_name, content))
 
     # Create main pages
     main_pages = ['index.html', 'about.html', 'contact.html']
     for page in main_pages:
         title = page.replace('.html', '').capitalize()
         filepath = os.path.join(site_path, page)
-        generate_html_file(filepath, f"{site_name} - {title}", site_name, city_name)
+        jobs.append(PageJob(filepath, f"{site_name} - {title}", site_name, city_name))
 
     # Create services pages
     services_path = os.path.join(site_path, 'services')
@@ -219,7 +289,7 @@ def generate_site(site_name, city_name):
         filename = f'service{i}.html'
         title = f"Service {i}"
         filepath = os.path.join(services_path, filename)
-        generate_html_file(filepath, f"{site_name} - {title}", site_name, city_name)
+        jobs.append(PageJob(filepath, f"{site_name} - {title}", site_name, city_name))
 
     # Create additional pages
     additional_path = os.path.join(site_path, 'pages')
@@ -228,7 +298,7 @@ def generate_site(site_name, city_name):
         filename = f'page{i}.html'
         title = f"Page {i}"
         filepath = os.path.join(additional_path, filename)
-        generate_html_file(filepath, f"{site_name} - {title}", site_name, city_name)
+        jobs.append(PageJob(filepath, f"{site_name} - {title}", site_name, city_name))
 
     # Create assets directories
     assets_css = os.path.join(site_path, 'assets', 'css')
@@ -242,90 +312,223 @@ def generate_site(site_name, city_name):
     forms_path = os.path.join(site_path, 'forms')
     create_directory(forms_path)
     lead_capture_path = os.path.join(forms_path, 'lead-capture.html')
-    generate_html_file(lead_capture_path, "Lead Capture", site_name, city_name)
+    jobs.append(PageJob(lead_capture_path, "Lead Capture", site_name, city_name))
+
+    return jobs
+
+def generate_site(site_name, city_name, site_path=None):
+    for job in plan_site(site_name, city_name, site_path):
+        render_page(job)
 
     print(f"Generated file structure for {site_name}")
 
 class EnhancedPageGenerator:
-    def __init__(self):
-        self.seo_generator = SEOContentGenerator()
-        self.image_optimizer = ImageOptimizer()
-        self.schema_generator = SchemaGenerator()
-        self.performance_monitor = PerformanceMonitor()
-        self.content_checker = ContentQualityChecker()
-        self.location_manager = LocationManager()
-        self.review_generator = ReviewGenerator()
+    # Each component is imported and built the first time a stage uses it
+    seo_generator = LazyComponent('hw_websites.server.utils.seo_content_generator', 'SEOContentGenerator')
+    image_optimizer = LazyComponent('hw_websites.server.utils.image_optimizer', 'ImageOptimizer')
+    schema_generator = LazyComponent('hw_websites.server.utils.schema_generator', 'SchemaGenerator')
+    content_checker = LazyComponent('hw_websites.server.utils.content_checker', 'ContentQualityChecker')
+    location_manager = LazyComponent('hw_websites.server.utils.location_manager', 'LocationManager')
+    review_generator = LazyComponent('hw_websites.server.utils.review_generator', 'ReviewGenerator')
+
+    COMPONENTS = [
+        'seo_generator',
+        'image_optimizer',
+        'schema_generator',
+        'content_checker',
+        'location_manager',
+        'review_generator'
+    ]
 
-    def generate_enhanced_page(self, template, data):
-        # Generate SEO content
-        meta_description = self.seo_generator.generate_meta_description(data['content'])
-        location_content = self.seo_generator.generate_location_specific_content(
-            data['content'],
-            data['location'],
-            data['industry_terms']
+    def prepare_meta_descriptions(self, pages, batch_size=8):
+        """Summarize the meta descriptions of every page in a build in batches"""
+        pending = [page for page in pages if 'meta_description' not in page]
+        if not pending:
+            return
+
+        descriptions = self.seo_generator.generate_meta_descriptions(
+            [page['content'] for page in pending],
+            batch_size=batch_size
         )
+        for page, description in zip(pending, descriptions):
+            page['meta_description'] = description
 
-        # Optimize images
-        optimized_images = {}
-        for image in data['images']:
-            optimized_images[image] = self.image_optimizer.optimize_image(
-                image,
-                data['output_dir']
+    def startup_report(self, load_all=False):
+        """Report the import and initialization cost of each loaded component"""
+        if load_all:
+            for name in self.COMPONENTS:
+                component = getattr(self, name)
+                preload = getattr(component, 'preload', None)
+                if preload is not None:
+                    preload()
+
+        return startup_timer.report()
+
+    @cached_property
+    def stage_pool(self):
+        """Threads for the page stages, which mostly wait on I/O, images or native NLP code"""
+        return ThreadPoolExecutor(max_workers=8, thread_name_prefix='page-stage')
+
+    def generate_enhanced_page(self, template, data):
+        # Independent stages run concurrently; each stage declares what it depends on
+        graph = StageGraph(self.stage_pool)
+
+        # Generate SEO content (usually summarized for the whole build up front)
+        def meta_description():
+            if data.get('meta_description') is not None:
+                return data['meta_description']
+            return self.seo_generator.generate_meta_description(data['content'])
+
+        def location_content():
+            return self.seo_generator.generate_location_specific_content(
+                data['content'],
+                data['location'],
+                data['industry_terms']
             )
 
+        # Optimize images (usually done once for the whole build up front)
+        def optimized_images():
+            if data.get('optimized_images') is not None:
+                return data['optimized_images']
+            return {
+                image: self.image_optimizer.optimize_image(image, data['output_dir'])
+                for image in data['images']
+            }
+
         # Generate schema
-        schema = self.schema_generator.generate_service_schema(
-            data['service'],
-            data['location']
-        )
+        def schema():
+            return self.schema_generator.generate_service_schema(
+                data['service'],
+                data['location']
+            )
 
         # Check content quality
-        quality_metrics = self.content_checker.check_content(location_content)
+        def quality_metrics(location_content):
+            return self.content_checker.check_content(location_content)
 
         # Generate service areas content
-        service_areas_content = self.location_manager.generate_service_area_content(
-            data['location']
-        )
+        def service_areas_content(service_area_map):
+            return self.location_manager.generate_service_area_content(
+                data['location'],
+                service_area_map
+            )
 
         # Generate reviews
-        reviews_content = self.review_generator.generate_review_section(
-            data['company_name'],
-            data['location'],
-            data['service_type']
-        )
+        def reviews_content():
+            return self.review_generator.generate_review_section(
+                data['company_name'],
+                data['location'],
+                data['service_type']
+            )
 
-        # Generate service area map
-        map_path = f"assets/images/service-area-{data['location'].lower()}.html"
-        self.location_manager.generate_service_area_map(
-            data['location'],
-            map_path
-        )
+        # Publish the city's service area map payload into the site's deployed assets
+        def service_area_map():
+            return self.location_manager.generate_service_area_map(data['location'], site_assets_dir(data))
 
         # Add new content to page
-        location_specific = self.seo_generator.generate_location_specific_content(
-            data['content'] + service_areas_content + reviews_content,
-            data['location'],
-            data['industry_terms']
-        )
+        def location_specific(service_areas_content, reviews_content):
+            return self.seo_generator.generate_location_specific_content(
+                data['content'] + service_areas_content + reviews_content,
+                data['location'],
+                data['industry_terms']
+            )
 
         # Generate page
-        page_content = template.render(
-            content=location_specific,
-            meta_description=meta_description,
-            images=optimized_images,
-            schema=schema,
-            **data
+        def page_content(location_specific, meta_description, optimized_images, schema):
+            return template.render(**{
+                **data,
+                'content': location_specific,
+                'meta_description': meta_description,
+                'images': optimized_images,
+                'schema': schema
+            })
+
+        graph.add('meta_description', meta_description)
+        graph.add('location_content', location_content)
+        graph.add('optimized_images', optimized_images)
+        graph.add('schema', schema)
+        graph.add('quality_metrics', quality_metrics, deps=['location_content'])
+        graph.add('service_area_map', service_area_map)
+        graph.add('service_areas_content', service_areas_content, deps=['service_area_map'])
+        graph.add('reviews_content', reviews_content)
+        graph.add('location_specific', location_specific, deps=['service_areas_content', 'reviews_content'])
+        graph.add(
+            'page_content',
+            page_content,
+            deps=['location_specific', 'meta_description', 'optimized_images', 'schema']
         )
+        results = graph.run()
 
-        # Monitor performance
-        metrics = self.performance_monitor.measure_page_performance(data['url'])
-
+        # Performance is probed for the whole build afterwards (see main), so pages never wait on the network
         return {
-            'content': page_content,
-            'metrics': metrics,
-            'quality': quality_metrics
+            'content': results['page_content'],
+            'quality': results['quality_metrics']
         }
 
+# Page generator owned by each build worker process
+_worker_generator = None
+
+def init_page_generator():
+    """Create the page generator for a build worker process"""
+    global _worker_generator
+    _worker_generator = EnhancedPageGenerator()
+
+def site_assets_dir(data) -> str:
+    """Assets directory of the site a page belongs to, served as /assets"""
+    site_dir = data.get('site_dir') or os.path.dirname(os.path.normpath(data['output_dir']))
+    return os.path.join(site_dir, 'assets')
+
+def enhanced_page_output(data) -> str:
+    return os.path.join(data['output_dir'], 'index.html')
+
+# Modules whose code renders enhanced pages; editing any of them rebuilds every page
+ENHANCED_PAGE_MODULES = (
+    'hw_websites.server.generate_pages',
+    'hw_websites.server.utils.location_manager',
+    'hw_websites.server.utils.review_generator',
+    'hw_websites.server.utils.schema_generator',
+    'hw_websites.server.utils.seo_content_generator'
+)
+
+@lru_cache(maxsize=None)
+def enhanced_page_code_version() -> str:
+    """Hash the source of the modules that render enhanced pages and the gazetteer they read"""
+    paths = [importlib.util.find_spec(name).origin for name in ENHANCED_PAGE_MODULES]
+    # Pages link to service area payloads named after the gazetteer data
+    paths.append(DEFAULT_GAZETTEER_PATH)
+    sources = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            sources.append(f.read())
+    return fingerprint(sources)
+
+def template_version(template) -> Optional[str]:
+    """Hash the source file of a Jinja2 template, or its name when it has no file"""
+    if template is None:
+        return None
+    filename = getattr(template, 'filename', None)
+    if filename and os.path.exists(filename):
+        with open(filename, 'r', encoding='utf-8') as f:
+            return fingerprint(f.read())
+    return getattr(template, 'name', None) or repr(template)
+
+def enhanced_page_fingerprint(data, reviews, template=None) -> str:
+    """Hash the renderer code, template, page data (including the schema inputs) and review store version"""
+    return fingerprint(enhanced_page_code_version(), template_version(template), data, reviews)
+
+def generate_enhanced_page_job(data, template=None):
+    """Generate an enhanced page with the worker's page generator and write it out"""
+    if _worker_generator is None:
+        init_page_generator()
+    result = _worker_generator.generate_enhanced_page(template, data)
+
+    output_path = enhanced_page_output(data)
+    create_directory(os.path.dirname(output_path))
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(result['content'])
+
+    return result
+
 if __name__ == "__main__":
     generate_site('hwroads.com', 'Miami')
     generate_site('hwasphaltfl.com', 'Orlando')
@@ -1,6 +1,7 @@
 import os
 import shutil
-from PIL import Image
+from hw_websites.server.utils.image_optimizer import ImageOptimizer
+from hw_websites.server.utils.image_pipeline import ImagePipeline
 
 class AssetManager:
     def __init__(self, base_dir='assets'):
@@ -24,29 +25,16 @@ class AssetManager:
             full_path = os.path.join(self.base_dir, dir_path)
             os.makedirs(full_path, exist_ok=True)
 
-    def optimize_images(self, site_name):
+    def optimize_images(self, site_name, workers=None):
         """Optimize all images for a site"""
         image_dir = os.path.join(self.base_dir, f'{site_name}/images')
         optimized_dir = os.path.join(self.base_dir, f'{site_name}/images/optimized')
-        os.makedirs(optimized_dir, exist_ok=True)
 
-        for filename in os.listdir(image_dir):
-            if filename.lower().endswith(('.png', '.jpg', '.jpeg')):
-                image_path = os.path.join(image_dir, filename)
-                self._optimize_image(image_path, optimized_dir)
-
-    def _optimize_image(self, image_path, output_dir):
-        """Optimize a single image"""
-        img = Image.open(image_path)
-        filename = os.path.basename(image_path)
-        name, ext = os.path.splitext(filename)
-
-        # Create different sizes
-        for size_name, dimensions in self.image_sizes.items():
-            resized = img.copy()
-            resized.thumbnail(dimensions)
-            output_path = os.path.join(
-                output_dir,
-                f'{name}_{size_name}{ext}'
-            )
-            resized.save(output_path, optimize=True, quality=85)
+        images = [
+            os.path.join(image_dir, filename)
+            for filename in sorted(os.listdir(image_dir))
+            if filename.lower().endswith(('.png', '.jpg', '.jpeg'))
+        ]
+        # Sizes keep the source format; images are resized in parallel
+        optimizer = ImageOptimizer(quality=85, sizes=self.image_sizes, format=None)
+        return ImagePipeline(optimizer, workers=workers).run(images, lambda image: optimized_dir)
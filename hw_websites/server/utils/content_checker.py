@@ -1,13 +1,204 @@
-import language_tool_python
-from textblob import TextBlob
+import importlib
+import importlib.metadata
+import os
+import queue
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, lru_cache
+from typing import List, Optional, Tuple
+from hw_websites.server.utils.inference_cache import DEFAULT_CACHE_PATH, InferenceCache
+from hw_websites.server.utils.lazy_loader import lazy_import, startup_timer
+from hw_websites.server.utils.quality_scorer import (
+    corpus_features,
+    count_syllables,
+    flesch_reading_ease,
+    readability_ratios
+)
+
+# Blank lines and block-level tags separate paragraphs
+_PARAGRAPH_BREAK = re.compile(
+    r'\n\s*\n|</?(?:p|div|section|article|header|footer|li|ul|ol|h[1-6]|br)\b[^>]*>',
+    re.IGNORECASE
+)
+
+def paragraph_spans(content: str) -> List[Tuple[int, str]]:
+    """Split content into (offset, paragraph) pairs, offsets indexing the content"""
+    spans = []
+    start = 0
+    for match in _PARAGRAPH_BREAK.finditer(content):
+        spans.append((start, content[start:match.start()]))
+        start = match.end()
+    spans.append((start, content[start:]))
+
+    # Strip each paragraph, moving its offset past the leading whitespace
+    return [
+        (offset + len(text) - len(text.lstrip()), text.strip())
+        for offset, text in spans
+        if text.strip()
+    ]
+
+def split_paragraphs(content: str) -> List[str]:
+    """Split content into the paragraphs that are grammar-checked independently"""
+    return [paragraph for _, paragraph in paragraph_spans(content)]
+
+# LanguageTool matches render as "Offset <n>, length <m>, Rule ID: ..."
+_MATCH_OFFSET = re.compile(r'^Offset (\d+),')
+
+def shift_suggestion(suggestion: str, shift: int) -> str:
+    """Move the offset a suggestion reports by the position of its paragraph"""
+    return _MATCH_OFFSET.sub(lambda match: f"Offset {int(match.group(1)) + shift},", suggestion, count=1)
+
+@lru_cache(maxsize=None)
+def languagetool_version() -> str:
+    """Versions of language_tool_python and of the LanguageTool release it runs, without starting a server"""
+    try:
+        package = importlib.metadata.version('language_tool_python')
+    except importlib.metadata.PackageNotFoundError:
+        package = 'unknown'
+    try:
+        release = importlib.import_module('language_tool_python.download_lt').LTP_DOWNLOAD_VERSION
+    except (ImportError, AttributeError):
+        release = 'unknown'
+    return f"{package}/{release}"
+
+# Comma-separated URLs of running LanguageTool servers that build workers connect to
+LANGUAGETOOL_SERVERS_ENV = 'LANGUAGETOOL_SERVERS'
+
+def server_url(tool) -> str:
+    """Address other processes can reach a local LanguageTool server at"""
+    # language_tool_python keeps the server's API URL, ending in v2/, on the instance
+    return tool._url.rsplit('v2/', 1)[0].rstrip('/')
+
+def shared_servers() -> List[str]:
+    return [url for url in os.environ.get(LANGUAGETOOL_SERVERS_ENV, '').split(',') if url]
+
+class LanguageToolPool:
+    """Small pool of warm LanguageTool servers shared by grammar checks
+
+    Without servers, each tool starts its own LanguageTool server (a JVM).
+    With servers, the tools are HTTP clients of servers another process
+    runs, so build workers share the build's pool instead of each
+    starting their own.
+    """
+    def __init__(self, size: int = 2, language: str = 'en-US', servers: Optional[List[str]] = None):
+        self.size = max(1, size)
+        self.language = language
+        self.servers = list(servers or [])
+        self._idle = queue.Queue()
+        self._tools = []
+        self._lock = threading.Lock()
+
+    def _start_tool(self):
+        language_tool_python = lazy_import('language_tool_python', 'LanguageTool')
+        if self.servers:
+            server = self.servers[len(self._tools) % len(self.servers)]
+            tool = language_tool_python.LanguageTool(self.language, remote_server=server)
+        else:
+            # Each local LanguageTool instance runs its own server process
+            with startup_timer.measure('LanguageTool', 'init'):
+                tool = language_tool_python.LanguageTool(self.language)
+        self._tools.append(tool)
+        return tool
+
+    def _acquire(self):
+        with self._lock:
+            if self._idle.empty() and len(self._tools) < self.size:
+                return self._start_tool()
+        return self._idle.get()
+
+    def start(self):
+        """Start every server in the pool up front"""
+        with self._lock:
+            while len(self._tools) < self.size:
+                self._idle.put(self._start_tool())
+
+    def check(self, text: str) -> List[str]:
+        """Check one text on the next free server"""
+        tool = self._acquire()
+        try:
+            return [str(match) for match in tool.check(text)]
+        finally:
+            self._idle.put(tool)
+
+    def check_many(self, texts: List[str]) -> List[List[str]]:
+        """Check several texts across the pool"""
+        if len(texts) <= 1:
+            return [self.check(text) for text in texts]
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            return list(executor.map(self.check, texts))
+
+    def urls(self) -> List[str]:
+        """Addresses of the servers this pool checks on, for other processes to share"""
+        if self.servers:
+            return list(self.servers)
+        return [server_url(tool) for tool in self._tools]
+
+    def close(self):
+        for tool in self._tools:
+            tool.close()
+        self._tools.clear()
+        self._idle = queue.Queue()
 
 class ContentQualityChecker:
-    def __init__(self):
-        self.tool = language_tool_python.LanguageTool('en-US')
+    # LanguageTool starts a JVM, so the servers are only started when content is checked
+    def __init__(self, pool_size: int = 2, language: str = 'en-US', cache_path=DEFAULT_CACHE_PATH, servers=None):
+        self.pool_size = pool_size
+        self.language = language
+        self.cache_path = cache_path
+        # Servers started by the build's parent process, when it shares them
+        self.servers = shared_servers() if servers is None else servers
+
+    @cached_property
+    def tools(self) -> LanguageToolPool:
+        return LanguageToolPool(self.pool_size, self.language, self.servers)
+
+    @cached_property
+    def cache(self):
+        """Persistent cache of grammar results per paragraph, or None when disabled"""
+        if self.cache_path is None:
+            return None
+        return InferenceCache(self.cache_path)
+
+    @property
+    def grammar_model(self) -> str:
+        # Cached results are dropped when language_tool_python or LanguageTool is upgraded
+        return f"LanguageTool {languagetool_version()} {self.language}"
+
+    def preload(self):
+        """Start the grammar checkers up front"""
+        self.tools.start()
+        return self.tools
+
+    def check_grammar(self, content: str) -> List[str]:
+        """Check grammar paragraph by paragraph, re-checking only unseen paragraphs"""
+        spans = paragraph_spans(content)
+        paragraphs = [paragraph for _, paragraph in spans]
+
+        if self.cache is None:
+            unique_paragraphs = list(dict.fromkeys(paragraphs))
+            results = dict(zip(unique_paragraphs, self.tools.check_many(unique_paragraphs)))
+        else:
+            results = self.cache.cached(
+                self.grammar_model,
+                'grammar',
+                paragraphs,
+                self.tools.check_many
+            )
+
+        # Results are cached per paragraph, so their offsets are moved back onto the page
+        return [
+            shift_suggestion(suggestion, offset)
+            for offset, paragraph in spans
+            for suggestion in results[paragraph]
+        ]
 
     def check_content(self, content: str) -> dict:
+        from textblob import TextBlob
+
         # Check grammar and spelling
-        matches = self.tool.check(content)
+        suggestions = self.check_grammar(content)
 
         # Analyze sentiment and subjectivity
         blob = TextBlob(content)
@@ -16,17 +207,17 @@ class ContentQualityChecker:
         readability_score = self._calculate_readability(content)
 
         return {
-            'grammar_errors': len(matches),
-            'suggestions': [str(match) for match in matches],
+            'grammar_errors': len(suggestions),
+            'suggestions': suggestions,
             'sentiment': blob.sentiment.polarity,
             'subjectivity': blob.sentiment.subjectivity,
             'readability_score': readability_score
         }
 
     def _calculate_readability(self, text: str) -> float:
-        # Implement Flesch-Kincaid readability score
-        words = len(text.split())
-        sentences = len(text.split('.'))
-        syllables = self._count_syllables(text)
+        # Flesch reading ease, counted exactly as the corpus quality report counts it
+        words_per_sentence, syllables_per_word = readability_ratios(corpus_features([text]))
+        return float(flesch_reading_ease(words_per_sentence, syllables_per_word)[0])
 
-        return 206.835 - 1.015 * (words/sentences) - 84.6 * (syllables/words)
+    def _count_syllables(self, text: str) -> int:
+        return count_syllables(text)
@@ -1,180 +1,284 @@
-from collections import defaultdict
+from collections import Counter
+from functools import lru_cache
+import os
 import re
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from bs4 import BeautifulSoup
+from hw_websites.server.build_manifest import fingerprint
+from hw_websites.server.utils.lazy_loader import lazy_import
+from hw_websites.server.utils.link_index import KeywordIndex
+from hw_websites.server.utils.link_injector import LinkInjector, linkable_terms
+from hw_websites.server.utils.link_planner import LinkPlanner
+from hw_websites.server.utils.phrase_matcher import PhraseMatcher
 
-class ContentLinker:
-    def __init__(self):
-        # Download required NLTK data
-        nltk.download('punkt')
-        nltk.download('stopwords')
+# Example blog posts data structure
+BLOG_POSTS = [
+    {
+        'title': "How Road Construction Projects Go from Blueprint to Reality",
+        'url': '/blog/road-construction-blueprint-reality',
+        'content': """
+            <article>
+                <h1>How Road Construction Projects Go from Blueprint to Reality</h1>
+                <p>Road construction projects require careful planning and execution...</p>
+                <!-- Rest of the content -->
+            </article>
+            """
+    },
+    {
+        'title': "Eco-Friendly Road Construction Methods for Florida",
+        'url': '/blog/eco-friendly-road-construction',
+        'content': """
+            <article>
+                <h1>Eco-Friendly Road Construction Methods for Florida</h1>
+                <p>As environmental concerns grow, sustainable road construction...</p>
+                <!-- Rest of the content -->
+            </article>
+            """
+    },
+    # Add more blog posts
+]
+
+# Industry-specific phrases; PHRASES_FILE or the phrases argument can replace them
+IMPORTANT_PHRASES = (
+    "road construction",
+    "asphalt paving",
+    "highway maintenance",
+    "traffic management",
+    "construction services",
+    "infrastructure development",
+    "road repair",
+    "pavement maintenance",
+    "construction project",
+    "road safety",
+)
 
-        self.stop_words = set(stopwords.words('english'))
-        self.content_index = defaultdict(list)
+@lru_cache(maxsize=None)
+def _load_phrase_matcher(phrases_file=None, phrases=IMPORTANT_PHRASES):
+    """Build the phrase automaton once per process and dictionary"""
+    if phrases_file:
+        return PhraseMatcher.from_file(phrases_file)
+    return PhraseMatcher(phrases)
+
+def _phrase_matcher(phrases=None):
+    """Resolve a phrase list, a phrase file path or the default dictionary"""
+    if isinstance(phrases, str):
+        return _load_phrase_matcher(phrases_file=phrases)
+    if phrases is not None:
+        return _load_phrase_matcher(phrases=tuple(phrases))
+    return _load_phrase_matcher(phrases_file=os.environ.get('PHRASES_FILE'))
+
+# Bump when pages are tokenized differently, so persisted indexes re-index every page
+INDEXING_VERSION = 2
+
+def page_digest(page):
+    """Hash the fields a page is indexed from and the way it is indexed"""
+    return fingerprint(INDEXING_VERSION, page['title'], page['content'])
+
+# Runs of letters and digits; offsets index the original text
+_WORD = re.compile(r'[^\W_]+')
+
+def keyword_context(content, start, end, context_chars=10):
+    """Slice the text around a keyword occurrence, staying on its line"""
+    before = content[max(0, start - context_chars):start].rsplit('\n', 1)[-1]
+    after = content[end:end + context_chars].split('\n', 1)[0]
+    return f"{before}{content[start:end]}{after}"
+
+@lru_cache(maxsize=None)
+def _load_stop_words():
+    """Import NLTK, download the stopword list once per process and load it"""
+    nltk = lazy_import('nltk', 'NLTK')
+    nltk.download('stopwords')
+
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words('english'))
+
+class ContentLinker:
+    def __init__(self, phrases=None, index=None):
+        self.stop_words = _load_stop_words()
+        self.phrase_matcher = _phrase_matcher(phrases)
+        self.index = KeywordIndex() if index is None else index
         self.keyword_mapping = {}
 
     def build_keyword_index(self, pages):
-        """Build an index of keywords and their corresponding pages"""
+        """Build a ranked index of keywords and their corresponding pages"""
         for page in pages:
-            # Extract keywords from title and content
-            keywords = self.extract_keywords(page['title'] + ' ' + page['content'])
+            self.index_page(page)
 
-            # Add to index
-            for keyword in keywords:
-                self.content_index[keyword].append({
-                    'url': page['url'],
-                    'title': page['title'],
-                    'context': self.get_keyword_context(page['content'], keyword)
-                })
+        # Score every posting in one pass
+        self.index.build()
 
-    def extract_keywords(self, text):
-        """Extract meaningful keywords from text"""
-        # Tokenize and clean text
-        tokens = word_tokenize(text.lower())
+    def sync_index(self, pages):
+        """Re-index only new or changed pages and drop pages that are gone"""
+        changed = 0
+        urls = set()
+        for page in pages:
+            urls.add(page['url'])
+            if self.index.digest_of(page['url']) != page_digest(page):
+                self.index_page(page)
+                changed += 1
+
+        for url in set(self.index.urls()) - urls:
+            self.index.remove_page(url)
+            changed += 1
+
+        self.index.build()
+        return changed
 
-        # Remove stop words and short words
-        keywords = [
-            word for word in tokens
-            if word not in self.stop_words
-            and len(word) > 3
-            and word.isalnum()
-        ]
+    def index_page(self, page):
+        """Add or replace one page in the keyword index"""
+        # Tokenize the content and title once and slice contexts from the token offsets
+        counts, offsets = self.scan_keywords(page['content'])
+        title_counts, title_offsets = self.scan_keywords(page['title'])
+        counts.update(title_counts)
+        contexts = {
+            keyword: keyword_context(page['content'], start, end)
+            for keyword, (start, end) in offsets.items()
+        }
+        # Keywords only found in the title take their context from the title
+        for keyword, (start, end) in title_offsets.items():
+            if keyword not in contexts:
+                contexts[keyword] = keyword_context(page['title'], start, end)
+        # Only terms in linkable body text can anchor a planned link; titles usually sit in <h1>
+        linkable = linkable_terms(page['content'], self.find_terms)
+        return self.index.add_page(page['url'], page['title'], counts, contexts, page_digest(page), linkable)
 
-        # Add multi-word phrases
-        phrases = self.extract_phrases(text)
-        keywords.extend(phrases)
+    def find_terms(self, text):
+        """Yield (start, end, keyword) for every keyword and phrase occurrence in text"""
+        # Keep alphanumeric words that are not stop words or short words
+        for match in _WORD.finditer(text):
+            word = match.group().lower()
+            if len(word) > 3 and word not in self.stop_words:
+                yield match.start(), match.end(), word
 
-        return set(keywords)
+        # Add every multi-word phrase occurrence
+        yield from self.phrase_matcher.find_all(text)
+
+    def scan_keywords(self, text):
+        """Count keywords and phrases in one pass and record where each first occurs"""
+        counts = Counter()
+        offsets = {}
+        for start, end, keyword in self.find_terms(text):
+            counts[keyword] += 1
+            offsets.setdefault(keyword, (start, end))
+
+        return counts, offsets
+
+    def keyword_counts(self, text):
+        """Count meaningful keywords and phrases in text"""
+        return self.scan_keywords(text)[0]
+
+    def extract_keywords(self, text):
+        """Extract meaningful keywords from text"""
+        return set(self.keyword_counts(text))
 
     def extract_phrases(self, text):
         """Extract meaningful multi-word phrases"""
-        phrases = []
-        # Define industry-specific phrases
-        important_phrases = [
-            "road construction",
-            "asphalt paving",
-            "highway maintenance",
-            "traffic management",
-            "construction services",
-            "infrastructure development",
-            "road repair",
-            "pavement maintenance",
-            "construction project",
-            "road safety",
-            # Add more relevant phrases
-        ]
-
-        for phrase in important_phrases:
-            if phrase.lower() in text.lower():
-                phrases.append(phrase)
-
-        return phrases
+        return [phrase for _, _, phrase in self.phrase_matcher.find_all(text)]
 
     def get_keyword_context(self, content, keyword, context_words=10):
         """Get the surrounding context for a keyword"""
-        # Find keyword in content
-        pattern = re.compile(f'(?i)(.{{0,{context_words}}}){keyword}(.{{0,{context_words}}})')
-        match = pattern.search(content)
-
-        if match:
-            return f"{match.group(1)}{keyword}{match.group(2)}"
-        return ""
+        start = content.lower().find(keyword.lower())
+        if start == -1:
+            return ""
+        return keyword_context(content, start, start + len(keyword), context_words)
 
     def add_internal_links(self, content, url, max_links=3):
-        """Add internal links to content"""
-        soup = BeautifulSoup(content, 'html.parser')
-        text_nodes = soup.find_all(text=True)
-        links_added = 0
-
-        for text_node in text_nodes:
-            if links_added >= max_links:
-                break
-
-            if text_node.parent.name not in ['a', 'h1', 'script', 'style']:
-                # Extract keywords from current text node
-                keywords = self.extract_keywords(text_node)
-
-                for keyword in keywords:
-                    # Find relevant pages for this keyword
-                    relevant_pages = [
-                        page for page in self.content_index[keyword]
-                        if page['url'] != url  # Don't link to self
-                    ]
-
-                    if relevant_pages and links_added < max_links:
-                        # Create link
-                        best_match = relevant_pages[0]  # Take the first match
-                        new_text = text_node.replace(
-                            keyword,
-                            f'<a href="{best_match["url"]}" title="{best_match["title"]}">{keyword}</a>'
-                        )
-                        text_node.replace_with(BeautifulSoup(new_text, 'html.parser'))
-                        links_added += 1
-
-        return str(soup)
+        """Add internal links to content in one streaming pass"""
+        # Highest-scoring page for each keyword, never the page itself
+        return self.inject_links(content, lambda keyword: self.index.best_target(keyword, exclude_url=url), max_links)
+
+    def add_planned_links(self, content, url, plan):
+        """Add the links a site-wide LinkPlan assigned to this page"""
+        return self.apply_plan(content, url, plan)[0]
+
+    def apply_plan(self, content, url, plan):
+        """Add a page's planned links and return the content with the links actually added"""
+        planned = plan.links.get(url, {})
+        injector = LinkInjector(self.find_terms, planned.get, len(planned))
+        return injector.rewrite(content), injector.links
+
+    def inject_links(self, content, resolve, max_links):
+        """Link keyword occurrences to the targets resolve() picks with the streaming injector"""
+        return LinkInjector(self.find_terms, resolve, max_links).rewrite(content)
 
 class BlogPostProcessor:
-    def __init__(self):
-        self.content_linker = ContentLinker()
+    def __init__(self, index_path=None, planner=None, read_only=False):
+        # With an index path the keyword index persists between builds;
+        # a read-only processor links from the saved index as it is
+        self.index_path = index_path
+        self.read_only = read_only
+        index = None
+        if index_path and KeywordIndex.exists(index_path):
+            index = KeywordIndex.open(index_path, read_only=read_only)
+        self.content_linker = ContentLinker(index=index)
+        self.planner = LinkPlanner() if planner is None else planner
+        self.link_plan = None
+
+    def sync_index(self, blog_posts):
+        """Bring the saved keyword index up to date with the blog corpus"""
+        changed = self.content_linker.sync_index(blog_posts)
+        if changed or not KeywordIndex.exists(self.index_path):
+            self.content_linker.index.save(self.index_path)
+            print(f"Re-indexed {changed} blog posts for internal linking")
 
     def process_blog_posts(self, blog_posts):
         """Process all blog posts to add internal linking"""
-        # First, build the keyword index
-        self.content_linker.build_keyword_index(blog_posts)
+        # First, bring the keyword index up to date
+        if not self.index_path:
+            self.content_linker.build_keyword_index(blog_posts)
+        elif not self.read_only:
+            self.sync_index(blog_posts)
 
-        # Then, add internal links to each post
+        # Plan links for the whole corpus at once, then add them to each post
+        plan = self.planner.plan(self.content_linker.index)
         processed_posts = []
+        injected = {}
         for post in blog_posts:
-            processed_content = self.content_linker.add_internal_links(
+            processed_content, injected[post['url']] = self.content_linker.apply_plan(
                 post['content'],
-                post['url']
+                post['url'],
+                plan
             )
             processed_posts.append({
                 **post,
                 'content': processed_content
             })
 
+        # Report the links that made it into the pages, not the ones planned
+        self.link_plan = self.planner.reconcile(self.content_linker.index, plan, injected)
         return processed_posts
 
-def generate_blog_content(title):
-    """Generate blog content with internal linking"""
-    blog_processor = BlogPostProcessor()
-
-    # Example blog posts data structure
-    blog_posts = [
-        {
-            'title': "How Road Construction Projects Go from Blueprint to Reality",
-            'url': '/blog/road-construction-blueprint-reality',
-            'content': """
-            <article>
-                <h1>How Road Construction Projects Go from Blueprint to Reality</h1>
-                <p>Road construction projects require careful planning and execution...</p>
-                <!-- Rest of the content -->
-            </article>
-            """
-        },
-        {
-            'title': "Eco-Friendly Road Construction Methods for Florida",
-            'url': '/blog/eco-friendly-road-construction',
-            'content': """
-            <article>
-                <h1>Eco-Friendly Road Construction Methods for Florida</h1>
-                <p>As environmental concerns grow, sustainable road construction...</p>
-                <!-- Rest of the content -->
-            </article>
-            """
-        },
-        # Add more blog posts
-    ]
+class BlogLinkingSession:
+    """Site-scoped linking session that indexes and links the blog corpus once"""
+    def __init__(self, blog_posts=None, index_path=None):
+        self.blog_posts = BLOG_POSTS if blog_posts is None else blog_posts
+        self.index_path = index_path
+        self._synced = False
+        self._posts_by_title = None
+
+    def sync_index(self):
+        """Update the saved index once so every worker can open it read-only"""
+        if self.index_path and not self._synced:
+            BlogPostProcessor(self.index_path).sync_index(self.blog_posts)
+            self._synced = True
 
-    # Process blog posts to add internal linking
-    processed_posts = blog_processor.process_blog_posts(blog_posts)
+    def process(self):
+        """Index the blog corpus and link every post in one pass"""
+        if self._posts_by_title is None:
+            blog_processor = BlogPostProcessor(self.index_path, read_only=self._synced)
+            processed_posts = blog_processor.process_blog_posts(self.blog_posts)
+            self._posts_by_title = {post['title']: post for post in processed_posts}
+        return self._posts_by_title
 
-    # Find and return the requested blog post
-    for post in processed_posts:
-        if post['title'] == title:
+    def get_content(self, title):
+        """Get the linked content for a blog post by title"""
+        post = self.process().get(title)
+        if post is not None:
             return post['content']
 
-    return f"<h1>{title}</h1><p>Content coming soon...</p>"
+        return f"<h1>{title}</h1><p>Content coming soon...</p>"
+
+def generate_blog_content(title, session=None):
+    """Generate blog content with internal linking"""
+    if session is None:
+        session = BlogLinkingSession()
+
+    return session.get_content(title)
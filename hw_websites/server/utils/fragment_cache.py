@@ -0,0 +1,121 @@
+import importlib.util
+import json
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+from hw_websites.server.build_manifest import fingerprint
+
+# Bump when fragments are stored or rendered differently in a way module sources don't show
+FRAGMENT_VERSION = 1
+# Fragments live in their own subdirectory, so a cache_dir can be shared with other caches
+FRAGMENT_NAMESPACE = 'fragments'
+
+@lru_cache(maxsize=None)
+def renderer_version(module_name: str) -> Optional[str]:
+    """Hash the source of the module a render function comes from"""
+    spec = importlib.util.find_spec(module_name)
+    if spec is None or not spec.origin or not os.path.exists(spec.origin):
+        return None
+    with open(spec.origin, 'r', encoding='utf-8') as f:
+        return fingerprint(f.read())
+
+class FragmentCache:
+    """Rendered page fragments keyed on the inputs they are rendered from
+
+    Fragments live in an in-process LRU and, with a cache directory, in a
+    JSON file per fragment shared by build workers and later builds. Keys
+    hash every input together with the fragment version and the renderer's
+    source, so a changed input or renderer simply misses and renders anew.
+    """
+    def __init__(self, max_entries: int = 512, cache_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def key(self, kind: str, *inputs) -> str:
+        return f"{kind}-{fingerprint(FRAGMENT_VERSION, *inputs)}"
+
+    def _directory(self) -> str:
+        return os.path.join(self.cache_dir, FRAGMENT_NAMESPACE)
+
+    def _path(self, key: str) -> str:
+        kind = key.rsplit('-', 1)[0]
+        return os.path.join(self._directory(), kind, f"{key}.json")
+
+    def get_or_render(self, kind: str, inputs: tuple, render: Callable[[], Any]) -> Any:
+        """Get a fragment rendered from the same inputs, rendering it on a miss"""
+        key = self.key(kind, renderer_version(render.__module__), *inputs)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        value = self._read(key)
+        if value is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            value = render()
+            self._write(key, value)
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def _read(self, key: str):
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, key: str, value):
+        if self.cache_dir is None:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(value, f)
+        os.replace(tmp_path, path)
+
+    def invalidate(self, kind: Optional[str] = None):
+        """Drop every fragment, or every fragment of one kind, from both tiers"""
+        with self._lock:
+            for key in list(self._entries):
+                if kind is None or key.rsplit('-', 1)[0] == kind:
+                    del self._entries[key]
+
+        # Only fragment files are deleted, never anything else in cache_dir
+        if self.cache_dir is None or not os.path.isdir(self._directory()):
+            return
+        kinds = [kind] if kind is not None else os.listdir(self._directory())
+        for name in kinds:
+            directory = os.path.join(self._directory(), name)
+            if os.path.isdir(directory):
+                for filename in os.listdir(directory):
+                    if filename.startswith(f"{name}-") and filename.endswith('.json'):
+                        os.remove(os.path.join(directory, filename))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses
+        }
+
+# Shared by every component in a process; FRAGMENT_CACHE_DIR adds the disk tier
+fragment_cache = FragmentCache(cache_dir=os.environ.get('FRAGMENT_CACHE_DIR'))
@@ -0,0 +1,133 @@
+import csv
+import json
+import os
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+DEFAULT_GAZETTEER_PATH = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'florida_places.csv')
+)
+
+# Numeric columns are stored as .npy files so readers can memory-map them
+NUMERIC_COLUMNS = ('lats', 'lons', 'population')
+
+class Gazetteer:
+    """Offline table of Florida places with array-backed columns
+
+    Rows keep the file order. Names are looked up through a sorted,
+    case-insensitive index, so exact and prefix lookups are binary searches.
+    A ZIP code can serve several places; its rows are kept most populous first.
+    """
+    def __init__(self, names, counties, lats, lons, population, zips):
+        self.names: List[str] = list(names)
+        self.counties: List[str] = list(counties)
+        self.lats = lats
+        self.lons = lons
+        self.population = population
+        self.zips: List[Tuple[str, ...]] = [tuple(codes) for codes in zips]
+
+        keys = [name.casefold() for name in self.names]
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self._sorted_keys = [keys[i] for i in order]
+        self._sorted_rows = order
+        self._zip_rows: Dict[str, List[int]] = {}
+        for row in sorted(range(len(self.zips)), key=lambda row: -int(self.population[row])):
+            for code in self.zips[row]:
+                self._zip_rows.setdefault(code, []).append(row)
+
+    @classmethod
+    def from_csv(cls, path: str = DEFAULT_GAZETTEER_PATH) -> 'Gazetteer':
+        """Load a CSV with name, county, lat, lon, population and space-separated zips"""
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            rows = list(csv.DictReader(f))
+
+        return cls(
+            names=[row['name'] for row in rows],
+            counties=[row['county'] for row in rows],
+            lats=np.array([float(row['lat']) for row in rows], dtype=np.float64),
+            lons=np.array([float(row['lon']) for row in rows], dtype=np.float64),
+            population=np.array([int(row['population'] or 0) for row in rows], dtype=np.int64),
+            zips=[row['zips'].split() for row in rows]
+        )
+
+    def save(self, directory: str):
+        """Write a compiled copy with memory-mappable numeric columns"""
+        os.makedirs(directory, exist_ok=True)
+        for name in NUMERIC_COLUMNS:
+            np.save(os.path.join(directory, f"{name}.npy"), np.asarray(getattr(self, name)))
+        with open(os.path.join(directory, 'places.json'), 'w', encoding='utf-8') as f:
+            json.dump({'names': self.names, 'counties': self.counties, 'zips': self.zips}, f)
+
+    @classmethod
+    def open(cls, directory: str) -> 'Gazetteer':
+        """Open a compiled copy with the numeric columns memory-mapped"""
+        with open(os.path.join(directory, 'places.json'), 'r', encoding='utf-8') as f:
+            places = json.load(f)
+        columns = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r')
+            for name in NUMERIC_COLUMNS
+        }
+        return cls(places['names'], places['counties'], zips=places['zips'], **columns)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return self.find(name) is not None
+
+    def find(self, name: str) -> Optional[int]:
+        """Get the row of a place by exact, case-insensitive name"""
+        key = name.casefold()
+        i = bisect_left(self._sorted_keys, key)
+        if i < len(self._sorted_keys) and self._sorted_keys[i] == key:
+            return self._sorted_rows[i]
+        return None
+
+    def find_zip(self, zip_code: str) -> Optional[int]:
+        """Get the most populous place a ZIP code serves, earliest row on ties"""
+        rows = self._zip_rows.get(zip_code)
+        return rows[0] if rows else None
+
+    def find_zip_all(self, zip_code: str) -> List[int]:
+        """Get every place a ZIP code serves, most populous first"""
+        return list(self._zip_rows.get(zip_code, ()))
+
+    def prefix(self, prefix: str, limit: Optional[int] = None) -> List[str]:
+        """Get place names starting with a prefix, in alphabetical order"""
+        key = prefix.casefold()
+        start = bisect_left(self._sorted_keys, key)
+        end = bisect_left(self._sorted_keys, key + '\U0010ffff', start)
+        if limit is not None:
+            end = min(end, start + limit)
+        return [self.names[self._sorted_rows[i]] for i in range(start, end)]
+
+    def place(self, row: int) -> Dict:
+        return {
+            'name': self.names[row],
+            'county': self.counties[row],
+            'lat': float(self.lats[row]),
+            'lon': float(self.lons[row]),
+            'population': int(self.population[row]),
+            'zips': list(self.zips[row])
+        }
+
+    def lookup(self, name: str) -> Optional[Dict]:
+        """Get a place record by name"""
+        row = self.find(name)
+        return None if row is None else self.place(row)
+
+    def coordinates(self) -> Dict[str, Tuple[float, float]]:
+        """Map every place name to (lat, lon)"""
+        return {
+            name: (float(lat), float(lon))
+            for name, lat, lon in zip(self.names, self.lats, self.lons)
+        }
+
+@lru_cache(maxsize=None)
+def load_gazetteer(path: str = DEFAULT_GAZETTEER_PATH) -> Gazetteer:
+    """Load a gazetteer once per process from a CSV file or a compiled directory"""
+    if os.path.isdir(path):
+        return Gazetteer.open(path)
+    return Gazetteer.from_csv(path)
@@ -1,33 +1,88 @@
 from PIL import Image
 import os
-from io import BytesIO
-import requests
+import re
+from hw_websites.server.build_manifest import fingerprint
 
 class ImageOptimizer:
-    def __init__(self, quality=85):
+    def __init__(self, quality=85, sizes=None, format='WEBP'):
         self.quality = quality
-        self.sizes = {
+        self.sizes = sizes or {
             'thumbnail': (150, 150),
             'medium': (300, 300),
             'large': (800, 800)
         }
+        # None keeps the format of each source image
+        self.format = format
+
+    def variant_paths(self, image_path, output_dir):
+        """Get the output path of every size of an image
+
+        Names keep the source extension, so project1.jpg and project1.png
+        never collide, and end in a hash of the settings the size is
+        rendered with, so changing them renders new files.
+        """
+        stem, source_ext = self._stem(image_path)
+        ext = f".{self.format.lower()}" if self.format else source_ext
+        return {
+            size_name: os.path.join(output_dir, f"{stem}_{size_name}_{self._settings(dimensions)}{ext}")
+            for size_name, dimensions in self.sizes.items()
+        }
+
+    @staticmethod
+    def _stem(image_path):
+        name, source_ext = os.path.splitext(os.path.basename(image_path))
+        stem = f"{name}_{source_ext.lstrip('.')}" if source_ext else name
+        return stem, source_ext
+
+    def _settings(self, dimensions):
+        return fingerprint(self.quality, list(dimensions), self.format)[:8]
+
+    def is_current(self, image_path, output_dir):
+        """Check whether every size of an image exists for these settings and is newer than its source"""
+        source_mtime = os.path.getmtime(image_path)
+        return all(
+            os.path.exists(path) and os.path.getmtime(path) >= source_mtime
+            for path in self.variant_paths(image_path, output_dir).values()
+        )
 
     def optimize_image(self, image_path, output_dir):
         """Optimize image and create different sizes"""
-        img = Image.open(image_path)
-
-        # Generate different sizes
-        variants = {}
-        for size_name, dimensions in self.sizes.items():
-            resized = img.copy()
-            resized.thumbnail(dimensions)
-
-            # Save optimized version
-            output_path = os.path.join(
-                output_dir,
-                f"{os.path.splitext(os.path.basename(image_path))[0]}_{size_name}.webp"
-            )
-            resized.save(output_path, 'WEBP', quality=self.quality)
-            variants[size_name] = output_path
+        variants = self.variant_paths(image_path, output_dir)
+        if self.is_current(image_path, output_dir):
+            return variants
+
+        os.makedirs(output_dir, exist_ok=True)
+        with Image.open(image_path) as img:
+            # Decode JPEGs once, at the smallest scale that still covers every size
+            img.draft(img.mode, (
+                max(width for width, _ in self.sizes.values()),
+                max(height for _, height in self.sizes.values())
+            ))
+            img.load()
+            image_format = self.format or img.format
+
+            # Generate different sizes
+            for size_name, dimensions in self.sizes.items():
+                resized = img.copy()
+                resized.thumbnail(dimensions)
 
+                # Save optimized version atomically so readers never see a partial file
+                output_path = variants[size_name]
+                tmp_path = f"{output_path}.{os.getpid()}.tmp"
+                resized.save(tmp_path, image_format, quality=self.quality, optimize=True)
+                os.replace(tmp_path, output_path)
+
+        self._prune(image_path, output_dir, variants)
         return variants
+
+    def _prune(self, image_path, output_dir, variants):
+        """Delete this image's variants rendered with other settings"""
+        stem, _ = self._stem(image_path)
+        current = {os.path.basename(path) for path in variants.values()}
+        stale = re.compile(rf"{re.escape(stem)}_[^_.]+_[0-9a-f]{{8}}\.\w+")
+        for filename in os.listdir(output_dir):
+            if filename not in current and stale.fullmatch(filename):
+                try:
+                    os.remove(os.path.join(output_dir, filename))
+                except FileNotFoundError:
+                    pass
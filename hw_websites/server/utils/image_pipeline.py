@@ -0,0 +1,101 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional
+from hw_websites.server.utils.image_optimizer import ImageOptimizer
+
+OPTIMIZED_DIRNAME = 'optimized'
+# Where a site serves the variants it keeps under assets/images/optimized/
+OPTIMIZED_URL = f'/assets/images/{OPTIMIZED_DIRNAME}'
+
+def optimized_dir_of(image_path: str) -> str:
+    """Default output directory: an optimized/ directory next to the source"""
+    return os.path.join(os.path.dirname(image_path), OPTIMIZED_DIRNAME)
+
+def variant_urls(variants: Dict[str, str], base_url: str = OPTIMIZED_URL) -> Dict[str, str]:
+    """Map the variant files of an image to the URLs pages link them by"""
+    return {size_name: f"{base_url}/{os.path.basename(path)}" for size_name, path in variants.items()}
+
+@dataclass
+class ImageReport:
+    variants: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    optimized: int = 0
+    skipped: int = 0
+    elapsed: float = 0.0
+    workers: int = 1
+
+    def summary(self) -> str:
+        lines = [
+            f"Optimized {self.optimized} image(s), {self.skipped} up to date, "
+            f"{len(self.errors)} failed in {self.elapsed:.2f}s on {self.workers} worker(s)"
+        ]
+        for image, error in sorted(self.errors.items()):
+            lines.append(f"  {image}: {error}")
+        return '\n'.join(lines)
+
+def _optimize(optimizer: ImageOptimizer, image_path: str, output_dir: str):
+    """Optimize one image in a worker process"""
+    try:
+        return image_path, optimizer.optimize_image(image_path, output_dir), None
+    except Exception as e:
+        return image_path, None, f"{type(e).__name__}: {e}"
+
+class ImagePipeline:
+    """Optimize a batch of images once each on a process pool
+
+    Sources are deduplicated across every page and site of a build, images
+    whose variants are newer than the source are skipped without leaving
+    the parent process, and the rest are decoded and resized in parallel.
+    """
+    def __init__(self, optimizer: Optional[ImageOptimizer] = None, workers: Optional[int] = None, chunksize: int = 4):
+        self.optimizer = optimizer or ImageOptimizer()
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.chunksize = max(1, chunksize)
+
+    @staticmethod
+    def collect(jobs: Iterable[Dict], key: str = 'images') -> List[str]:
+        """Get the unique source images of every job, in first-seen order"""
+        return list(dict.fromkeys(image for job in jobs for image in job.get(key, ())))
+
+    def run(self, images: Iterable[str], output_dir_of: Callable[[str], str] = optimized_dir_of) -> ImageReport:
+        """Optimize every image and return its variant paths keyed by source"""
+        start = time.perf_counter()
+        report = ImageReport(workers=self.workers)
+
+        pending = []
+        for image in dict.fromkeys(images):
+            output_dir = output_dir_of(image)
+            if not os.path.exists(image):
+                report.errors[image] = 'FileNotFoundError: source image is missing'
+            elif self.optimizer.is_current(image, output_dir):
+                report.variants[image] = self.optimizer.variant_paths(image, output_dir)
+                report.skipped += 1
+            else:
+                pending.append((image, output_dir))
+
+        if pending:
+            # A pool only pays off with more than one worker and more than one image
+            workers = min(self.workers, len(pending))
+            if workers == 1:
+                outcomes = [_optimize(self.optimizer, image, output_dir) for image, output_dir in pending]
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    outcomes = list(pool.map(
+                        _optimize,
+                        [self.optimizer] * len(pending),
+                        [image for image, _ in pending],
+                        [output_dir for _, output_dir in pending],
+                        chunksize=self.chunksize
+                    ))
+
+            for image, variants, error in outcomes:
+                if error is None:
+                    report.variants[image] = variants
+                    report.optimized += 1
+                else:
+                    report.errors[image] = error
+
+        report.elapsed = time.perf_counter() - start
+        return report
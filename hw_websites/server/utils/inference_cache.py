@@ -0,0 +1,174 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+DEFAULT_CACHE_PATH = os.path.join('.cache', 'inference.sqlite3')
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+class InferenceCache:
+    """Size-bounded on-disk LRU cache of model outputs keyed by content hash and model"""
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+            CREATE INDEX IF NOT EXISTS entries_model ON entries (model);
+        """)
+
+    @staticmethod
+    def make_key(model: str, kind: str, text: str, params: Optional[dict] = None) -> str:
+        """Hash the input text together with the model and generation parameters"""
+        payload = json.dumps([model, kind, text, params or {}], sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get_many(self, model: str, kind: str, texts: List[str], params: Optional[dict] = None) -> Dict[str, object]:
+        """Look up cached outputs for several texts at once"""
+        keys = {self.make_key(model, kind, text, params): text for text in texts}
+        found = {}
+        with self._lock:
+            key_list = list(keys)
+            # Stay below SQLite's bound parameter limit
+            for start in range(0, len(key_list), 500):
+                chunk = key_list[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM entries WHERE key IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                for key, value in rows:
+                    found[keys[key]] = json.loads(value)
+
+                if rows:
+                    self._conn.executemany(
+                        "UPDATE entries SET last_used = ? WHERE key = ?",
+                        [(time.time(), key) for key, _ in rows]
+                    )
+            self._conn.commit()
+
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def set_many(self, model: str, kind: str, outputs: Dict[str, object], params: Optional[dict] = None):
+        """Store outputs for several texts and evict least recently used entries"""
+        now = time.time()
+        rows = []
+        for text, output in outputs.items():
+            value = json.dumps(output)
+            rows.append((self.make_key(model, kind, text, params), model, kind, value, len(value), now))
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO entries (key, model, kind, value, size, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._evict()
+            self._conn.commit()
+
+    def cached(
+        self,
+        model: str,
+        kind: str,
+        texts: List[str],
+        compute: Callable[[List[str]], List[object]],
+        params: Optional[dict] = None
+    ) -> Dict[str, object]:
+        """Get outputs for texts, computing and storing only the missing ones"""
+        unique_texts = list(dict.fromkeys(texts))
+        outputs = self.get_many(model, kind, unique_texts, params)
+
+        missing = [text for text in unique_texts if text not in outputs]
+        if missing:
+            computed = dict(zip(missing, compute(missing)))
+            self.set_many(model, kind, computed, params)
+            outputs.update(computed)
+
+        return outputs
+
+    def _evict(self):
+        """Drop the least recently used entries beyond the size bound"""
+        self._conn.execute("""
+            DELETE FROM entries WHERE key IN (
+                SELECT key FROM (
+                    SELECT key, SUM(size) OVER (ORDER BY last_used DESC, key) AS running
+                    FROM entries
+                ) WHERE running > ?
+            )
+        """, (self.max_bytes,))
+
+    def invalidate(self, model: Optional[str] = None) -> int:
+        """Delete every entry produced by a model version, or all entries"""
+        with self._lock:
+            if model is None:
+                cursor = self._conn.execute("DELETE FROM entries")
+            else:
+                cursor = self._conn.execute("DELETE FROM entries WHERE model = ?", (model,))
+            self._conn.commit()
+        return cursor.rowcount
+
+    def stats(self) -> dict:
+        """Get entry counts, size and hit/miss statistics"""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+            models = dict(self._conn.execute(
+                "SELECT model, COUNT(*) FROM entries GROUP BY model"
+            ).fetchall())
+
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'bytes': size,
+            'models': models,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+    def close(self):
+        self._conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect or invalidate the inference cache')
+    parser.add_argument('command', choices=['stats', 'invalidate'])
+    parser.add_argument('--model', help='Model version whose entries should be invalidated')
+    parser.add_argument('--all', action='store_true', help='Invalidate entries of every model')
+    parser.add_argument('--path', default=DEFAULT_CACHE_PATH, help='Cache database path')
+
+    args = parser.parse_args()
+    cache = InferenceCache(args.path)
+
+    if args.command == 'stats':
+        print(json.dumps(cache.stats(), indent=2))
+    elif args.command == 'invalidate':
+        if args.model is None and not args.all:
+            parser.error('invalidate needs --model or --all')
+        removed = cache.invalidate(None if args.all else args.model)
+        print(f"Removed {removed} cached entries")
+
+    cache.close()
+
+if __name__ == "__main__":
+    main()
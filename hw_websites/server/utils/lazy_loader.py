@@ -0,0 +1,75 @@
+import importlib
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+class StartupTimer:
+    """Records the import and initialization cost of each component"""
+    def __init__(self):
+        self.timings: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, component: str, phase: str):
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start_time
+            with self._lock:
+                phases = self.timings.setdefault(component, {})
+                phases[phase] = phases.get(phase, 0.0) + elapsed
+
+    def report(self) -> str:
+        """Format the startup cost per component, slowest first"""
+        rows = sorted(
+            self.timings.items(),
+            key=lambda item: sum(item[1].values()),
+            reverse=True
+        )
+        lines = [f"{'Component':<40}{'Import (s)':>12}{'Init (s)':>12}"]
+        for component, phases in rows:
+            lines.append(
+                f"{component:<40}{phases.get('import', 0.0):>12.3f}{phases.get('init', 0.0):>12.3f}"
+            )
+        total = sum(sum(phases.values()) for phases in self.timings.values())
+        lines.append(f"{'Total':<40}{total:>24.3f}")
+        return '\n'.join(lines)
+
+startup_timer = StartupTimer()
+
+# Components may load other components while initializing
+_load_lock = threading.RLock()
+
+def lazy_import(module_path: str, component: str = None):
+    """Import a module and record the time it took"""
+    with startup_timer.measure(component or module_path, 'import'):
+        return importlib.import_module(module_path)
+
+class LazyComponent:
+    """Descriptor that imports and builds a component the first time it is used"""
+    def __init__(self, module_path: str, class_name: str):
+        self.module_path = module_path
+        self.class_name = class_name
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        with _load_lock:
+            # Another thread may have built the component while we waited
+            if self.name in instance.__dict__:
+                return instance.__dict__[self.name]
+
+            module = lazy_import(self.module_path, self.class_name)
+            with startup_timer.measure(self.class_name, 'init'):
+                component = getattr(module, self.class_name)()
+
+            # Cache on the instance so later lookups bypass the descriptor
+            instance.__dict__[self.name] = component
+            return component
@@ -0,0 +1,356 @@
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from scipy import sparse
+
+DEFAULT_INDEX_PATH = '.cache/link-index'
+
+# Pages are stored in fixed blocks of page IDs so an update only rewrites its block
+BLOCK_SIZE = 64
+# Per-term count arrays are stored as .npy files so readers can memory-map them
+ARRAY_FILES = ('term_indptr', 'term_pages', 'term_counts', 'doc_lengths')
+
+class KeywordIndex:
+    """Inverted keyword index with integer page IDs and BM25-ranked postings
+
+    Term counts live in CSR arrays: the pages containing term ``t`` are
+    ``term_pages[term_indptr[t]:term_indptr[t + 1]]`` with matching
+    ``term_counts``. BM25 weights depend on corpus-wide statistics, so
+    they are scored from the counts when needed: per term on lookup, or
+    for every posting at once into ``indptr``/``postings``/``weights``,
+    sorted by descending weight, for the link planner.
+    Page IDs are stable: a removed page leaves an empty slot behind.
+
+    Saved indexes keep the count arrays as .npy files, which opened
+    indexes memory-map so build workers share one copy, and the per-page
+    counts, contexts and linkable terms in JSON blocks of BLOCK_SIZE page
+    IDs, of which only changed blocks are rewritten. An opened index loads
+    all blocks on its first change and otherwise only the block of a page
+    whose context or linkable terms are asked for.
+    """
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.path: Optional[str] = None
+        self.read_only = False
+        self.pages: List[Optional[Dict[str, str]]] = []
+        self.page_ids: Dict[str, int] = {}
+        # None until an opened index loads its page blocks
+        self.doc_terms: Optional[List[Dict[str, int]]] = []
+        self.doc_contexts: Optional[List[Dict[str, str]]] = []
+        # Terms that occur in text links can be injected into; None means every term
+        self.doc_linkable: Optional[List[Optional[List[str]]]] = []
+        self._blocks: Dict[int, List[Dict]] = {}
+        self._block_size = BLOCK_SIZE
+        self._dirty_blocks = set()
+        self.term_ids: Dict[str, int] = {}
+        self.term_indptr = np.zeros(1, dtype=np.int64)
+        self.term_pages = np.zeros(0, dtype=np.int32)
+        self.term_counts = np.zeros(0, dtype=np.float32)
+        self.doc_lengths = np.zeros(0, dtype=np.float64)
+        self._avg_length: Optional[float] = None
+        # Postings of every term scored and sorted, built for the link planner
+        self.indptr: Optional[np.ndarray] = None
+        self.postings: Optional[np.ndarray] = None
+        self.weights: Optional[np.ndarray] = None
+        # Counts out of date with the pages, and changes not yet saved
+        self._dirty = False
+        self._unsaved = False
+
+    def _check_writable(self):
+        if self.read_only:
+            raise ValueError(f"Link index {self.path} is open read-only")
+        self._load_documents()
+
+    def _changed(self, page_id: int):
+        self._dirty_blocks.add(page_id // BLOCK_SIZE)
+        self._dirty = True
+        self._unsaved = True
+
+    def add_page(
+        self,
+        url: str,
+        title: str,
+        term_counts: Dict[str, int],
+        contexts: Optional[Dict[str, str]] = None,
+        digest: Optional[str] = None,
+        linkable: Optional[Iterable[str]] = None
+    ) -> int:
+        """Add a page with its keyword counts and return its page ID"""
+        if url in self.page_ids:
+            return self.update_page(url, title, term_counts, contexts, digest, linkable)
+
+        self._check_writable()
+        page_id = len(self.pages)
+        self.pages.append({'url': url, 'title': title, 'digest': digest})
+        self.page_ids[url] = page_id
+        self.doc_terms.append(dict(term_counts))
+        self.doc_contexts.append(dict(contexts or {}))
+        self.doc_linkable.append(None if linkable is None else sorted(set(linkable)))
+        self._changed(page_id)
+        return page_id
+
+    def update_page(
+        self,
+        url: str,
+        title: str,
+        term_counts: Dict[str, int],
+        contexts: Optional[Dict[str, str]] = None,
+        digest: Optional[str] = None,
+        linkable: Optional[Iterable[str]] = None
+    ) -> int:
+        """Replace the keyword counts of an indexed page, keeping its page ID"""
+        if url not in self.page_ids:
+            return self.add_page(url, title, term_counts, contexts, digest, linkable)
+
+        self._check_writable()
+        page_id = self.page_ids[url]
+        self.pages[page_id] = {'url': url, 'title': title, 'digest': digest}
+        self.doc_terms[page_id] = dict(term_counts)
+        self.doc_contexts[page_id] = dict(contexts or {})
+        self.doc_linkable[page_id] = None if linkable is None else sorted(set(linkable))
+        self._changed(page_id)
+        return page_id
+
+    def remove_page(self, url: str) -> bool:
+        """Remove a page from the index, leaving its ID unused"""
+        if url not in self.page_ids:
+            return False
+
+        self._check_writable()
+        page_id = self.page_ids.pop(url)
+        self.pages[page_id] = None
+        self.doc_terms[page_id] = {}
+        self.doc_contexts[page_id] = {}
+        self.doc_linkable[page_id] = []
+        self._changed(page_id)
+        return True
+
+    def digest_of(self, url: str) -> Optional[str]:
+        """Get the content digest a page was last indexed from"""
+        page_id = self.page_ids.get(url)
+        if page_id is None:
+            return None
+        return self.pages[page_id].get('digest')
+
+    def urls(self) -> List[str]:
+        return list(self.page_ids)
+
+    def linkable_terms(self, page_id: int) -> Optional[List[str]]:
+        """Get the terms links can be injected for on a page, or None if every term can be"""
+        return self._document(page_id)['linkable']
+
+    def _document(self, page_id: int) -> Dict:
+        if self.doc_terms is not None:
+            return {
+                'terms': self.doc_terms[page_id],
+                'contexts': self.doc_contexts[page_id],
+                'linkable': self.doc_linkable[page_id]
+            }
+
+        # Only the page's own block is read
+        block, offset = divmod(page_id, self._block_size)
+        if block not in self._blocks:
+            self._blocks[block] = _read_json(os.path.join(self.path, 'pages', f"{block}.json"))
+        entry = self._blocks[block][offset]
+        return {'terms': entry['terms'], 'contexts': entry['contexts'], 'linkable': entry.get('linkable')}
+
+    def _load_documents(self):
+        if self.doc_terms is not None:
+            return
+        documents = [self._document(page_id) for page_id in range(len(self.pages))]
+        self.doc_terms = [document['terms'] for document in documents]
+        self.doc_contexts = [document['contexts'] for document in documents]
+        self.doc_linkable = [document['linkable'] for document in documents]
+        self._blocks = {}
+        if self._block_size != BLOCK_SIZE:
+            # Blocks saved with another size are rewritten in the current layout
+            self._block_size = BLOCK_SIZE
+            self._dirty_blocks = set(range(-(-len(self.pages) // BLOCK_SIZE)))
+            self._unsaved = True
+
+    def build(self):
+        """Rebuild the per-term count arrays from the page counts and score every posting"""
+        self._load_documents()
+        vocabulary = {}
+        rows, cols, counts = [], [], []
+        for page_id, terms in enumerate(self.doc_terms):
+            for term, count in terms.items():
+                rows.append(vocabulary.setdefault(term, len(vocabulary)))
+                cols.append(page_id)
+                counts.append(count)
+
+        matrix = sparse.csr_matrix(
+            (np.asarray(counts, dtype=np.float64), (rows, cols)),
+            shape=(len(vocabulary), len(self.pages))
+        )
+        matrix.sum_duplicates()
+
+        self.term_ids = vocabulary
+        self.term_indptr = matrix.indptr.astype(np.int64)
+        self.term_pages = matrix.indices.astype(np.int32)
+        self.term_counts = matrix.data.astype(np.float32)
+        self.doc_lengths = np.asarray(matrix.sum(axis=0), dtype=np.float64).ravel()
+        self._avg_length = None
+        self._dirty = False
+        self._score()
+
+    def _bm25(self, tf: np.ndarray, doc_freq, pages: np.ndarray) -> np.ndarray:
+        # BM25: idf per term, term frequency saturated against page length;
+        # removed pages have no terms and are left out of the averages
+        page_count = len(self.page_ids)
+        if self._avg_length is None:
+            self._avg_length = float(np.sum(self.doc_lengths)) / page_count if page_count else 0.0
+        idf = np.log(1.0 + (page_count - doc_freq + 0.5) / (doc_freq + 0.5))
+        length_norm = 1.0 - self.b + self.b * self.doc_lengths[pages] / (self._avg_length or 1.0)
+        return idf * tf * (self.k1 + 1.0) / (tf + self.k1 * length_norm)
+
+    def _score(self):
+        """Score every posting in one vectorized pass over the count arrays"""
+        doc_freq = np.diff(self.term_indptr)
+        term_of_entry = np.repeat(np.arange(len(doc_freq)), doc_freq)
+        pages = np.asarray(self.term_pages)
+        weights = self._bm25(np.asarray(self.term_counts, dtype=np.float64), doc_freq[term_of_entry], pages)
+
+        # Sort each term's postings by descending weight, ties by page ID
+        order = np.lexsort((pages, -weights, term_of_entry))
+        self.indptr = np.asarray(self.term_indptr, dtype=np.int64)
+        self.postings = pages[order].astype(np.int32)
+        self.weights = weights[order].astype(np.float32)
+
+    def ensure_built(self):
+        """Rebuild the counts if pages changed and score every posting"""
+        if self._dirty:
+            self.build()
+        elif self.weights is None:
+            self._score()
+
+    def lookup(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the page IDs and weights for a term, best first"""
+        if self._dirty:
+            self.build()
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+        start, end = self.term_indptr[term_id], self.term_indptr[term_id + 1]
+        if self.weights is not None:
+            return self.postings[start:end], self.weights[start:end]
+
+        # Score just this term from the mapped counts
+        pages = np.asarray(self.term_pages[start:end], dtype=np.int32)
+        weights = self._bm25(np.asarray(self.term_counts[start:end], dtype=np.float64), end - start, pages)
+        order = np.lexsort((pages, -weights))
+        return pages[order], weights[order].astype(np.float32)
+
+    def best_target(self, term: str, exclude_url: Optional[str] = None) -> Optional[Dict[str, str]]:
+        """Get the highest-scoring page for a term other than the excluded page"""
+        page_ids, _ = self.lookup(term)
+        exclude_id = self.page_ids.get(exclude_url)
+
+        # A page appears once per term, so at most one posting is skipped
+        for page_id in page_ids[:2]:
+            if page_id != exclude_id:
+                return self.pages[page_id]
+        return None
+
+    def context(self, term: str, url: str) -> str:
+        """Get the stored context of a term on a page"""
+        page_id = self.page_ids.get(url)
+        if page_id is None:
+            return ""
+        return self._document(page_id)['contexts'].get(term, "")
+
+    def save(self, path: Optional[str] = None):
+        """Write the changed page blocks and the count arrays to a directory"""
+        path = path or self.path
+        if path != self.path:
+            # A new location needs every block
+            self._load_documents()
+            self._dirty_blocks = set(range(-(-len(self.pages) // BLOCK_SIZE)))
+            self._unsaved = True
+        if not self._unsaved and self.exists(path):
+            return
+        if self._dirty:
+            self.build()
+        os.makedirs(os.path.join(path, 'pages'), exist_ok=True)
+
+        for block in sorted(self._dirty_blocks):
+            start = block * BLOCK_SIZE
+            end = min(start + BLOCK_SIZE, len(self.pages))
+            _write_json(os.path.join(path, 'pages', f"{block}.json"), [
+                {
+                    'page': self.pages[page_id],
+                    'terms': self.doc_terms[page_id],
+                    'contexts': self.doc_contexts[page_id],
+                    'linkable': self.doc_linkable[page_id]
+                }
+                for page_id in range(start, end)
+            ])
+        # The page table, vocabulary and counts are small next to the blocks and change with any page
+        _write_json(os.path.join(path, 'pages.json'), self.pages)
+        _write_json(os.path.join(path, 'terms.json'), sorted(self.term_ids, key=self.term_ids.get))
+        for name in ARRAY_FILES:
+            _write_array(os.path.join(path, f"{name}.npy"), getattr(self, name))
+        # Written last, so a reader never sees a page count ahead of its blocks
+        _write_json(os.path.join(path, 'index.json'), {
+            'k1': self.k1,
+            'b': self.b,
+            'block_size': BLOCK_SIZE,
+            'page_count': len(self.pages)
+        })
+        self._dirty_blocks = set()
+        self._unsaved = False
+        self.path = path
+
+    @classmethod
+    def open(cls, path: str = DEFAULT_INDEX_PATH, read_only: bool = False) -> 'KeywordIndex':
+        """Open a saved index with memory-mapped count arrays
+
+        Every process that opens the same index shares the mapped arrays;
+        lookups score their term from them, and page blocks are only read
+        when a context is asked for or, for writers, the index changes.
+        """
+        meta = _read_json(os.path.join(path, 'index.json'))
+        index = cls(meta['k1'], meta['b'])
+        index.path = path
+        index.read_only = read_only
+        index._block_size = meta['block_size']
+
+        index.pages = _read_json(os.path.join(path, 'pages.json'))[:meta['page_count']]
+        index.page_ids = {
+            page['url']: page_id
+            for page_id, page in enumerate(index.pages)
+            if page is not None
+        }
+        index.term_ids = {term: term_id for term_id, term in enumerate(_read_json(os.path.join(path, 'terms.json')))}
+        for name in ARRAY_FILES:
+            setattr(index, name, np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r'))
+
+        index.doc_terms = None
+        index.doc_contexts = None
+        index.doc_linkable = None
+        return index
+
+    @classmethod
+    def exists(cls, path: str = DEFAULT_INDEX_PATH) -> bool:
+        return os.path.exists(os.path.join(path, 'index.json'))
+
+    def __len__(self):
+        return len(self.page_ids)
+
+def _read_json(path: str):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _write_json(path: str, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+def _write_array(path: str, array: np.ndarray):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.save(f, np.ascontiguousarray(array))
+    os.replace(tmp_path, path)
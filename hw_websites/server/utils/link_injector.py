@@ -0,0 +1,128 @@
+import re
+from html import escape
+from html.parser import HTMLParser
+from io import StringIO
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+# Text inside these elements is never linked
+SKIP_TAGS = frozenset({'a', 'h1', 'script', 'style'})
+
+_NEWLINE = re.compile(r'\n')
+
+TermFinder = Callable[[str], Iterable[Tuple[int, int, str]]]
+TargetResolver = Callable[[str], Optional[Dict[str, str]]]
+
+class LinkInjector(HTMLParser):
+    """Streaming HTML rewriter that links keyword occurrences in one pass
+
+    The page is copied to the output buffer verbatim, up to each linkable
+    text node as it is tokenized; only text outside skipped elements and
+    comments is rewritten. Each keyword and each target is linked at most
+    once per page.
+    """
+    def __init__(self, find_terms: TermFinder, resolve: TargetResolver, max_links: int = 3):
+        super().__init__(convert_charrefs=False)
+        self.find_terms = find_terms
+        self.resolve = resolve
+        self.max_links = max_links
+        self._output = StringIO()
+        self._content = ''
+        self._line_starts = [0]
+        self._copied = 0
+        self._skip_depth = 0
+        self._linked_terms = set()
+        self._linked_urls = set()
+        # Term -> target of every link added, in page order
+        self.links: Dict[str, Dict[str, str]] = {}
+        self.links_added = 0
+
+    def rewrite(self, content: str) -> str:
+        """Rewrite one page and return the linked HTML"""
+        self._content = content
+        self._line_starts = [0] + [match.end() for match in _NEWLINE.finditer(content)]
+        self.feed(content)
+        self.close()
+        # Copy whatever follows the last rewritten text node
+        self._output.write(content[self._copied:])
+        return self._output.getvalue()
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+
+    def handle_startendtag(self, tag, attrs):
+        # A self-closing tag never opens a skipped element
+        pass
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if self._skip_depth or self.links_added >= self.max_links:
+            return
+
+        # With convert_charrefs off, text nodes are exact slices of the page
+        line, column = self.getpos()
+        start = self._line_starts[line - 1] + column
+        if self._content[start:start + len(data)] != data:
+            return
+
+        linked = self._link_text(data)
+        if linked != data:
+            self._output.write(self._content[self._copied:start])
+            self._output.write(linked)
+            self._copied = start + len(data)
+
+    def _link_text(self, text: str) -> str:
+        # Earliest match first, preferring the longest phrase at a position
+        matches = sorted(self.find_terms(text), key=lambda match: (match[0], match[0] - match[1]))
+        pieces = []
+        position = 0
+
+        for start, end, term in matches:
+            if self.links_added >= self.max_links:
+                break
+            if start < position or term in self._linked_terms:
+                continue
+
+            target = self.resolve(term)
+            if target is None or target['url'] in self._linked_urls:
+                continue
+
+            pieces.append(text[position:start])
+            pieces.append(
+                f'<a href="{escape(target["url"])}" title="{escape(target["title"])}">'
+                f'{text[start:end]}</a>'
+            )
+            position = end
+            self._linked_terms.add(term)
+            self._linked_urls.add(target['url'])
+            self.links[term] = target
+            self.links_added += 1
+
+        pieces.append(text[position:])
+        return ''.join(pieces)
+
+def linkable_terms(content: str, find_terms: TermFinder) -> Set[str]:
+    """Collect the terms a LinkInjector could link in content
+
+    A term only counts where it stands on its own: an occurrence inside a
+    longer match, such as "road" in "road construction", is linked as the
+    phrase, so a word that only ever occurs inside phrases is left out.
+    """
+    terms = set()
+
+    def collect(text):
+        matches = sorted(find_terms(text), key=lambda match: (match[0], match[0] - match[1]))
+        # Walk matches by start, keeping the furthest end seen so far; ties at a start are longest first
+        cover_end = -1
+        for start, end, term in matches:
+            if end <= cover_end:
+                continue
+            terms.add(term)
+            cover_end = end
+        return ()
+
+    LinkInjector(collect, lambda term: None, max_links=float('inf')).rewrite(content)
+    return terms
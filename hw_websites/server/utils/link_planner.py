@@ -0,0 +1,227 @@
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+import numpy as np
+from scipy import sparse
+from hw_websites.server.utils.lazy_loader import lazy_import
+from hw_websites.server.utils.link_index import KeywordIndex
+
+@dataclass
+class LinkPlan:
+    """Site-wide link graph chosen by the planner"""
+    links: Dict[str, Dict[str, Dict[str, str]]] = field(default_factory=dict)
+    scores: Dict[tuple, float] = field(default_factory=dict)
+    pagerank: Dict[str, float] = field(default_factory=dict)
+
+    def inbound(self) -> Dict[str, int]:
+        counts = {url: 0 for url in self.pagerank}
+        for targets in self.links.values():
+            for target in targets.values():
+                counts[target['url']] = counts.get(target['url'], 0) + 1
+        return counts
+
+    def summary(self) -> str:
+        link_count = sum(len(targets) for targets in self.links.values())
+        orphans = sum(1 for count in self.inbound().values() if count == 0)
+        top = sorted(self.pagerank.items(), key=lambda item: item[1], reverse=True)[:3]
+        top_pages = ', '.join(f"{url} ({rank:.3f})" for url, rank in top)
+        return f"Planned {link_count} links across {len(self.pagerank)} pages, {orphans} without inbound links; top equity: {top_pages}"
+
+    def to_networkx(self):
+        """Export the planned link graph as a networkx DiGraph; networkx is optional"""
+        nx = lazy_import('networkx')
+
+        graph = nx.DiGraph()
+        for url, rank in self.pagerank.items():
+            graph.add_node(url, pagerank=rank)
+        for source, targets in self.links.items():
+            for term, target in targets.items():
+                graph.add_edge(
+                    source,
+                    target['url'],
+                    term=term,
+                    title=target['title'],
+                    score=self.scores.get((source, target['url']), 0.0)
+                )
+        return graph
+
+class LinkPlanner:
+    """Assigns internal links for the whole site at once
+
+    Candidate links pair each page's strongest keywords with the strongest
+    other pages for those keywords, scored by the product of both BM25
+    weights. A greedy pass over all candidates, best first, first gives
+    every page up to ``min_inbound`` links and then fills each page's
+    outbound budget, never linking a keyword or a target twice from one page.
+    """
+    def __init__(
+        self,
+        max_outbound: int = 3,
+        min_inbound: int = 1,
+        max_inbound: Optional[int] = None,
+        terms_per_page: int = 20,
+        targets_per_term: int = 3,
+        damping: float = 0.85
+    ):
+        self.max_outbound = max_outbound
+        self.min_inbound = min_inbound
+        self.max_inbound = max_inbound
+        self.terms_per_page = terms_per_page
+        self.targets_per_term = targets_per_term
+        self.damping = damping
+
+    def candidates(self, index: KeywordIndex):
+        """Score candidate (source, target, term) links from the index postings"""
+        index.ensure_built()
+        page_count = len(index.pages)
+        term_count = len(index.term_ids)
+        if not term_count or not page_count:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty, np.zeros(0)
+
+        # Page x term weights, to pick each page's strongest terms
+        indptr = np.asarray(index.indptr)
+        postings = np.asarray(index.postings)
+        weights = np.asarray(index.weights, dtype=np.float64)
+        by_term = sparse.csr_matrix((weights, postings, indptr), shape=(term_count, page_count))
+        by_page = by_term.T.tocsr()
+
+        sources, terms, source_weights = [], [], []
+        for page_id in range(page_count):
+            start, end = by_page.indptr[page_id], by_page.indptr[page_id + 1]
+            if start == end:
+                continue
+            row = by_page.data[start:end]
+            row_terms = by_page.indices[start:end]
+            # Terms only in the title or markup have no text to carry a link
+            linkable = index.linkable_terms(page_id)
+            if linkable is not None:
+                linkable_ids = [index.term_ids[term] for term in linkable if term in index.term_ids]
+                in_text = np.isin(row_terms, linkable_ids)
+                row, row_terms = row[in_text], row_terms[in_text]
+            keep = np.argsort(-row, kind='stable')[:self.terms_per_page]
+            sources.append(np.full(len(keep), page_id))
+            terms.append(row_terms[keep])
+            source_weights.append(row[keep])
+
+        if not sources:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty, np.zeros(0)
+        sources = np.concatenate(sources)
+        terms = np.concatenate(terms)
+        source_weights = np.concatenate(source_weights)
+
+        # The best postings of each term, up to one extra to make room for the source itself
+        depth = self.targets_per_term + 1
+        offsets = indptr[terms][:, None] + np.arange(depth)[None, :]
+        valid = offsets < indptr[terms + 1][:, None]
+        offsets = np.where(valid, offsets, 0)
+        targets = postings[offsets] if len(postings) else np.zeros_like(offsets)
+        valid &= targets != sources[:, None]
+        scores = source_weights[:, None] * weights[offsets]
+
+        rows, cols = np.nonzero(valid)
+        return sources[rows], targets[rows, cols], terms[rows], scores[rows, cols]
+
+    def plan(self, index: KeywordIndex) -> LinkPlan:
+        """Choose every page's outbound links and compute the resulting link equity"""
+        sources, targets, terms, scores = self.candidates(index)
+        order = np.argsort(-scores, kind='stable')
+        sources, targets, terms, scores = sources[order], targets[order], terms[order], scores[order]
+
+        outbound = [0] * len(index.pages)
+        inbound = [0] * len(index.pages)
+        linked_pairs = set()
+        linked_terms = set()
+        accepted = []
+
+        source_list, target_list, term_list = sources.tolist(), targets.tolist(), terms.tolist()
+
+        def assign(candidate_indices, inbound_cap):
+            for i in candidate_indices:
+                source, target, term = source_list[i], target_list[i], term_list[i]
+                if outbound[source] >= self.max_outbound or inbound[target] >= inbound_cap:
+                    continue
+                if (source, target) in linked_pairs or (source, term) in linked_terms:
+                    continue
+                linked_pairs.add((source, target))
+                linked_terms.add((source, term))
+                outbound[source] += 1
+                inbound[target] += 1
+                accepted.append(i)
+
+        candidate_indices = range(len(scores))
+        if self.min_inbound:
+            assign(candidate_indices, self.min_inbound)
+        assign(candidate_indices, self.max_inbound or float('inf'))
+
+        term_names = sorted(index.term_ids, key=index.term_ids.get)
+        plan = LinkPlan()
+        for i in accepted:
+            source = index.pages[sources[i]]['url']
+            target = index.pages[targets[i]]
+            plan.links.setdefault(source, {})[term_names[terms[i]]] = target
+            plan.scores[(source, target['url'])] = float(scores[i])
+
+        accepted = np.asarray(accepted, dtype=np.int64)
+        plan.pagerank = self._page_ranks(index, sources[accepted], targets[accepted])
+        return plan
+
+    def reconcile(self, index: KeywordIndex, plan: LinkPlan, injected: Dict[str, Dict[str, Dict[str, str]]]) -> LinkPlan:
+        """Narrow a plan to the links actually added to each page and rerank"""
+        page_ids = {page['url']: page_id for page_id, page in enumerate(index.pages) if page is not None}
+        reconciled = LinkPlan()
+        sources, targets = [], []
+        for url, links in injected.items():
+            if not links:
+                continue
+            reconciled.links[url] = dict(links)
+            for target in links.values():
+                pair = (url, target['url'])
+                reconciled.scores[pair] = plan.scores.get(pair, 0.0)
+                if url in page_ids and target['url'] in page_ids:
+                    sources.append(page_ids[url])
+                    targets.append(page_ids[target['url']])
+
+        reconciled.pagerank = self._page_ranks(
+            index,
+            np.asarray(sources, dtype=np.int64),
+            np.asarray(targets, dtype=np.int64)
+        )
+        return reconciled
+
+    def _page_ranks(self, index: KeywordIndex, sources: np.ndarray, targets: np.ndarray) -> Dict[str, float]:
+        live = np.array([page is not None for page in index.pages], dtype=bool)
+        ranks = self.pagerank(sources, targets, live)
+        return {
+            page['url']: float(ranks[page_id])
+            for page_id, page in enumerate(index.pages)
+            if page is not None
+        }
+
+    def pagerank(self, sources: np.ndarray, targets: np.ndarray, live: np.ndarray,
+                 tolerance: float = 1e-10, max_iterations: int = 100) -> np.ndarray:
+        """PageRank of the link graph by sparse power iteration over the live pages"""
+        page_count = len(live)
+        live_count = live.sum()
+        if not live_count:
+            return np.zeros(page_count)
+        teleport = live / live_count
+
+        adjacency = sparse.csr_matrix(
+            (np.ones(len(sources)), (sources, targets)),
+            shape=(page_count, page_count)
+        )
+        out_degree = np.asarray(adjacency.sum(axis=1)).ravel()
+        dangling = (out_degree == 0) & live
+        inverse_degree = np.divide(1.0, out_degree, out=np.zeros(page_count), where=out_degree > 0)
+        transition = (sparse.diags(inverse_degree) @ adjacency).T.tocsr()
+
+        ranks = teleport.copy()
+        for _ in range(max_iterations):
+            # Rank of pages without outbound links is spread evenly
+            spread = ranks[dangling].sum() * teleport
+            updated = self.damping * (transition @ ranks + spread) + (1.0 - self.damping) * teleport
+            if np.abs(updated - ranks).sum() < tolerance:
+                return updated
+            ranks = updated
+        return ranks
@@ -1,85 +1,183 @@
-from typing import List, Dict
-import geocoder
-import folium
-from geopy.distance import geodesic
+import hashlib
+import json
+import math
+import os
+import re
+from html import escape
+from functools import cached_property, lru_cache
+from typing import List, Dict, Optional
+from hw_websites.server.utils.fragment_cache import fragment_cache
+from hw_websites.server.utils.gazetteer import load_gazetteer
+from hw_websites.server.utils.spatial_index import GeoIndex
+
+MAP_SHELL_FILENAME = 'service-area-map.js'
+MAP_SHELL_SOURCE = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), '..', '..', 'assets', 'js', MAP_SHELL_FILENAME)
+)
+SERVICE_AREA_DATA_DIR = 'data/service-areas'
+MILES_PER_DEGREE_LATITUDE = 69.05
+
+def slugify(name: str) -> str:
+    return '-'.join(''.join(char if char.isalnum() else ' ' for char in name.lower()).split())
+
+@lru_cache(maxsize=None)
+def _map_shell() -> str:
+    with open(MAP_SHELL_SOURCE, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def _publish(path: str, content: str):
+    """Write a shared asset atomically, skipping files that already have the content"""
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+def _prune_payloads(directory: str, slug: str, keep: str):
+    """Delete a city's earlier payloads once its current one is published"""
+    stale = re.compile(rf"{re.escape(slug)}-[0-9a-f]{{12}}\.json")
+    for name in os.listdir(directory):
+        if name != keep and stale.fullmatch(name):
+            try:
+                os.remove(os.path.join(directory, name))
+            except FileNotFoundError:
+                # Another worker pruned it first
+                pass
 
 class LocationManager:
-    def __init__(self):
+    def __init__(self, fragments=None):
+        self.fragments = fragment_cache if fragments is None else fragments
         self.service_radius = 50  # miles
         self.florida_cities = self._load_florida_cities()
 
+    @cached_property
+    def geo_index(self) -> GeoIndex:
+        """Spatial index over the city coordinates"""
+        return GeoIndex.from_places(self.florida_cities)
+
     def _load_florida_cities(self) -> Dict[str, tuple]:
-        """Load major Florida cities and their coordinates"""
-        return {
-            'Miami': (25.7617, -80.1918),
-            'Fort Lauderdale': (26.1224, -80.1373),
-            'West Palm Beach': (26.7153, -80.0534),
-            'Boca Raton': (26.3683, -80.1289),
-            'Pompano Beach': (26.2379, -80.1248),
-            'Hollywood': (26.0112, -80.1495),
-            'Coral Springs': (26.2707, -80.2706),
-            'Deerfield Beach': (26.3184, -80.0998),
-            # Add more cities as needed
-        }
+        """Load Florida places and their coordinates from the packaged gazetteer"""
+        return load_gazetteer().coordinates()
 
     def generate_service_areas(self, base_city: str) -> List[str]:
         """Generate list of cities within service radius"""
         if base_city not in self.florida_cities:
             return []
 
-        base_coords = self.florida_cities[base_city]
-        service_areas = []
-
-        for city, coords in self.florida_cities.items():
-            if city != base_city:
-                distance = geodesic(base_coords, coords).miles
-                if distance <= self.service_radius:
-                    service_areas.append({
-                        'name': city,
-                        'distance': round(distance, 1)
-                    })
+        # Neighbors come from the distance table cached per radius, nearest first
+        return [
+            {'name': city, 'distance': round(distance, 1)}
+            for city, distance in self.geo_index.neighbors(base_city, self.service_radius)
+        ]
+
+    def service_area_payload(self, base_city: str) -> Dict:
+        """Center, radius and neighboring cities for the shared map shell"""
+        lat, lon = self.florida_cities[base_city]
+        markers = []
+        for area in self.generate_service_areas(base_city):
+            area_lat, area_lon = self.florida_cities[area['name']]
+            markers.append({
+                'name': area['name'],
+                'lat': area_lat,
+                'lon': area_lon,
+                'distance': area['distance']
+            })
 
-        return sorted(service_areas, key=lambda x: x['distance'])
+        return {
+            'name': base_city,
+            'center': [lat, lon],
+            'zoom': 10,
+            'radius_miles': self.service_radius,
+            'markers': markers
+        }
 
-    def generate_service_area_map(self, base_city: str, output_path: str):
-        """Generate interactive service area map"""
+    def generate_service_area_map(
+        self,
+        base_city: str,
+        assets_dir: str = 'assets',
+        assets_url: str = '/assets'
+    ) -> Optional[str]:
+        """Publish the map shell and a content-addressed JSON payload for a city
+
+        Returns the payload URL. Identical payloads share one file, so every
+        brand serving a city reuses the same cacheable asset; the city's
+        payloads from earlier data are deleted.
+        """
         if base_city not in self.florida_cities:
-            return
-
-        base_coords = self.florida_cities[base_city]
-        m = folium.Map(location=base_coords, zoom_start=10)
-
-        # Add marker for base city
-        folium.Marker(
-            base_coords,
-            popup=f"<b>{base_city}</b><br>Main Office",
-            icon=folium.Icon(color='red', icon='info-sign')
-        ).add_to(m)
-
-        # Add service area circle
-        folium.Circle(
-            base_coords,
-            radius=self.service_radius * 1609.34,  # Convert miles to meters
-            color='blue',
-            fill=True,
-            popup='Service Area'
-        ).add_to(m)
-
-        # Add markers for service areas
-        service_areas = self.generate_service_areas(base_city)
-        for area in service_areas:
-            city = area['name']
-            coords = self.florida_cities[city]
-            folium.Marker(
-                coords,
-                popup=f"<b>{city}</b><br>{area['distance']} miles from {base_city}",
-                icon=folium.Icon(color='green')
-            ).add_to(m)
+            return None
+
+        payload = json.dumps(self.service_area_payload(base_city), sort_keys=True, separators=(',', ':'))
+        digest = hashlib.sha256(payload.encode('utf-8')).hexdigest()[:12]
+        slug = slugify(base_city)
+        filename = f"{slug}-{digest}.json"
+        data_dir = os.path.join(assets_dir, SERVICE_AREA_DATA_DIR)
 
-        m.save(output_path)
+        _publish(os.path.join(assets_dir, 'js', MAP_SHELL_FILENAME), _map_shell())
+        _publish(os.path.join(data_dir, filename), payload)
+        _prune_payloads(data_dir, slug, filename)
+        return f"{assets_url}/{SERVICE_AREA_DATA_DIR}/{filename}"
 
-    def generate_service_area_content(self, base_city: str) -> str:
+    def render_service_area_svg(self, base_city: str, width: int = 640, height: int = 384) -> str:
+        """Render a static, dependency-free SVG of the service radius and neighboring cities
+
+        Coordinates use an equirectangular projection centered on the city
+        with longitude scaled by cos(latitude), which keeps the service
+        radius circular at this scale.
+        """
+        if base_city not in self.florida_cities:
+            return ''
+
+        lat0, lon0 = self.florida_cities[base_city]
+        lon_scale = math.cos(math.radians(lat0))
+        radius_degrees = self.service_radius / MILES_PER_DEGREE_LATITUDE
+        # Leave a margin around the service radius
+        scale = min(width, height) / 2 / (radius_degrees * 1.15)
+        center_x, center_y = width / 2, height / 2
+
+        def project(lat, lon):
+            x = center_x + (lon - lon0) * lon_scale * scale
+            y = center_y - (lat - lat0) * scale
+            return round(x, 1), round(y, 1)
+
+        markers = []
+        for area in self.generate_service_areas(base_city):
+            x, y = project(*self.florida_cities[area['name']])
+            name = escape(area['name'])
+            markers.append(
+                f'<g><title>{name}: {area["distance"]} miles</title>'
+                f'<circle cx="{x}" cy="{y}" r="4" fill="#16a34a"/>'
+                f'<text x="{x + 6}" y="{y + 4}" font-size="11" fill="#1f2937">{name}</text></g>'
+            )
+
+        name = escape(base_city)
+        return (
+            f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" '
+            f'width="100%" height="100%" preserveAspectRatio="xMidYMid meet" role="img" '
+            f'aria-label="Service area within {self.service_radius} miles of {name}">'
+            f'<rect width="{width}" height="{height}" fill="#eff6ff"/>'
+            f'<circle cx="{center_x}" cy="{center_y}" r="{round(radius_degrees * scale, 1)}" '
+            f'fill="#3b82f6" fill-opacity="0.12" stroke="#2563eb" stroke-width="2"/>'
+            f'{"".join(markers)}'
+            f'<circle cx="{center_x}" cy="{center_y}" r="6" fill="#dc2626" stroke="#fff" stroke-width="2"/>'
+            f'<text x="{center_x + 9}" y="{center_y + 5}" font-size="13" font-weight="bold" fill="#111827">{name}</text>'
+            '</svg>'
+        )
+
+    def generate_service_area_content(self, base_city: str, map_url: Optional[str] = None) -> str:
         """Generate HTML content for service areas"""
+        # The payload holds every coordinate and distance the section and its SVG are drawn from
+        payload = self.service_area_payload(base_city) if base_city in self.florida_cities else None
+        return self.fragments.get_or_render(
+            'service_area_content',
+            (base_city, map_url, payload),
+            lambda: self._render_service_area_content(base_city, map_url)
+        )
+
+    def _render_service_area_content(self, base_city: str, map_url: Optional[str]) -> str:
         service_areas = self.generate_service_areas(base_city)
 
         content = f"""
@@ -98,12 +196,24 @@ class LocationManager:
                 </div>
             """
 
-        content += """
+        # The static SVG is the map; the shared map shell swaps in the interactive
+        # map from the city's JSON payload only when the visitor asks for it
+        map_attributes = f' data-service-area="{map_url}"' if map_url else ''
+        map_button = ''
+        if map_url:
+            map_button = """
+                <button type="button" data-service-area-load
+                        class="absolute bottom-4 right-4 bg-white px-4 py-2 rounded shadow text-blue-600">
+                    View interactive map
+                </button>"""
+        content += f"""
             </div>
-            <div id="service-area-map" class="mt-8 h-96 rounded-lg overflow-hidden shadow-lg">
-                <!-- Map will be loaded here -->
+            <div id="service-area-map" class="relative mt-8 h-96 rounded-lg overflow-hidden shadow-lg"{map_attributes}>
+                {self.render_service_area_svg(base_city)}{map_button}
             </div>
         </section>
         """
+        if map_url:
+            content += f'<script src="/assets/js/{MAP_SHELL_FILENAME}" defer></script>'
 
         return content
@@ -0,0 +1,123 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional
+from urllib.parse import urljoin, urlsplit
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+
+@dataclass
+class ProbeResult:
+    url: str
+    status: int = 0
+    ttfb: float = 0.0
+    total_time: float = 0.0
+    bytes: int = 0
+    headers: Dict[str, str] = field(default_factory=dict)
+    error: Optional[str] = None
+
+class ProbeTimeout(Exception):
+    pass
+
+class AsyncPageProbe:
+    """Measures many pages concurrently over pooled keep-alive connections
+
+    Requests go through one requests session whose connection pool holds
+    per_host_limit connections per host. A per-host semaphore is acquired
+    before a URL's clock and deadline start, so time spent queued behind
+    other URLs of the same host is never measured or timed out.
+    """
+    def __init__(
+        self,
+        timeout: float = 10.0,
+        per_host_limit: int = 4,
+        max_redirects: int = 5,
+        max_workers: int = 32,
+        user_agent: str = 'hw-websites-probe/1.0'
+    ):
+        self.timeout = timeout
+        self.per_host_limit = per_host_limit
+        self.max_redirects = max_redirects
+        self.max_workers = max_workers
+        self.user_agent = user_agent
+        self._limits: Dict[str, asyncio.Semaphore] = {}
+        self.connections_opened = 0
+
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': self.user_agent, 'Accept': '*/*'})
+        adapter = HTTPAdapter(pool_maxsize=per_host_limit, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._adapter = adapter
+
+    def run(self, urls: Iterable[str]) -> Dict[str, ProbeResult]:
+        """Probe a batch of URLs from synchronous code"""
+        return asyncio.run(self.probe_all(urls))
+
+    async def probe_all(self, urls: Iterable[str]) -> Dict[str, ProbeResult]:
+        """Probe a batch of URLs concurrently"""
+        unique_urls = list(dict.fromkeys(urls))
+        # Blocking requests run on threads; the semaphores bound how many hit each host
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='page-probe')
+        try:
+            results = await asyncio.gather(*(self.probe(url, executor) for url in unique_urls))
+        finally:
+            executor.shutdown(wait=True)
+            self.close()
+        return {result.url: result for result in results}
+
+    async def probe(self, url: str, executor=None) -> ProbeResult:
+        """Fetch one URL, following redirects, once a slot for its host is free"""
+        host = urlsplit(url).netloc
+        if host not in self._limits:
+            self._limits[host] = asyncio.Semaphore(self.per_host_limit)
+
+        async with self._limits[host]:
+            return await asyncio.get_running_loop().run_in_executor(executor, self._probe, url)
+
+    def _probe(self, url: str) -> ProbeResult:
+        """Fetch one URL within a deadline covering every redirect hop and the body"""
+        result = ProbeResult(url=url)
+        start_time = time.perf_counter()
+        deadline = start_time + self.timeout
+
+        def remaining():
+            left = deadline - time.perf_counter()
+            if left <= 0:
+                raise ProbeTimeout()
+            return left
+
+        try:
+            current_url = url
+            for _ in range(self.max_redirects + 1):
+                with self.session.get(current_url, stream=True, allow_redirects=False, timeout=remaining()) as response:
+                    if not result.ttfb:
+                        result.ttfb = time.perf_counter() - start_time
+                    result.status = response.status_code
+                    result.headers = {name.lower(): value for name, value in response.headers.items()}
+
+                    # Count the bytes on the wire, before any content decoding
+                    for chunk in response.raw.stream(65536, decode_content=False):
+                        result.bytes += len(chunk)
+                        remaining()
+
+                if response.is_redirect and 'location' in result.headers:
+                    current_url = urljoin(current_url, result.headers['location'])
+                    continue
+                break
+        except (ProbeTimeout, requests.Timeout, urllib3.exceptions.TimeoutError):
+            result.error = f"Timed out after {self.timeout}s"
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+
+        result.total_time = time.perf_counter() - start_time
+        return result
+
+    def close(self):
+        """Close every pooled connection"""
+        pools = self._adapter.poolmanager.pools
+        self.connections_opened += sum(pools[key].num_connections for key in pools.keys())
+        self._limits.clear()
+        self.session.close()
@@ -1,7 +1,6 @@
-import time
 from dataclasses import dataclass
-from typing import Dict, List
-import requests
+from typing import Dict, Iterable, List
+from hw_websites.server.utils.page_probe import AsyncPageProbe
 
 @dataclass
 class PageMetrics:
@@ -9,32 +8,45 @@ class PageMetrics:
     size: int
     resource_count: int
     errors: List[str]
+    ttfb: float = 0.0
+    status: int = 0
 
 class PerformanceMonitor:
-    def __init__(self):
+    def __init__(self, timeout: float = 10.0, per_host_limit: int = 4):
         self.metrics: Dict[str, PageMetrics] = {}
+        self.timeout = timeout
+        self.per_host_limit = per_host_limit
 
-    def measure_page_performance(self, url: str) -> PageMetrics:
-        start_time = time.time()
+    def measure_pages(self, urls: Iterable[str]) -> Dict[str, PageMetrics]:
+        """Probe a batch of pages concurrently"""
+        probe = AsyncPageProbe(timeout=self.timeout, per_host_limit=self.per_host_limit)
+        results = probe.run(urls)
 
-        try:
-            response = requests.get(url)
-            load_time = time.time() - start_time
+        measured = {}
+        for url, result in results.items():
+            if result.error is not None:
+                metrics = PageMetrics(
+                    load_time=0,
+                    size=0,
+                    resource_count=0,
+                    errors=[result.error]
+                )
+                self.metrics[url] = metrics
+                measured[url] = metrics
+                continue
 
             metrics = PageMetrics(
-                load_time=load_time,
-                size=len(response.content),
-                resource_count=len(response.links),
-                errors=[]
+                load_time=result.total_time,
+                size=result.bytes,
+                resource_count=result.headers.get('link', '').count('<'),
+                errors=[],
+                ttfb=result.ttfb,
+                status=result.status
             )
-
             self.metrics[url] = metrics
-            return metrics
+            measured[url] = metrics
 
-        except Exception as e:
-            return PageMetrics(
-                load_time=0,
-                size=0,
-                resource_count=0,
-                errors=[str(e)]
-            )
+        return measured
+
+    def measure_page_performance(self, url: str) -> PageMetrics:
+        return self.measure_pages([url])[url]
@@ -0,0 +1,91 @@
+from collections import deque
+from typing import Dict, Iterable, List, Set, Tuple
+
+class PhraseMatcher:
+    """Aho-Corasick automaton that finds every dictionary phrase in one scan
+
+    Matching is case-insensitive and, by default, only accepts occurrences
+    that start and end on word boundaries. The cost of a scan is linear in
+    the text length plus the number of matches, whatever the dictionary size.
+    """
+    def __init__(self, phrases: Iterable[str], whole_words: bool = True):
+        self.whole_words = whole_words
+        self.phrases: List[str] = list(dict.fromkeys(
+            phrase.strip().lower() for phrase in phrases if phrase.strip()
+        ))
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+        self._build()
+
+    @classmethod
+    def from_file(cls, path: str, whole_words: bool = True) -> 'PhraseMatcher':
+        """Load a phrase dictionary with one phrase per line, '#' starting a comment"""
+        with open(path, encoding='utf-8') as f:
+            phrases = [line.split('#', 1)[0] for line in f]
+        return cls(phrases, whole_words)
+
+    def _build(self):
+        # Trie of all phrases
+        for phrase_id, phrase in enumerate(self.phrases):
+            state = 0
+            for char in phrase:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                state = next_state
+            self._out[state] += (phrase_id,)
+
+        # Failure links in breadth-first order; outputs are merged along the
+        # failure chain so a scan never has to walk it
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._out[next_state] += self._out[self._fail[next_state]]
+
+    def _on_boundary(self, text: str, start: int, end: int) -> bool:
+        return (
+            (start == 0 or not text[start - 1].isalnum())
+            and (end == len(text) or not text[end].isalnum())
+        )
+
+    def find_all(self, text: str) -> List[Tuple[int, int, str]]:
+        """Find every phrase occurrence as (start, end, phrase), ordered by end offset"""
+        goto, fail, out = self._goto, self._fail, self._out
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # Offsets must index the original text
+            lowered = ''.join(char.lower()[:1] or char for char in text)
+
+        matches = []
+        state = 0
+        for position, char in enumerate(lowered):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            for phrase_id in out[state]:
+                phrase = self.phrases[phrase_id]
+                end = position + 1
+                start = end - len(phrase)
+                if not self.whole_words or self._on_boundary(lowered, start, end):
+                    matches.append((start, end, phrase))
+
+        return matches
+
+    def find_phrases(self, text: str) -> Set[str]:
+        """Get the distinct phrases that occur in text"""
+        return {phrase for _, _, phrase in self.find_all(text)}
+
+    def __len__(self):
+        return len(self.phrases)
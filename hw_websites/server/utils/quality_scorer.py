@@ -0,0 +1,129 @@
+import re
+from typing import Dict, List
+import numpy as np
+
+_TAG = re.compile(r'<[^>]+>')
+_VOWELS = np.frombuffer(b'aeiouy', dtype=np.uint8)
+_SENTENCE_ENDS = np.frombuffer(b'.!?', dtype=np.uint8)
+
+def _previous(mask: np.ndarray) -> np.ndarray:
+    shifted = np.zeros_like(mask)
+    shifted[1:] = mask[:-1]
+    return shifted
+
+def _next(mask: np.ndarray) -> np.ndarray:
+    shifted = np.zeros_like(mask)
+    shifted[:-1] = mask[1:]
+    return shifted
+
+def corpus_features(texts: List[str]) -> Dict[str, np.ndarray]:
+    """Count words, sentences and syllables of every text in one vectorized pass
+
+    The texts are joined into one lowercase byte array. Words are runs of
+    letters and apostrophes, syllables are vowel groups within a word (a
+    trailing silent 'e' is dropped, minimum one per word) and sentences are
+    runs of '.', '!' or '?'.
+    """
+    plain = [_TAG.sub(' ', text).lower().encode('utf-8') for text in texts]
+    lengths = np.array([len(text) + 1 for text in plain], dtype=np.int64)
+    page_starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    corpus = np.frombuffer(b'\n'.join(plain) + b'\n', dtype=np.uint8)
+    page_count = len(texts)
+
+    letters = (corpus >= ord('a')) & (corpus <= ord('z'))
+    word_chars = letters | (corpus == ord("'"))
+    word_starts = np.flatnonzero(word_chars & ~_previous(word_chars))
+    word_ends = np.flatnonzero(word_chars & ~_next(word_chars))
+
+    # Syllables: vowel groups, each assigned to the word it falls in
+    vowels = np.isin(corpus, _VOWELS)
+    group_starts = np.flatnonzero(vowels & ~_previous(vowels))
+    word_of_group = np.searchsorted(word_starts, group_starts, side='right') - 1
+    syllables = np.bincount(word_of_group, minlength=len(word_starts)).astype(np.int64)
+
+    # A final 'e' after a consonant other than 'l' is usually silent
+    last_char = corpus[word_ends]
+    before_last = corpus[np.maximum(word_ends - 1, 0)]
+    silent_e = (
+        (last_char == ord('e'))
+        & ~np.isin(before_last, _VOWELS)
+        & (before_last != ord('l'))
+        & (syllables > 1)
+    )
+    syllables = np.maximum(syllables - silent_e, 1)
+
+    page_of_word = np.searchsorted(page_starts, word_starts, side='right') - 1
+    words = np.bincount(page_of_word, minlength=page_count)
+    page_syllables = np.bincount(page_of_word, weights=syllables, minlength=page_count).astype(np.int64)
+
+    # Sentences: runs of terminators, at least one for any page with words
+    terminators = np.isin(corpus, _SENTENCE_ENDS)
+    sentence_ends = np.flatnonzero(terminators & ~_next(terminators))
+    page_of_sentence = np.searchsorted(page_starts, sentence_ends, side='right') - 1
+    sentences = np.bincount(page_of_sentence, minlength=page_count)
+    sentences = np.where(words > 0, np.maximum(sentences, 1), sentences)
+
+    return {
+        'words': words,
+        'sentences': sentences,
+        'syllables': page_syllables
+    }
+
+def count_syllables(text: str) -> int:
+    return int(corpus_features([text])['syllables'][0])
+
+def readability_ratios(features: Dict[str, np.ndarray]):
+    """Words per sentence and syllables per word, zero for pages without words"""
+    words = features['words'].astype(float)
+    sentences = features['sentences'].astype(float)
+    syllables = features['syllables'].astype(float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        words_per_sentence = np.where(sentences > 0, words / sentences, 0.0)
+        syllables_per_word = np.where(words > 0, syllables / words, 0.0)
+    return words_per_sentence, syllables_per_word
+
+def flesch_reading_ease(words_per_sentence, syllables_per_word):
+    return 206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word
+
+class CorpusQualityScorer:
+    """Scores the readability of a whole corpus of pages at once"""
+    def score(self, pages: Dict[str, str], sentiment: bool = False):
+        """Build a per-page table of counts, Flesch scores and optionally sentiment"""
+        import pandas as pd
+
+        names = list(pages)
+        texts = [pages[name] for name in names]
+        features = corpus_features(texts)
+
+        words_per_sentence, syllables_per_word = readability_ratios(features)
+
+        table = pd.DataFrame({
+            'page': names,
+            'words': features['words'],
+            'sentences': features['sentences'],
+            'syllables': features['syllables'],
+            'words_per_sentence': words_per_sentence,
+            'syllables_per_word': syllables_per_word,
+            'flesch_reading_ease': flesch_reading_ease(words_per_sentence, syllables_per_word),
+            'flesch_kincaid_grade': 0.39 * words_per_sentence + 11.8 * syllables_per_word - 15.59
+        }).set_index('page')
+
+        if sentiment:
+            # TextBlob's lexicon analyzer works one document at a time
+            from textblob import TextBlob
+
+            polarity, subjectivity = [], []
+            for text in texts:
+                blob_sentiment = TextBlob(_TAG.sub(' ', text)).sentiment
+                polarity.append(blob_sentiment.polarity)
+                subjectivity.append(blob_sentiment.subjectivity)
+            table['sentiment'] = polarity
+            table['subjectivity'] = subjectivity
+
+        return table
+
+    def score_to_csv(self, pages: Dict[str, str], path: str, sentiment: bool = False):
+        """Score a corpus and write the table to CSV"""
+        table = self.score(pages, sentiment)
+        table.to_csv(path)
+        return table
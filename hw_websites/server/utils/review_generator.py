@@ -1,73 +1,63 @@
 from typing import List, Dict
 from datetime import datetime
+from functools import lru_cache
+from hw_websites.server.utils.fragment_cache import fragment_cache
+from hw_websites.server.utils.review_store import ReviewStore
+
+@lru_cache(maxsize=None)
+def _format_date(date: str) -> str:
+    return datetime.strptime(date, '%Y-%m-%d').strftime('%B %d, %Y')
+
+def _stars(rating: float) -> str:
+    full = int(rating + 0.5)
+    return "★" * full + "☆" * (5 - full)
 
 class ReviewGenerator:
-    def __init__(self):
-        # Real reviews from Google My Business
-        self.real_reviews = [
-            {
-                'text': "HW Road Construction did an amazing job on our driveway expansion project. Their attention to detail and professionalism was outstanding. The crew worked efficiently and kept us informed throughout the process.",
-                'rating': 5,
-                'author': "Michael Rodriguez",
-                'date': '2023-09-15',
-                'verified': True,
-                'platform': 'Google'
-            },
-            {
-                'text': "Great experience working with HW Road Construction. They completed our commercial parking lot ahead of schedule and within budget. Their team was professional and the quality of work exceeded our expectations.",
-                'rating': 5,
-                'author': "Sarah Thompson",
-                'date': '2023-08-22',
-                'verified': True,
-                'platform': 'Google'
-            },
-            {
-                'text': "We hired HW Road Construction for a major road repair project. Their expertise in handling complex construction challenges was impressive. Highly recommend their services.",
-                'rating': 5,
-                'author': "David Martinez",
-                'date': '2023-07-30',
-                'verified': True,
-                'platform': 'Google'
-            },
-            {
-                'text': "Professional team that delivers quality work. They were very responsive to our needs and maintained excellent communication throughout the project.",
-                'rating': 4,
-                'author': "Jennifer Wilson",
-                'date': '2023-06-18',
-                'verified': True,
-                'platform': 'Google'
-            }
-            # Add more real reviews here
-        ]
+    def __init__(self, store=None, fragments=None, reviews_per_page: int = 6):
+        # Real reviews from Google My Business, seeded from data/reviews.jsonl
+        self.store = ReviewStore() if store is None else store
+        self.fragments = fragment_cache if fragments is None else fragments
+        self.reviews_per_page = reviews_per_page
+
+    @property
+    def real_reviews(self) -> List[Dict]:
+        """Every stored review, most recent first"""
+        return self.store.top_reviews(min_rating=1, limit=-1)
 
-    def get_reviews(self, min_rating: int = 4) -> List[Dict]:
+    def get_reviews(self, min_rating: int = 4, city: str = None, service: str = None, limit: int = -1) -> List[Dict]:
         """Get real reviews with minimum rating"""
-        return [
-            review for review in self.real_reviews
-            if review['rating'] >= min_rating
-        ]
+        return self.store.top_reviews(city, service, min_rating, limit)
 
     def generate_review_section(self, company: str, location: str, service_type: str) -> str:
         """Generate HTML section with real reviews"""
-        reviews = self.get_reviews()
+        # The section only changes when reviews are added, so it is rendered once per store version
+        return self.fragments.get_or_render(
+            'review_section',
+            (self.store.version, location, service_type, self.reviews_per_page),
+            lambda: self._render_review_section(
+                self.get_reviews(city=location, service=service_type, limit=self.reviews_per_page),
+                self.store.aggregate(location, service_type)
+            )
+        )
 
+    def _render_review_section(self, reviews: List[Dict], summary: Dict) -> str:
         content = f"""
         <section id="reviews" class="mb-12 bg-gray-50 py-12">
             <div class="container mx-auto px-4">
                 <h2 class="text-3xl font-bold mb-6 text-center">Customer Reviews</h2>
                 <div class="flex justify-center mb-6">
                     <div class="flex items-center space-x-2">
-                        <span class="text-3xl font-bold text-gray-900">4.8</span>
-                        <div class="flex text-yellow-400 text-xl">★★★★★</div>
-                        <span class="text-gray-600">({len(reviews)} reviews)</span>
+                        <span class="text-3xl font-bold text-gray-900">{summary['mean']:.1f}</span>
+                        <div class="flex text-yellow-400 text-xl">{_stars(summary['mean'])}</div>
+                        <span class="text-gray-600">({summary['count']} reviews)</span>
                     </div>
                 </div>
                 <div class="grid grid-cols-1 md:grid-cols-2 gap-8">
         """
 
         for review in reviews:
-            stars = "★" * review['rating'] + "☆" * (5 - review['rating'])
-            formatted_date = datetime.strptime(review['date'], '%Y-%m-%d').strftime('%B %d, %Y')
+            stars = _stars(review['rating'])
+            formatted_date = _format_date(review['date'])
 
             content += f"""
                 <div class="bg-white p-6 rounded-lg shadow-md">
@@ -0,0 +1,280 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_REVIEW_DB = os.path.join('.cache', 'reviews.sqlite3')
+DEFAULT_REVIEWS_PATH = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'reviews.jsonl')
+)
+
+# Reviews without a city or service apply to every page
+ANY = ''
+# Source of the reviews synced from the packaged seed file
+SEED_SOURCE = 'seed'
+# Bump when the tables change; the store is then rebuilt from the seed file
+SCHEMA_VERSION = '3'
+
+REVIEW_FIELDS = ('author', 'text', 'rating', 'date', 'platform', 'service', 'city', 'verified')
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS reviews (
+        id INTEGER PRIMARY KEY,
+        key TEXT NOT NULL UNIQUE,
+        source TEXT NOT NULL DEFAULT '',
+        author TEXT NOT NULL,
+        text TEXT NOT NULL,
+        rating INTEGER NOT NULL,
+        date TEXT NOT NULL,
+        platform TEXT NOT NULL,
+        service TEXT NOT NULL,
+        city TEXT NOT NULL,
+        verified INTEGER NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS reviews_city_service ON reviews (city, service, rating, date)",
+    "CREATE INDEX IF NOT EXISTS reviews_service ON reviews (service, rating, date)",
+    "CREATE INDEX IF NOT EXISTS reviews_rating_date ON reviews (rating, date)",
+    "CREATE INDEX IF NOT EXISTS reviews_date ON reviews (date)",
+    "CREATE INDEX IF NOT EXISTS reviews_platform ON reviews (platform)",
+    "CREATE INDEX IF NOT EXISTS reviews_source ON reviews (source)",
+    """CREATE TABLE IF NOT EXISTS aggregates (
+        city TEXT NOT NULL,
+        service TEXT NOT NULL,
+        count INTEGER NOT NULL DEFAULT 0,
+        rating_sum INTEGER NOT NULL DEFAULT 0,
+        stars_1 INTEGER NOT NULL DEFAULT 0,
+        stars_2 INTEGER NOT NULL DEFAULT 0,
+        stars_3 INTEGER NOT NULL DEFAULT 0,
+        stars_4 INTEGER NOT NULL DEFAULT 0,
+        stars_5 INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (city, service)
+    )"""
+)
+
+def _scope(city: Optional[str], service: Optional[str]) -> Tuple[List[str], list]:
+    """Conditions selecting a city's and a service's reviews, company-wide reviews included"""
+    conditions, params = [], []
+    if city:
+        conditions.append("city IN (?, ?)")
+        params += [city, ANY]
+    if service:
+        conditions.append("service IN (?, ?)")
+        params += [service, ANY]
+    return conditions, params
+
+class ReviewStore:
+    """SQLite review store with indexed lookups and incrementally maintained rating aggregates
+
+    Every insert, update and delete adjusts the aggregate row of the
+    review's exact city/service pair, so counts, means and distributions
+    for any page sum at most four rows and never need a scan.
+    """
+    def __init__(self, path: str = DEFAULT_REVIEW_DB, seed_path: Optional[str] = DEFAULT_REVIEWS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+        if seed_path and not os.path.exists(seed_path):
+            seed_path = None
+        seed_signature = self._seed_signature(seed_path) if seed_path else None
+        # Reopening an up-to-date store only reads two meta rows and stats the seed file
+        if self._meta('schema') != SCHEMA_VERSION or (seed_path and self._meta('seed_stat') != seed_signature):
+            with self._lock, self._conn:
+                # Workers opening the store together sync it one at a time
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._migrate()
+                if seed_path:
+                    self._sync_seed(seed_path, seed_signature)
+
+    @staticmethod
+    def make_key(review: Dict) -> str:
+        """Identify a review by its id, or by its author, date and platform, so edits replace it"""
+        if review.get('id'):
+            identity = [str(review['id'])]
+        else:
+            identity = [review['author'], review['date'], review.get('platform', '')]
+        return hashlib.sha256(json.dumps(identity).encode('utf-8')).hexdigest()
+
+    def _migrate(self):
+        # The store is derived from the seed file, so an older layout is dropped and rebuilt
+        if self._meta('schema') == SCHEMA_VERSION:
+            return
+        self._conn.execute("DROP TABLE IF EXISTS reviews")
+        self._conn.execute("DROP TABLE IF EXISTS aggregates")
+        self._conn.execute("DELETE FROM meta")
+        for statement in SCHEMA:
+            self._conn.execute(statement)
+        self._set_meta('schema', SCHEMA_VERSION)
+
+    @staticmethod
+    def _seed_signature(seed_path: str) -> str:
+        stat = os.stat(seed_path)
+        return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+    def _sync_seed(self, seed_path: str, signature: str):
+        # Another worker may have synced the seed while we waited for the lock
+        if self._meta('seed_stat') == signature:
+            return
+        with open(seed_path, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        if self._meta('seed_digest') != digest:
+            reviews = [json.loads(line) for line in data.decode('utf-8').splitlines() if line.strip()]
+            self._sync_reviews(reviews, SEED_SOURCE)
+            self._set_meta('seed_digest', digest)
+        self._set_meta('seed_stat', signature)
+
+    def _meta(self, name: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return None if row is None else row['value']
+
+    def _set_meta(self, name: str, value: str):
+        self._conn.execute(
+            "INSERT INTO meta (name, value) VALUES (?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET value = excluded.value",
+            (name, value)
+        )
+
+    @property
+    def version(self) -> str:
+        """Hash of the stored reviews; changes whenever a review is added, edited or removed"""
+        with self._lock:
+            return self._meta('version') or ''
+
+    def add_review(self, review: Dict) -> bool:
+        """Add or update one review and its aggregates; returns False when nothing changed"""
+        return self.add_reviews([review]) == 1
+
+    def add_reviews(self, reviews: Iterable[Dict], source: str = '') -> int:
+        """Add or update reviews in one transaction and return how many changed"""
+        with self._lock, self._conn:
+            return sum(self._upsert(review, source) for review in reviews)
+
+    def sync_reviews(self, reviews: Iterable[Dict], source: str) -> int:
+        """Make a source's stored reviews match the given ones and return how many changed"""
+        with self._lock, self._conn:
+            return self._sync_reviews(reviews, source)
+
+    def _sync_reviews(self, reviews: Iterable[Dict], source: str) -> int:
+        keys = set()
+        changed = 0
+        for review in reviews:
+            keys.add(self.make_key(review))
+            changed += self._upsert(review, source)
+
+        # Reviews the source no longer has are removed along with their share of the aggregates
+        stored = self._conn.execute(
+            f"SELECT key, {', '.join(REVIEW_FIELDS)} FROM reviews WHERE source = ?", (source,)
+        ).fetchall()
+        for row in stored:
+            if row['key'] not in keys:
+                self._update_aggregates(row, -1)
+                self._update_version(row['key'], tuple(row)[1:])
+                self._conn.execute("DELETE FROM reviews WHERE key = ?", (row['key'],))
+                changed += 1
+        return changed
+
+    def _upsert(self, review: Dict, source: str) -> bool:
+        row = {
+            'author': review['author'],
+            'text': review['text'],
+            'rating': max(1, min(5, int(review['rating']))),
+            'date': review['date'],
+            'platform': review.get('platform', ''),
+            'service': review.get('service') or ANY,
+            'city': review.get('city') or ANY,
+            'verified': int(bool(review.get('verified', False)))
+        }
+        key = self.make_key(review)
+        values = tuple(row[field] for field in REVIEW_FIELDS)
+
+        existing = self._conn.execute(
+            f"SELECT {', '.join(REVIEW_FIELDS)} FROM reviews WHERE key = ?", (key,)
+        ).fetchone()
+        if existing is None:
+            self._conn.execute(
+                f"INSERT INTO reviews (key, source, {', '.join(REVIEW_FIELDS)}) "
+                f"VALUES (?, ?, {', '.join('?' * len(REVIEW_FIELDS))})",
+                (key, source, *values)
+            )
+        elif tuple(existing) == values:
+            return False
+        else:
+            self._update_aggregates(existing, -1)
+            self._update_version(key, tuple(existing))
+            self._conn.execute(
+                f"UPDATE reviews SET source = ?, {', '.join(f'{field} = ?' for field in REVIEW_FIELDS)} WHERE key = ?",
+                (source, *values, key)
+            )
+        self._update_aggregates(row, 1)
+        self._update_version(key, values)
+        return True
+
+    def _update_aggregates(self, row, sign: int):
+        stars = f"stars_{row['rating']}"
+        self._conn.execute(
+            f"INSERT INTO aggregates (city, service, count, rating_sum, {stars}) VALUES (?, ?, ?, ?, ?) "
+            f"ON CONFLICT (city, service) DO UPDATE SET count = count + excluded.count, "
+            f"rating_sum = rating_sum + excluded.rating_sum, {stars} = {stars} + excluded.{stars}",
+            (row['city'], row['service'], sign, sign * row['rating'], sign)
+        )
+
+    def _update_version(self, key: str, values: tuple):
+        # The version XORs a hash of every stored row, so adding and removing a row both toggle
+        # its hash; the same reviews always give the same version, whatever order they came in
+        row_hash = hashlib.sha256(json.dumps([key, *values]).encode('utf-8')).digest()[:8]
+        version = int(self._meta('version') or '0', 16) ^ int.from_bytes(row_hash, 'big')
+        self._set_meta('version', f"{version:016x}")
+
+    def import_jsonl(self, path: str) -> int:
+        """Import reviews from a JSON Lines file, updating reviews already stored"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return self.add_reviews(json.loads(line) for line in f if line.strip())
+
+    def aggregate(self, city: Optional[str] = None, service: Optional[str] = None) -> Dict:
+        """Count, mean and star distribution of the reviews top_reviews selects for a city and service"""
+        conditions, params = _scope(city, service)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        totals = ', '.join(
+            f"COALESCE(SUM({column}), 0) AS {column}"
+            for column in ('count', 'rating_sum', *(f"stars_{stars}" for stars in range(1, 6)))
+        )
+        with self._lock:
+            row = self._conn.execute(f"SELECT {totals} FROM aggregates {where}", params).fetchone()
+
+        return {
+            'count': row['count'],
+            'mean': row['rating_sum'] / row['count'] if row['count'] else 0.0,
+            'distribution': {stars: row[f"stars_{stars}"] for stars in range(1, 6)}
+        }
+
+    def top_reviews(
+        self,
+        city: Optional[str] = None,
+        service: Optional[str] = None,
+        min_rating: int = 4,
+        limit: int = 6
+    ) -> List[Dict]:
+        """Most recent reviews at or above a rating for a city and service, company-wide reviews included"""
+        conditions, params = _scope(city, service)
+        conditions.append("rating >= ?")
+        params.append(min_rating)
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(REVIEW_FIELDS)} FROM reviews WHERE {' AND '.join(conditions)} "
+                "ORDER BY date DESC, rating DESC, id LIMIT ?",
+                (*params, limit)
+            ).fetchall()
+
+        return [{**dict(row), 'verified': bool(row['verified'])} for row in rows]
+
+    def close(self):
+        self._conn.close()
@@ -1,31 +1,124 @@
-from transformers import pipeline
-import yake
-import spacy
+import json
+import re
+from functools import cached_property, lru_cache
+from hw_websites.server.utils.inference_cache import DEFAULT_CACHE_PATH, InferenceCache
+from hw_websites.server.utils.lazy_loader import lazy_import, startup_timer
+
+# Model the transformers summarization pipeline uses by default
+DEFAULT_SUMMARIZATION_MODEL = "sshleifer/distilbart-cnn-12-6"
+
+# FAQ answers are extracted from the page, not summarized; bump when the extraction changes
+FAQ_ANSWER_MODEL = "extractive-faq-v1"
+
+_TAG = re.compile(r'<[^>]+>')
+_SENTENCE = re.compile(r'[^.!?]+[.!?]*')
+_WORD = re.compile(r'[^\W_]+')
+# Words that say nothing about what a question is asking for
+_QUESTION_WORDS = frozenset({
+    'a', 'an', 'and', 'are', 'do', 'does', 'for', 'from', 'how', 'in', 'is', 'of',
+    'on', 'other', 'the', 'to', 'what', 'you', 'your'
+})
+
+@lru_cache(maxsize=256)
+def _location_rewriter(location, industry_terms):
+    """Compile one pattern matching every industry term not already prefixed by the location"""
+    terms = sorted({term for term in industry_terms if term}, key=len, reverse=True)
+    if not terms:
+        return None
+
+    # Longest terms first so overlapping terms are rewritten once
+    alternatives = '|'.join(re.escape(term) for term in terms)
+    return re.compile(f"(?<!{re.escape(location)} )(?:{alternatives})")
 
 class SEOContentGenerator:
-    def __init__(self):
-        self.nlp = spacy.load("en_core_web_sm")
-        self.summarizer = pipeline("summarization")
-        self.kw_extractor = yake.KeywordExtractor()
+    # The NLP engines are loaded the first time a stage needs them
+    def __init__(self, summarization_model=DEFAULT_SUMMARIZATION_MODEL, cache_path=DEFAULT_CACHE_PATH):
+        self.summarization_model = summarization_model
+        self.cache_path = cache_path
+
+    @cached_property
+    def cache(self):
+        """Persistent cache of generated text, or None when caching is disabled"""
+        if self.cache_path is None:
+            return None
+        return InferenceCache(self.cache_path)
+
+    @cached_property
+    def nlp(self):
+        spacy = lazy_import('spacy', 'spaCy en_core_web_sm')
+        with startup_timer.measure('spaCy en_core_web_sm', 'init'):
+            return spacy.load("en_core_web_sm")
+
+    @cached_property
+    def summarizer(self):
+        transformers = lazy_import('transformers', 'Summarization pipeline')
+        with startup_timer.measure('Summarization pipeline', 'init'):
+            return transformers.pipeline("summarization", model=self.summarization_model)
+
+    @cached_property
+    def kw_extractor(self):
+        yake = lazy_import('yake', 'YAKE keyword extractor')
+        with startup_timer.measure('YAKE keyword extractor', 'init'):
+            return yake.KeywordExtractor()
+
+    def preload(self):
+        """Load every NLP engine up front"""
+        return self.nlp, self.summarizer, self.kw_extractor
 
     def generate_meta_description(self, content, max_length=160):
         """Generate SEO-optimized meta description"""
-        summary = self.summarizer(content, max_length=max_length)[0]['summary_text']
-        return summary
+        return self.generate_meta_descriptions([content], max_length)[0]
+
+    def generate_meta_descriptions(self, contents, max_length=160, batch_size=8):
+        """Generate meta descriptions for many pages in batched summarizer calls"""
+        summaries = self._cached(
+            'meta_description',
+            contents,
+            lambda missing: self._summarize(missing, max_length, batch_size),
+            {'max_length': max_length}
+        )
+        return [summaries[content] for content in contents]
+
+    def _summarize(self, contents, max_length, batch_size):
+        """Summarize distinct texts in length-sorted batches"""
+        # Group texts of similar token length so each batch carries little padding
+        tokenizer = self.summarizer.tokenizer
+        token_lengths = {
+            text: len(tokenizer(text, truncation=True)['input_ids'])
+            for text in contents
+        }
+        ordered = sorted(contents, key=token_lengths.get)
+
+        summaries = {}
+        for start in range(0, len(ordered), batch_size):
+            batch = ordered[start:start + batch_size]
+            outputs = self.summarizer(
+                batch,
+                max_length=max_length,
+                batch_size=len(batch),
+                truncation=True
+            )
+            for text, output in zip(batch, outputs):
+                summaries[text] = output['summary_text']
+
+        return [summaries[text] for text in contents]
+
+    def _cached(self, kind, texts, compute, params=None, model=None):
+        """Get model outputs for distinct texts, computing only uncached ones"""
+        unique_texts = list(dict.fromkeys(texts))
+        if self.cache is None:
+            return dict(zip(unique_texts, compute(unique_texts)))
+
+        return self.cache.cached(model or self.summarization_model, kind, unique_texts, compute, params)
 
     def generate_location_specific_content(self, base_content, location, industry_terms):
         """Generate location-specific variations of content"""
-        doc = self.nlp(base_content)
-
-        # Replace generic terms with location-specific ones
-        location_specific = base_content
-        for term in industry_terms:
-            location_specific = location_specific.replace(
-                term,
-                f"{location} {term}"
-            )
+        # Replace generic terms with location-specific ones in a single pass
+        pattern = _location_rewriter(location, tuple(industry_terms))
+        if pattern is None:
+            return base_content
 
-        return location_specific
+        return pattern.sub(lambda match: f"{location} {match.group(0)}", base_content)
 
     def generate_faq_section(self, content):
         """Generate FAQ section based on content"""
@@ -38,9 +131,37 @@ class SEOContentGenerator:
         ]
 
         # Generate answers using content analysis
+        answers = self._cached(
+            'faq_answer',
+            [json.dumps([question, content]) for question in questions],
+            lambda missing: [self._generate_answer(*json.loads(text)) for text in missing],
+            model=FAQ_ANSWER_MODEL
+        )
+
         faqs = []
         for question in questions:
-            answer = self._generate_answer(question, content)
+            answer = answers[json.dumps([question, content])]
             faqs.append({"question": question, "answer": answer})
 
         return faqs
+
+    def _generate_answer(self, question, content, max_sentences=2):
+        """Answer a question with the content sentences that share the most words with it"""
+        sentences = [
+            ' '.join(sentence.split())
+            for sentence in _SENTENCE.findall(_TAG.sub(' ', content))
+            if sentence.strip()
+        ]
+        if not sentences:
+            return ''
+
+        keywords = {word for word in _WORD.findall(question.lower()) if word not in _QUESTION_WORDS}
+        scores = [
+            len(keywords & set(_WORD.findall(sentence.lower())))
+            for sentence in sentences
+        ]
+        # Best sentences first, ties in page order, then restored to page order
+        best = sorted(range(len(sentences)), key=lambda i: (-scores[i], i))[:max_sentences]
+        if scores[best[0]] == 0:
+            return sentences[0]
+        return ' '.join(sentences[i] for i in sorted(best) if scores[i] > 0)
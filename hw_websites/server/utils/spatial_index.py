@@ -0,0 +1,95 @@
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+from scipy import sparse
+from scipy.spatial import cKDTree
+
+EARTH_RADIUS_MILES = 3958.8
+
+def to_unit_vectors(lats, lons) -> np.ndarray:
+    """Project latitude/longitude in degrees onto the unit sphere"""
+    lat = np.radians(np.asarray(lats, dtype=np.float64))
+    lon = np.radians(np.asarray(lons, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+def haversine_miles(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Great-circle distance in miles, vectorized over any broadcastable inputs"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(value, dtype=np.float64)) for value in (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def _chord_length(miles: float) -> float:
+    # Straight-line distance through the unit sphere for a great-circle distance
+    return 2 * np.sin(min(miles / EARTH_RADIUS_MILES, np.pi) / 2)
+
+def _great_circle_miles(chords: np.ndarray) -> np.ndarray:
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.clip(chords / 2, 0.0, 1.0))
+
+class GeoIndex:
+    """KD-tree over places on the unit sphere for radius queries in miles
+
+    Chord length through the sphere grows monotonically with great-circle
+    distance, so a Euclidean ball query on 3D unit vectors is an exact
+    haversine radius query.
+    """
+    def __init__(self, names: Sequence[str], lats: Sequence[float], lons: Sequence[float]):
+        self.names = list(names)
+        self.positions = {name: i for i, name in enumerate(self.names)}
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lons = np.asarray(lons, dtype=np.float64)
+        self.tree = cKDTree(to_unit_vectors(self.lats, self.lons))
+        self._tables: Dict[float, sparse.csr_matrix] = {}
+
+    @classmethod
+    def from_places(cls, places: Dict[str, Tuple[float, float]]) -> 'GeoIndex':
+        names = list(places)
+        coords = np.array([places[name] for name in names], dtype=np.float64).reshape(-1, 2)
+        return cls(names, coords[:, 0], coords[:, 1])
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.positions
+
+    def __len__(self):
+        return len(self.names)
+
+    def query_radius(self, lat: float, lon: float, radius_miles: float) -> List[Tuple[int, float]]:
+        """Get (position, miles) for every place within the radius of a point, nearest first"""
+        point = to_unit_vectors([lat], [lon])[0]
+        positions = np.asarray(self.tree.query_ball_point(point, _chord_length(radius_miles)), dtype=np.int64)
+        distances = haversine_miles(lat, lon, self.lats[positions], self.lons[positions])
+        order = np.argsort(distances, kind='stable')
+        return list(zip(positions[order].tolist(), distances[order].tolist()))
+
+    def distance_table(self, radius_miles: float) -> sparse.csr_matrix:
+        """Sparse table of miles between every pair of places within the radius, cached per radius"""
+        table = self._tables.get(radius_miles)
+        if table is None:
+            pairs = self.tree.sparse_distance_matrix(
+                self.tree,
+                _chord_length(radius_miles),
+                output_type='ndarray'
+            )
+            rows, cols = pairs['i'], pairs['j']
+            keep = rows != cols
+            rows, cols = rows[keep], cols[keep]
+            miles = haversine_miles(self.lats[rows], self.lons[rows], self.lats[cols], self.lons[cols])
+            table = sparse.csr_matrix((miles, (rows, cols)), shape=(len(self), len(self)))
+            table.sort_indices()
+            self._tables[radius_miles] = table
+        return table
+
+    def neighbors(self, name: str, radius_miles: float) -> List[Tuple[str, float]]:
+        """Get (name, miles) for every other place within the radius of a place, nearest first"""
+        position = self.positions.get(name)
+        if position is None:
+            return []
+
+        table = self.distance_table(radius_miles)
+        start, end = table.indptr[position], table.indptr[position + 1]
+        positions = table.indices[start:end]
+        distances = table.data[start:end]
+        order = np.lexsort((positions, distances))
+        return [(self.names[i], float(d)) for i, d in zip(positions[order], distances[order])]
@@ -0,0 +1,85 @@
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Tuple
+
+@dataclass
+class Stage:
+    name: str
+    func: Callable
+    deps: Tuple[str, ...] = field(default_factory=tuple)
+    executor: str = 'thread'
+
+class StageGraph:
+    """Runs stages concurrently as soon as the stages they depend on have finished
+
+    Each stage function is called with the results of its dependencies as
+    keyword arguments. Stages run on the thread pool by default; stages
+    marked 'process' run on the process pool and must be picklable.
+    """
+    def __init__(self, thread_pool: Executor, process_pool: Optional[Executor] = None):
+        self.thread_pool = thread_pool
+        self.process_pool = process_pool
+        self.stages: Dict[str, Stage] = {}
+
+    def add(self, name: str, func: Callable, deps=(), executor: str = 'thread') -> 'StageGraph':
+        if name in self.stages:
+            raise ValueError(f"Stage {name} is already defined")
+        if executor not in ('thread', 'process'):
+            raise ValueError(f"Unknown executor {executor} for stage {name}")
+        if executor == 'process' and self.process_pool is None:
+            raise ValueError(f"Stage {name} needs a process pool")
+
+        self.stages[name] = Stage(name, func, tuple(deps), executor)
+        return self
+
+    def _validate(self):
+        """Check that every dependency exists and the graph has no cycles"""
+        for stage in self.stages.values():
+            for dep in stage.deps:
+                if dep not in self.stages:
+                    raise ValueError(f"Stage {stage.name} depends on unknown stage {dep}")
+
+        visiting, visited = set(), set()
+
+        def visit(name):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Stage {name} is part of a dependency cycle")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def run(self) -> Dict[str, object]:
+        """Run every stage and return the results by stage name"""
+        self._validate()
+
+        results = {}
+        pending = dict(self.stages)
+        running = {}
+
+        while pending or running:
+            # Start every stage whose dependencies are done
+            for name, stage in list(pending.items()):
+                if all(dep in results for dep in stage.deps):
+                    pool = self.process_pool if stage.executor == 'process' else self.thread_pool
+                    kwargs = {dep: results[dep] for dep in stage.deps}
+                    running[pool.submit(stage.func, **kwargs)] = name
+                    del pending[name]
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception:
+                    for other in running:
+                        other.cancel()
+                    raise
+
+        return results
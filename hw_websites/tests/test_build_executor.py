@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+from dataclasses import replace
+from unittest import mock
+from hw_websites.server.build_executor import BuildExecutor, plan_build
+from hw_websites.server.build_manifest import BuildManifest
+from hw_websites.server.generate_pages import enhanced_page_fingerprint
+from hw_websites.server.utils.link_index import KeywordIndex
+
+def _read_tree(root):
+    files = {}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            with open(path, 'rb') as f:
+                files[os.path.relpath(path, root)] = f.read()
+    return files
+
+def _failing_initializer():
+    raise LookupError('Resource stopwords not found')
+
+class TestBuildExecutor(unittest.TestCase):
+    def setUp(self):
+        # Blog linking needs the NLTK stopword corpus, which is not available offline
+        patcher = mock.patch(
+            'hw_websites.server.utils.content_linker._load_stop_words',
+            return_value=frozenset({'the', 'and', 'for', 'from', 'to'})
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.sites = {
+            'hwroads.com': ['Miami', 'Fort Lauderdale'],
+            'hwasphaltfl.com': ['Orlando']
+        }
+
+    def test_parallel_build_matches_serial_build(self):
+        with tempfile.TemporaryDirectory() as serial_root, tempfile.TemporaryDirectory() as parallel_root:
+            serial = BuildExecutor(workers=1, progress=False).run(plan_build(self.sites, serial_root))
+            parallel = BuildExecutor(workers=4, progress=False).run(plan_build(self.sites, parallel_root))
+
+            self.assertEqual(serial.failed, 0)
+            self.assertEqual(parallel.failed, 0)
+            self.assertEqual(serial.groups, parallel.groups)
+            self.assertEqual(_read_tree(serial_root), _read_tree(parallel_root))
+
+    def test_report_counts_pages_per_site(self):
+        with tempfile.TemporaryDirectory() as output_root:
+            jobs = plan_build(self.sites, output_root)
+            report = BuildExecutor(workers=2, progress=False).run(jobs)
+
+        self.assertEqual(report.total, len(jobs))
+        self.assertEqual(report.completed, len(jobs))
+        self.assertEqual(report.groups['hwroads.com'], 2 * report.groups['hwasphaltfl.com'])
+
+    def test_incremental_build_only_rebuilds_changed_pages(self):
+        executor = BuildExecutor(workers=2, progress=False)
+        with tempfile.TemporaryDirectory() as output_root:
+            jobs = plan_build(self.sites, output_root)
+            first = executor.run(jobs, manifest=BuildManifest.for_output_root(output_root))
+            self.assertEqual(first.completed, len(jobs))
+
+            unchanged = executor.run(jobs, manifest=BuildManifest.for_output_root(output_root))
+            self.assertEqual(unchanged.completed, 0)
+            self.assertEqual(unchanged.skipped, len(jobs))
+
+            # Change one page and drop another from the build
+            changed = [replace(jobs[0], content='<h1>Updated</h1>')] + jobs[1:-1]
+            update = executor.run(changed, manifest=BuildManifest.for_output_root(output_root))
+            self.assertEqual(update.completed, 1)
+            self.assertEqual(update.skipped, len(jobs) - 2)
+            self.assertEqual(update.deleted, [jobs[-1].filepath])
+            self.assertFalse(os.path.exists(jobs[-1].filepath))
+
+    def test_failed_worker_initialization_is_reported_per_page(self):
+        with tempfile.TemporaryDirectory() as output_root:
+            jobs = plan_build(self.sites, output_root)
+            for workers in (1, 2):
+                report = BuildExecutor(workers=workers, progress=False).run(jobs, initializer=_failing_initializer)
+                self.assertEqual(report.completed, 0)
+                self.assertEqual(report.failed, len(jobs))
+                self.assertIn('failed', report.errors[0])
+
+    def test_enhanced_page_fingerprint_covers_renderer_and_template(self):
+        data = {'location': 'Miami', 'content': 'Paving'}
+        digest = enhanced_page_fingerprint(data, 'reviews-v1')
+        self.assertEqual(digest, enhanced_page_fingerprint(dict(data), 'reviews-v1'))
+
+        with mock.patch('hw_websites.server.generate_pages.enhanced_page_code_version', return_value='edited'):
+            self.assertNotEqual(digest, enhanced_page_fingerprint(data, 'reviews-v1'))
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            template = mock.Mock(filename=os.path.join(tmp_dir, 'page.html'))
+            with open(template.filename, 'w', encoding='utf-8') as f:
+                f.write('<main>{{ content }}</main>')
+            with_template = enhanced_page_fingerprint(data, 'reviews-v1', template)
+            with open(template.filename, 'w', encoding='utf-8') as f:
+                f.write('<main class="page">{{ content }}</main>')
+            self.assertNotEqual(with_template, enhanced_page_fingerprint(data, 'reviews-v1', template))
+
+    def test_each_site_keeps_its_own_link_index(self):
+        with tempfile.TemporaryDirectory() as output_root, tempfile.TemporaryDirectory() as index_root:
+            plan_build(self.sites, output_root, link_index_path=index_root)
+            self.assertEqual(sorted(os.listdir(index_root)), sorted(self.sites))
+            for site_name in self.sites:
+                self.assertTrue(KeywordIndex.exists(os.path.join(index_root, site_name)))
@@ -0,0 +1,170 @@
+import os
+import re
+import tempfile
+import threading
+import time
+import types
+import unittest
+from unittest import mock
+from hw_websites.server.utils.content_checker import (
+    LANGUAGETOOL_SERVERS_ENV,
+    ContentQualityChecker,
+    LanguageToolPool,
+    paragraph_spans,
+    split_paragraphs
+)
+
+class _FakeMatch:
+    def __init__(self, offset, length):
+        self.offset = offset
+        self.length = length
+
+    def __str__(self):
+        return f"Offset {self.offset}, length {self.length}, Rule ID: TEH\nMessage: Possible typo"
+
+class _FakeLanguageTool:
+    # Stands in for a LanguageTool server; flags every "teh"
+    instances = []
+
+    def __init__(self, language, remote_server=None):
+        self.language = language
+        self.remote_server = remote_server
+        port = 8081 + len(_FakeLanguageTool.instances)
+        self._url = f"{remote_server or f'http://127.0.0.1:{port}'}/v2/"
+        self.checked = []
+        self.closed = False
+        _FakeLanguageTool.instances.append(self)
+
+    def check(self, text):
+        self.checked.append(text)
+        time.sleep(0.01)
+        return [_FakeMatch(match.start(), 3) for match in re.finditer(r'\bteh\b', text)]
+
+    def close(self):
+        self.closed = True
+
+def _checked_texts():
+    return [text for tool in _FakeLanguageTool.instances for text in tool.checked]
+
+class TestParagraphs(unittest.TestCase):
+    def test_split_at_blank_lines_and_block_tags(self):
+        content = "<h1>Title</h1><p>First line.\nStill first.</p>\n\n<div>Second</div>Third<br>Fourth"
+        self.assertEqual(
+            split_paragraphs(content),
+            ['Title', 'First line.\nStill first.', 'Second', 'Third', 'Fourth']
+        )
+
+    def test_offsets_index_the_content(self):
+        content = "<p>  Hello world.</p>\n\n   Second paragraph."
+        spans = paragraph_spans(content)
+        self.assertEqual([paragraph for _, paragraph in spans], ['Hello world.', 'Second paragraph.'])
+        for offset, paragraph in spans:
+            self.assertEqual(content[offset:offset + len(paragraph)], paragraph)
+
+class TestLanguageToolPool(unittest.TestCase):
+    def setUp(self):
+        _FakeLanguageTool.instances = []
+        fake_module = types.SimpleNamespace(LanguageTool=_FakeLanguageTool)
+        patcher = mock.patch('hw_websites.server.utils.content_checker.lazy_import', return_value=fake_module)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_pool_starts_at_most_its_size_and_keeps_order(self):
+        pool = LanguageToolPool(size=2)
+        texts = [f"teh text {i}" for i in range(8)]
+        results = pool.check_many(texts)
+
+        self.assertEqual(len(_FakeLanguageTool.instances), 2)
+        self.assertEqual(results, [[str(_FakeMatch(0, 3))]] * 8)
+        self.assertEqual(sorted(_checked_texts()), sorted(texts))
+
+        pool.close()
+        self.assertTrue(all(tool.closed for tool in _FakeLanguageTool.instances))
+
+    def test_concurrent_checks_share_the_pool(self):
+        pool = LanguageToolPool(size=2)
+        threads = [threading.Thread(target=pool.check, args=(f"text {i}",)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertLessEqual(len(_FakeLanguageTool.instances), 2)
+        self.assertEqual(len(_checked_texts()), 6)
+
+    def test_start_warms_every_server(self):
+        pool = LanguageToolPool(size=3)
+        pool.start()
+        pool.check('text')
+        self.assertEqual(len(_FakeLanguageTool.instances), 3)
+
+    def test_workers_share_the_parent_servers(self):
+        parent = LanguageToolPool(size=2)
+        parent.start()
+        urls = parent.urls()
+        self.assertEqual(urls, ['http://127.0.0.1:8081', 'http://127.0.0.1:8082'])
+
+        with mock.patch.dict(os.environ, {LANGUAGETOOL_SERVERS_ENV: ','.join(urls)}):
+            worker = ContentQualityChecker(pool_size=3, cache_path=None)
+        worker.tools.start()
+        clients = _FakeLanguageTool.instances[2:]
+        self.assertEqual([tool.remote_server for tool in clients], urls + urls[:1])
+        self.assertEqual(worker.tools.urls(), urls)
+
+class TestCheckGrammar(unittest.TestCase):
+    def setUp(self):
+        _FakeLanguageTool.instances = []
+        fake_module = types.SimpleNamespace(LanguageTool=_FakeLanguageTool)
+        patcher = mock.patch('hw_websites.server.utils.content_checker.lazy_import', return_value=fake_module)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.cache_path = os.path.join(self.tmp_dir.name, 'cache.sqlite3')
+
+    def test_offsets_are_relative_to_the_page(self):
+        content = "<p>We pave teh road.</p>\n\n<p>Call teh office.</p>"
+        suggestions = ContentQualityChecker(cache_path=None).check_grammar(content)
+
+        offsets = [int(re.match(r'Offset (\d+),', suggestion).group(1)) for suggestion in suggestions]
+        self.assertEqual(offsets, [content.index('teh'), content.rindex('teh')])
+        self.assertTrue(all(content[offset:offset + 3] == 'teh' for offset in offsets))
+
+    def test_only_unseen_paragraphs_are_checked(self):
+        checker = ContentQualityChecker(cache_path=self.cache_path)
+        first = checker.check_grammar("<p>teh first</p><p>second</p>")
+        self.assertEqual(sorted(_checked_texts()), ['second', 'teh first'])
+
+        edited = checker.check_grammar("<p>second</p><p>teh first</p><p>third</p>")
+        self.assertEqual(sorted(_checked_texts()), ['second', 'teh first', 'third'])
+        self.assertEqual(checker.cache.stats()['hits'], 2)
+        self.assertEqual(len(first), 1)
+        self.assertEqual(edited, ["Offset 16, length 3, Rule ID: TEH\nMessage: Possible typo"])
+
+    def test_cache_key_includes_the_languagetool_version(self):
+        checker = ContentQualityChecker(cache_path=self.cache_path)
+        with mock.patch('hw_websites.server.utils.content_checker.languagetool_version', return_value='2.8/6.4'):
+            checker.check_grammar("<p>teh text</p>")
+        with mock.patch('hw_websites.server.utils.content_checker.languagetool_version', return_value='2.9/6.5'):
+            checker.check_grammar("<p>teh text</p>")
+            self.assertIn('2.9/6.5', checker.grammar_model)
+
+        self.assertEqual(len(_checked_texts()), 2)
+
+class TestReadability(unittest.TestCase):
+    def test_matches_the_corpus_quality_report(self):
+        from hw_websites.server.utils.quality_scorer import CorpusQualityScorer
+
+        content = "<section><h2>Our Service Areas</h2><p>We pave roads. We fix them fast!</p></section>"
+        checker = ContentQualityChecker(cache_path=None)
+        expected = CorpusQualityScorer().score({'page': content}).loc['page', 'flesch_reading_ease']
+        self.assertAlmostEqual(checker._calculate_readability(content), expected)
+
+    def test_empty_content_scores_without_dividing_by_zero(self):
+        checker = ContentQualityChecker(cache_path=None)
+        self.assertEqual(checker._calculate_readability(''), 206.835)
+        self.assertEqual(checker._calculate_readability('<p></p>'), 206.835)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import re
+import tempfile
+import unittest
+from unittest import mock
+from hw_websites.server.utils.content_linker import (
+    BLOG_POSTS,
+    BlogLinkingSession,
+    BlogPostProcessor,
+    ContentLinker,
+    keyword_context
+)
+
+class TestContentLinker(unittest.TestCase):
+    def setUp(self):
+        # The NLTK stopword corpus is not available offline
+        patcher = mock.patch(
+            'hw_websites.server.utils.content_linker._load_stop_words',
+            return_value=frozenset({'about', 'their', 'these', 'with', 'from'})
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.linker = ContentLinker(phrases=['road construction', 'asphalt paving'])
+
+    def test_tokens_are_alphanumeric_runs_without_stop_or_short_words(self):
+        text = "Road-construction crews (with 2024 permits) resurface_highways; café asphalt paving."
+        self.assertEqual(
+            [keyword for _, _, keyword in self.linker.find_terms(text)],
+            ['road', 'construction', 'crews', '2024', 'permits', 'resurface', 'highways', 'café',
+             'asphalt', 'paving', 'asphalt paving']
+        )
+
+    def test_offsets_index_the_original_text(self):
+        text = "Asphalt PAVING and road construction"
+        for start, end, keyword in self.linker.find_terms(text):
+            self.assertEqual(text[start:end].lower(), keyword)
+
+    def test_counts_and_first_offsets(self):
+        counts, offsets = self.linker.scan_keywords("Paving roads. More paving, better roads.")
+        self.assertEqual(counts, {'paving': 2, 'roads': 2, 'more': 1, 'better': 1})
+        self.assertEqual(offsets['paving'], (0, 6))
+        self.assertEqual(offsets['roads'], (7, 12))
+
+    def test_context_stays_on_the_keyword_line(self):
+        content = "intro line\nWe lay asphalt daily\nnext line"
+        start = content.index('asphalt')
+        self.assertEqual(keyword_context(content, start, start + 7), "We lay asphalt daily")
+        self.assertEqual(keyword_context("asphalt", 0, 7), "asphalt")
+
+    def test_get_keyword_context_matches_literally_and_case_insensitively(self):
+        content = "Our C++ tools and ROAD CONSTRUCTION crews"
+        self.assertEqual(self.linker.get_keyword_context(content, 'c++', 4), "Our C++ too")
+        self.assertEqual(self.linker.get_keyword_context(content, 'road construction', 5), " and ROAD CONSTRUCTION crew")
+        self.assertEqual(self.linker.get_keyword_context(content, 'bridges'), "")
+
+    def test_title_only_keywords_get_title_context(self):
+        self.linker.index_page({
+            'url': '/blog/paving',
+            'title': 'Seasonal Resurfacing Guide',
+            'content': '<p>Asphalt paving needs dry weather.</p>'
+        })
+        self.assertEqual(self.linker.index.context('resurfacing', '/blog/paving'), 'Seasonal Resurfacing Guide')
+        self.assertEqual(self.linker.index.context('paving', '/blog/paving'), 'p>Asphalt paving needs dry')
+
+    def test_heading_only_terms_are_not_linkable(self):
+        page_id = self.linker.index_page({
+            'url': '/blog/paving',
+            'title': 'Seasonal Resurfacing Guide',
+            'content': '<h1>Drainage Guide</h1><p>Asphalt paving needs dry weather.</p>'
+        })
+        linkable = self.linker.index.linkable_terms(page_id)
+        self.assertIn('asphalt paving', linkable)
+        self.assertNotIn('drainage', linkable)
+        self.assertNotIn('resurfacing', linkable)
+
+    def test_words_inside_phrases_are_not_linkable(self):
+        page_id = self.linker.index_page({
+            'url': '/blog/roads',
+            'title': 'Roads',
+            'content': '<p>Road construction crews. Asphalt paving on the road.</p>'
+        })
+        linkable = self.linker.index.linkable_terms(page_id)
+        self.assertIn('road construction', linkable)
+        self.assertNotIn('construction', linkable)
+        self.assertIn('road', linkable)
+        self.assertNotIn('paving', linkable)
+
+    def test_blog_corpus_links_never_split_a_phrase(self):
+        processor = BlogPostProcessor()
+        posts = processor.process_blog_posts(BLOG_POSTS)
+        linker = processor.content_linker
+
+        anchors = 0
+        for post in posts:
+            for match in re.finditer(r'(\w*)\s*<a [^>]*>([^<]+)</a>\s*(\w*)', post['content']):
+                before, anchor, after = match.groups()
+                snippet = f"{before} {anchor} {after}"
+                anchor_start = len(before) + 1
+                anchor_end = anchor_start + len(anchor)
+                for start, end, phrase in linker.phrase_matcher.find_all(snippet):
+                    overlaps = start < anchor_end and end > anchor_start
+                    self.assertFalse(overlaps and (start < anchor_start or end > anchor_end), (post['url'], anchor, phrase))
+                anchors += 1
+        self.assertGreater(anchors, 0)
+
+    def test_synced_session_links_from_the_read_only_index(self):
+        expected = BlogLinkingSession().process()
+        with tempfile.TemporaryDirectory() as tmp:
+            session = BlogLinkingSession(index_path=os.path.join(tmp, 'link-index'))
+            session.sync_index()
+            with mock.patch.object(ContentLinker, 'sync_index') as sync:
+                processed = session.process()
+            sync.assert_not_called()
+        self.assertEqual(
+            {title: post['content'] for title, post in processed.items()},
+            {title: post['content'] for title, post in expected.items()}
+        )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from hw_websites.server.utils.fragment_cache import FragmentCache
+
+class TestFragmentCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.rendered = []
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def render(self, city):
+        def render():
+            self.rendered.append(city)
+            return f"<section>{city}</section>"
+        return render
+
+    def test_renders_once_per_distinct_inputs(self):
+        cache = FragmentCache()
+        for city in ('Miami', 'Tampa', 'Miami'):
+            cache.get_or_render('service_areas', (city,), self.render(city))
+        self.assertEqual(self.rendered, ['Miami', 'Tampa'])
+        self.assertEqual(cache.stats()['hits'], 1)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = FragmentCache(max_entries=2)
+        for city in ('Miami', 'Tampa', 'Miami', 'Orlando', 'Tampa'):
+            cache.get_or_render('service_areas', (city,), self.render(city))
+        self.assertEqual(self.rendered, ['Miami', 'Tampa', 'Orlando', 'Tampa'])
+
+    def test_disk_tier_is_shared_and_invalidated(self):
+        FragmentCache(cache_dir=self.tmp_dir.name).get_or_render('reviews', ([5, 4],), self.render('a'))
+
+        cache = FragmentCache(cache_dir=self.tmp_dir.name)
+        self.assertEqual(cache.get_or_render('reviews', ([5, 4],), self.render('b')), '<section>a</section>')
+        self.assertEqual(cache.stats()['disk_hits'], 1)
+
+        cache.invalidate('reviews')
+        self.assertEqual(cache.get_or_render('reviews', ([5, 4],), self.render('c')), '<section>c</section>')
+        self.assertEqual(self.rendered, ['a', 'c'])
+
+    def test_invalidating_everything_keeps_other_caches(self):
+        other = os.path.join(self.tmp_dir.name, 'link-index', 'index.json')
+        os.makedirs(os.path.dirname(other))
+        with open(other, 'w', encoding='utf-8') as f:
+            f.write('{}')
+
+        cache = FragmentCache(cache_dir=self.tmp_dir.name)
+        cache.get_or_render('reviews', ([5, 4],), self.render('a'))
+        cache.invalidate()
+
+        self.assertTrue(os.path.exists(other))
+        self.assertEqual(FragmentCache(cache_dir=self.tmp_dir.name).get_or_render('reviews', ([5, 4],), self.render('b')), '<section>b</section>')
+
+    def test_version_change_misses(self):
+        cache = FragmentCache(cache_dir=self.tmp_dir.name)
+        cache.get_or_render('reviews', ([5, 4],), self.render('a'))
+        with mock.patch('hw_websites.server.utils.fragment_cache.FRAGMENT_VERSION', 2):
+            FragmentCache(cache_dir=self.tmp_dir.name).get_or_render('reviews', ([5, 4],), self.render('b'))
+        with mock.patch('hw_websites.server.utils.fragment_cache.renderer_version', return_value='changed'):
+            FragmentCache(cache_dir=self.tmp_dir.name).get_or_render('reviews', ([5, 4],), self.render('c'))
+        self.assertEqual(self.rendered, ['a', 'b', 'c'])
+
+if __name__ == '__main__':
+    unittest.main()
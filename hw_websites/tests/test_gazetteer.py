@@ -0,0 +1,42 @@
+import tempfile
+import unittest
+import numpy as np
+from hw_websites.server.utils.gazetteer import Gazetteer, load_gazetteer
+
+class TestGazetteer(unittest.TestCase):
+    def setUp(self):
+        self.gazetteer = load_gazetteer()
+
+    def test_packaged_places_cover_every_served_city(self):
+        for city in ('Miami', 'Fort Lauderdale', 'West Palm Beach', 'Orlando', 'Tampa', 'Jacksonville'):
+            self.assertIn(city, self.gazetteer)
+
+    def test_exact_and_prefix_lookup(self):
+        place = self.gazetteer.lookup('miami beach')
+        self.assertEqual(place['name'], 'Miami Beach')
+        self.assertEqual(place['county'], 'Miami-Dade')
+        self.assertIn('33139', place['zips'])
+        self.assertIsNone(self.gazetteer.lookup('Atlantis'))
+        self.assertEqual(self.gazetteer.prefix('miami'), ['Miami', 'Miami Beach', 'Miami Gardens'])
+        self.assertEqual(self.gazetteer.prefix('Fort', limit=2), ['Fort Lauderdale', 'Fort Myers'])
+        self.assertEqual(self.gazetteer.names[self.gazetteer.find_zip('33401')], 'West Palm Beach')
+
+    def test_shared_zip_codes_keep_every_place(self):
+        names = lambda rows: [self.gazetteer.names[row] for row in rows]
+        self.assertEqual(names(self.gazetteer.find_zip_all('33023')), ['Hollywood', 'Miramar'])
+        self.assertEqual(self.gazetteer.names[self.gazetteer.find_zip('33023')], 'Hollywood')
+        self.assertEqual(names(self.gazetteer.find_zip_all('33025')), ['Pembroke Pines', 'Miramar'])
+        self.assertEqual(names(self.gazetteer.find_zip_all('33019')), ['Hollywood'])
+        self.assertEqual(self.gazetteer.find_zip_all('00000'), [])
+        self.assertIsNone(self.gazetteer.find_zip('00000'))
+
+    def test_compiled_copy_is_memory_mapped(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.gazetteer.save(tmp)
+            compiled = Gazetteer.open(tmp)
+            self.assertIsInstance(compiled.lats, np.memmap)
+            self.assertEqual(compiled.lookup('Tampa'), self.gazetteer.lookup('Tampa'))
+            self.assertEqual(compiled.coordinates(), self.gazetteer.coordinates())
+
+if __name__ == '__main__':
+    unittest.main()
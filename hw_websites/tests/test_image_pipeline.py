@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+from PIL import Image
+from hw_websites.server.utils.image_optimizer import ImageOptimizer
+from hw_websites.server.utils.image_pipeline import ImagePipeline, variant_urls
+
+class TestImagePipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.images = []
+        for site, color in (('hwroads.com', 'red'), ('hwasphaltfl.com', 'blue')):
+            site_dir = os.path.join(self.tmp_dir.name, site)
+            os.makedirs(site_dir)
+            path = os.path.join(site_dir, 'project1.jpg')
+            Image.new('RGB', (1600, 1200), color).save(path, 'JPEG')
+            self.images.append(path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_collect_deduplicates_images_across_pages(self):
+        jobs = [
+            {'images': [self.images[0], self.images[1]]},
+            {'images': [self.images[0]]},
+            {}
+        ]
+        self.assertEqual(ImagePipeline.collect(jobs), self.images)
+
+    def test_run_writes_every_variant_keyed_by_source(self):
+        report = ImagePipeline(workers=2).run(self.images + [self.images[0]])
+
+        self.assertEqual(report.optimized, 2)
+        self.assertEqual(set(report.variants), set(self.images))
+        variants = report.variants[self.images[0]]
+        self.assertEqual(set(variants), {'thumbnail', 'medium', 'large'})
+        with Image.open(variants['large']) as img:
+            self.assertEqual(img.format, 'WEBP')
+            self.assertEqual(img.size, (800, 600))
+        leftovers = [name for name in os.listdir(os.path.dirname(variants['large'])) if name.endswith('.tmp')]
+        self.assertEqual(leftovers, [])
+
+    def test_variants_are_linked_by_site_relative_urls(self):
+        site_dir = os.path.join(self.tmp_dir.name, 'build', 'hwroads.com')
+        report = ImagePipeline(workers=1).run(
+            [self.images[0]],
+            output_dir_of=lambda image: os.path.join(site_dir, 'assets', 'images', 'optimized')
+        )
+        variants = report.variants[self.images[0]]
+        urls = variant_urls(variants)
+
+        self.assertEqual(set(urls), {'thumbnail', 'medium', 'large'})
+        for size_name, url in urls.items():
+            self.assertRegex(url, r'^/assets/images/optimized/project1_jpg_\w+\.webp$')
+            self.assertEqual(os.path.join(site_dir, url.lstrip('/')), variants[size_name])
+
+    def test_up_to_date_images_are_skipped(self):
+        pipeline = ImagePipeline(workers=1)
+        first = pipeline.run(self.images)
+        second = pipeline.run(self.images)
+
+        self.assertEqual(second.optimized, 0)
+        self.assertEqual(second.skipped, 2)
+        self.assertEqual(second.variants, first.variants)
+
+    def test_missing_and_broken_images_are_reported(self):
+        broken = os.path.join(self.tmp_dir.name, 'broken.jpg')
+        with open(broken, 'wb') as f:
+            f.write(b'not an image')
+        missing = os.path.join(self.tmp_dir.name, 'missing.jpg')
+
+        report = ImagePipeline(workers=1).run([self.images[0], broken, missing])
+        self.assertEqual(list(report.variants), [self.images[0]])
+        self.assertEqual(set(report.errors), {broken, missing})
+
+    def test_source_format_is_kept_without_a_target_format(self):
+        optimizer = ImageOptimizer(sizes={'medium': (800, 600)}, format=None)
+        variants = optimizer.optimize_image(self.images[0], self.tmp_dir.name)
+        self.assertRegex(os.path.basename(variants['medium']), r'^project1_jpg_medium_[0-9a-f]{8}\.jpg$')
+        with Image.open(variants['medium']) as img:
+            self.assertEqual(img.format, 'JPEG')
+
+    def test_sources_differing_in_extension_get_their_own_variants(self):
+        png = os.path.join(os.path.dirname(self.images[0]), 'project1.png')
+        Image.new('RGB', (1600, 1200), 'green').save(png, 'PNG')
+        optimizer = ImageOptimizer()
+        jpg_variants = optimizer.optimize_image(self.images[0], self.tmp_dir.name)
+        png_variants = optimizer.optimize_image(png, self.tmp_dir.name)
+
+        self.assertTrue(set(jpg_variants.values()).isdisjoint(png_variants.values()))
+        for variants, channel in ((jpg_variants, 0), (png_variants, 1)):
+            with Image.open(variants['large']) as img:
+                self.assertGreater(img.convert('RGB').getpixel((0, 0))[channel], 100)
+
+    def test_changed_settings_regenerate_and_replace_variants(self):
+        output_dir = os.path.join(self.tmp_dir.name, 'optimized')
+        first = ImageOptimizer(quality=85).optimize_image(self.images[0], output_dir)
+        optimizer = ImageOptimizer(quality=60)
+        self.assertFalse(optimizer.is_current(self.images[0], output_dir))
+
+        second = optimizer.optimize_image(self.images[0], output_dir)
+        self.assertNotEqual(first['large'], second['large'])
+        self.assertEqual(sorted(os.listdir(output_dir)), sorted(os.path.basename(path) for path in second.values()))
+
+if __name__ == '__main__':
+    unittest.main()
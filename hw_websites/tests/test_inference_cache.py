@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+from hw_websites.server.utils.inference_cache import InferenceCache
+
+class TestInferenceCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = InferenceCache(os.path.join(self.tmp_dir.name, 'cache.sqlite3'))
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp_dir.cleanup()
+
+    def test_only_missing_texts_are_computed(self):
+        computed = []
+
+        def summarize(texts):
+            computed.extend(texts)
+            return [text.upper() for text in texts]
+
+        first = self.cache.cached('model-v1', 'meta_description', ['a', 'b', 'a'], summarize)
+        second = self.cache.cached('model-v1', 'meta_description', ['a', 'b', 'c'], summarize)
+
+        self.assertEqual(first, {'a': 'A', 'b': 'B'})
+        self.assertEqual(second, {'a': 'A', 'b': 'B', 'c': 'C'})
+        self.assertEqual(computed, ['a', 'b', 'c'])
+        self.assertEqual(self.cache.stats()['hits'], 2)
+
+    def test_entries_are_keyed_by_model_and_params(self):
+        self.cache.set_many('model-v1', 'meta_description', {'text': 'v1'})
+        self.assertEqual(self.cache.get_many('model-v2', 'meta_description', ['text']), {})
+        self.assertEqual(
+            self.cache.get_many('model-v1', 'meta_description', ['text'], {'max_length': 60}),
+            {}
+        )
+        self.assertEqual(self.cache.get_many('model-v1', 'meta_description', ['text']), {'text': 'v1'})
+
+    def test_invalidate_by_model_version(self):
+        self.cache.set_many('model-v1', 'faq_answer', {'q': 'old'})
+        self.cache.set_many('model-v2', 'faq_answer', {'q': 'new'})
+
+        self.assertEqual(self.cache.invalidate('model-v1'), 1)
+        self.assertEqual(self.cache.stats()['models'], {'model-v2': 1})
+
+    def test_least_recently_used_entries_are_evicted(self):
+        self.cache.max_bytes = 20
+        self.cache.set_many('model', 'meta_description', {'first': 'x' * 8})
+        self.cache.set_many('model', 'meta_description', {'second': 'y' * 8})
+        self.cache.get_many('model', 'meta_description', ['first'])
+        self.cache.set_many('model', 'meta_description', {'third': 'z' * 8})
+
+        remaining = self.cache.get_many('model', 'meta_description', ['first', 'second', 'third'])
+        self.assertEqual(set(remaining), {'first', 'third'})
@@ -0,0 +1,100 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from hw_websites.server.utils.link_index import BLOCK_SIZE, KeywordIndex, _write_json
+
+class TestKeywordIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = KeywordIndex()
+        self.index.add_page('/a', 'A', {'asphalt': 1, 'paving': 1, 'miami': 4})
+        self.index.add_page('/b', 'B', {'asphalt': 6, 'paving': 1})
+        self.index.add_page('/c', 'C', {'paving': 2, 'drainage': 1}, {'drainage': 'storm drainage work'})
+        self.index.build()
+
+    def test_postings_are_sorted_by_weight(self):
+        page_ids, weights = self.index.lookup('asphalt')
+        self.assertEqual(list(page_ids), [1, 0])
+        self.assertGreater(weights[0], weights[1])
+
+    def test_best_target_skips_self(self):
+        self.assertEqual(self.index.best_target('asphalt')['url'], '/b')
+        self.assertEqual(self.index.best_target('asphalt', exclude_url='/b')['url'], '/a')
+        self.assertIsNone(self.index.best_target('miami', exclude_url='/a'))
+        self.assertIsNone(self.index.best_target('unknown'))
+
+    def test_rare_terms_outweigh_common_terms(self):
+        _, drainage = self.index.lookup('drainage')
+        _, paving = self.index.lookup('paving')
+        self.assertGreater(drainage.max(), paving.max())
+        self.assertEqual(self.index.context('drainage', '/c'), 'storm drainage work')
+
+    def test_update_and_remove_keep_page_ids(self):
+        self.index.update_page('/b', 'B', {'drainage': 3})
+        self.assertEqual(self.index.best_target('asphalt')['url'], '/a')
+        self.assertTrue(self.index.remove_page('/a'))
+        self.assertIsNone(self.index.best_target('asphalt'))
+        self.assertEqual(self.index.add_page('/d', 'D', {'asphalt': 1}), 3)
+        self.assertEqual(self.index.best_target('asphalt')['url'], '/d')
+        self.assertEqual(len(self.index), 3)
+
+    def test_saved_index_reopens_with_the_same_rankings(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'link-index')
+            self.index.save(path)
+
+            reader = KeywordIndex.open(path, read_only=True)
+            self.assertEqual(reader.best_target('asphalt', exclude_url='/b')['url'], '/a')
+            self.assertEqual(reader.context('drainage', '/c'), 'storm drainage work')
+            np.testing.assert_allclose(reader.lookup('paving')[1], self.index.lookup('paving')[1])
+            with self.assertRaises(ValueError):
+                reader.remove_page('/a')
+
+            writer = KeywordIndex.open(path)
+            writer.remove_page('/b')
+            writer.save()
+            self.assertEqual(KeywordIndex.open(path).best_target('asphalt')['url'], '/a')
+
+    def test_read_only_open_maps_counts_without_loading_pages(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'link-index')
+            self.index.save(path)
+
+            reader = KeywordIndex.open(path, read_only=True)
+            self.assertIsInstance(reader.term_counts, np.memmap)
+            self.assertIsInstance(reader.term_pages, np.memmap)
+            page_ids, weights = reader.lookup('asphalt')
+            self.assertEqual(list(page_ids), list(self.index.lookup('asphalt')[0]))
+            np.testing.assert_allclose(weights, self.index.lookup('asphalt')[1], rtol=1e-6)
+            self.assertEqual(reader.best_target('paving', exclude_url='/c')['url'], '/a')
+            self.assertEqual(reader.context('drainage', '/c'), 'storm drainage work')
+            self.assertIsNone(reader.doc_terms)
+            self.assertIsNone(reader.weights)
+
+    def test_save_only_rewrites_changed_blocks(self):
+        index = KeywordIndex()
+        for i in range(3 * BLOCK_SIZE):
+            index.add_page(f"/p{i}", f"P{i}", {'paving': 1 + i % 5, f"term{i}": 1})
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'link-index')
+            index.save(path)
+            blocks = sorted(os.listdir(os.path.join(path, 'pages')))
+            self.assertEqual(blocks, ['0.json', '1.json', '2.json'])
+
+            writer = KeywordIndex.open(path)
+            writer.update_page(f"/p{BLOCK_SIZE + 1}", 'Updated', {'drainage': 2})
+            with mock.patch('hw_websites.server.utils.link_index._write_json', wraps=_write_json) as write:
+                writer.save()
+            written = sorted(os.path.relpath(call.args[0], path) for call in write.call_args_list)
+            blocks = [name for name in written if name.startswith('pages' + os.sep)]
+            self.assertEqual(blocks, [os.path.join('pages', '1.json')])
+            self.assertEqual(os.path.basename(write.call_args_list[-1].args[0]), 'index.json')
+
+            reopened = KeywordIndex.open(path)
+            self.assertEqual(reopened.best_target('drainage')['title'], 'Updated')
+            self.assertEqual(len(reopened), 3 * BLOCK_SIZE)
+
+if __name__ == '__main__':
+    unittest.main()
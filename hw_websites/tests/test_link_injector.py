@@ -0,0 +1,55 @@
+import re
+import unittest
+from hw_websites.server.utils.link_injector import LinkInjector
+
+TARGETS = {
+    'paving': {'url': '/paving', 'title': 'Paving & Sealing'},
+    'drainage': {'url': '/drainage', 'title': 'Drainage'},
+    'asphalt': {'url': '/paving', 'title': 'Paving & Sealing'}
+}
+
+def find_terms(text):
+    for match in re.finditer(r'\w+', text):
+        yield match.start(), match.end(), match.group().lower()
+
+def inject(content, max_links=3):
+    return LinkInjector(find_terms, TARGETS.get, max_links).rewrite(content)
+
+class TestLinkInjector(unittest.TestCase):
+    def test_links_text_and_copies_markup_verbatim(self):
+        content = '<!DOCTYPE html><P Class="x">Paving &amp; drainage<br/></P><!-- paving -->'
+        self.assertEqual(
+            inject(content),
+            '<!DOCTYPE html><P Class="x"><a href="/paving" title="Paving &amp; Sealing">Paving</a>'
+            ' &amp; <a href="/drainage" title="Drainage">drainage</a><br/></P><!-- paving -->'
+        )
+
+    def test_skips_excluded_elements(self):
+        content = '<h1>paving</h1><a href="/x">paving</a><script>var paving = 1;</script><p>paving</p>'
+        self.assertEqual(
+            inject(content),
+            '<h1>paving</h1><a href="/x">paving</a><script>var paving = 1;</script>'
+            '<p><a href="/paving" title="Paving &amp; Sealing">paving</a></p>'
+        )
+
+    def test_links_each_target_once_up_to_the_cap(self):
+        output = inject('<p>asphalt paving, paving and drainage</p>', max_links=1)
+        self.assertEqual(output.count('<a '), 1)
+        self.assertIn('>asphalt</a> paving, paving', output)
+
+    def test_copies_unusual_markup_across_lines_verbatim(self):
+        content = (
+            '<div\n  class="a">\nintro</DIV >\n<script>if (a</b) {}</script>\n'
+            '<style>p{}</style><p>gravel &#169; paving\n</p  ><![CDATA[paving]]><?php echo 1 ?>'
+        )
+        self.assertEqual(
+            inject(content),
+            content.replace('paving\n', '<a href="/paving" title="Paving &amp; Sealing">paving</a>\n')
+        )
+
+    def test_unlinked_pages_are_unchanged(self):
+        content = '<html>\n<body class="x">\n<P>Nothing to link.</P>\n</body>\n</html>\n'
+        self.assertEqual(inject(content), content)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from hw_websites.server.utils.link_index import KeywordIndex
+from hw_websites.server.utils.link_planner import LinkPlanner
+
+class TestLinkPlanner(unittest.TestCase):
+    def setUp(self):
+        self.index = KeywordIndex()
+        self.index.add_page('/hub', 'Hub', {'asphalt': 5, 'paving': 5, 'drainage': 5, 'sealing': 1})
+        self.index.add_page('/asphalt', 'Asphalt', {'asphalt': 9, 'paving': 1})
+        self.index.add_page('/paving', 'Paving', {'paving': 9, 'asphalt': 1})
+        self.index.add_page('/drainage', 'Drainage', {'drainage': 9, 'sealing': 2})
+        self.index.build()
+
+    def test_respects_outbound_caps(self):
+        plan = LinkPlanner(max_outbound=1).plan(self.index)
+        self.assertTrue(all(len(targets) <= 1 for targets in plan.links.values()))
+        for source, targets in plan.links.items():
+            self.assertNotIn(source, [target['url'] for target in targets.values()])
+
+    def test_every_reachable_page_gets_an_inbound_link(self):
+        plan = LinkPlanner(max_outbound=2, min_inbound=1).plan(self.index)
+        inbound = plan.inbound()
+        self.assertTrue(all(count >= 1 for count in inbound.values()))
+        self.assertEqual(plan.links['/hub']['drainage']['url'], '/drainage')
+
+    def test_pagerank_is_a_distribution(self):
+        plan = LinkPlanner().plan(self.index)
+        self.assertAlmostEqual(sum(plan.pagerank.values()), 1.0)
+
+        graph = plan.to_networkx()
+        self.assertEqual(graph.number_of_nodes(), 4)
+        self.assertEqual(graph.number_of_edges(), sum(len(targets) for targets in plan.links.values()))
+
+    def test_terms_outside_linkable_text_are_not_planned(self):
+        index = KeywordIndex()
+        index.add_page('/hub', 'Hub', {'asphalt': 5, 'drainage': 5}, linkable=['drainage'])
+        index.add_page('/asphalt', 'Asphalt', {'asphalt': 9})
+        index.add_page('/drainage', 'Drainage', {'drainage': 9})
+        plan = LinkPlanner(max_outbound=2).plan(index)
+        self.assertEqual(list(plan.links['/hub']), ['drainage'])
+
+    def test_reconcile_keeps_only_injected_links(self):
+        planner = LinkPlanner(max_outbound=2)
+        plan = planner.plan(self.index)
+        kept = next(iter(plan.links['/hub'].items()))
+        reconciled = planner.reconcile(self.index, plan, {'/hub': dict([kept]), '/asphalt': {}})
+
+        self.assertEqual(reconciled.links, {'/hub': dict([kept])})
+        self.assertEqual(list(reconciled.scores), [('/hub', kept[1]['url'])])
+        self.assertAlmostEqual(sum(reconciled.pagerank.values()), 1.0)
+        self.assertGreater(reconciled.pagerank[kept[1]['url']], reconciled.pagerank['/hub'])
+
+if __name__ == '__main__':
+    unittest.main()
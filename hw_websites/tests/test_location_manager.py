@@ -0,0 +1,65 @@
+import json
+import os
+import re
+import tempfile
+import unittest
+from hw_websites.server.utils.location_manager import LocationManager
+
+class TestLocationManager(unittest.TestCase):
+    def setUp(self):
+        self.manager = LocationManager()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_service_areas_are_sorted_by_distance(self):
+        areas = self.manager.generate_service_areas('Miami')
+        self.assertEqual(areas[0]['name'], 'Miami Beach')
+        distances = [area['distance'] for area in areas]
+        self.assertEqual(distances, sorted(distances))
+        self.assertTrue(all(distance <= self.manager.service_radius for distance in distances))
+        self.assertEqual(self.manager.generate_service_areas('Atlantis'), [])
+
+    def test_map_payload_is_shared_and_content_addressed(self):
+        url = self.manager.generate_service_area_map('Tampa', self.tmp_dir.name)
+        self.assertEqual(url, self.manager.generate_service_area_map('Tampa', self.tmp_dir.name))
+        self.assertTrue(url.startswith('/assets/data/service-areas/tampa-'))
+
+        payload_path = os.path.join(self.tmp_dir.name, 'data', 'service-areas', os.path.basename(url))
+        with open(payload_path, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+        self.assertEqual(payload['center'], [27.9506, -82.4572])
+        self.assertIn('St. Petersburg', [marker['name'] for marker in payload['markers']])
+        self.assertTrue(os.path.exists(os.path.join(self.tmp_dir.name, 'js', 'service-area-map.js')))
+
+        content = self.manager.generate_service_area_content('Tampa', url)
+        self.assertIn(f'data-service-area="{url}"', content)
+        self.assertIn('data-service-area-load', content)
+
+    def test_superseded_payloads_are_pruned(self):
+        data_dir = os.path.join(self.tmp_dir.name, 'data', 'service-areas')
+        os.makedirs(data_dir)
+        for name in ('tampa-0123456789ab.json', 'tampa-bay-0123456789ab.json', 'orlando-0123456789ab.json'):
+            with open(os.path.join(data_dir, name), 'w', encoding='utf-8') as f:
+                f.write('{}')
+
+        url = self.manager.generate_service_area_map('Tampa', self.tmp_dir.name)
+        self.assertEqual(
+            sorted(os.listdir(data_dir)),
+            sorted([os.path.basename(url), 'tampa-bay-0123456789ab.json', 'orlando-0123456789ab.json'])
+        )
+
+    def test_static_svg_map(self):
+        svg = self.manager.render_service_area_svg('Orlando', width=400, height=400)
+        self.assertTrue(svg.startswith('<svg') and svg.endswith('</svg>'))
+        self.assertEqual(svg.count('fill="#16a34a"'), len(self.manager.generate_service_areas('Orlando')))
+        # Winter Park lies north-northeast of Orlando, so above and slightly right of center
+        x, y = map(float, re.search(r'<title>Winter Park:[^<]*</title><circle cx="([\d.]+)" cy="([\d.]+)"', svg).groups())
+        self.assertGreater(x, 200)
+        self.assertLess(y, 200)
+        self.assertEqual(self.manager.render_service_area_svg('Atlantis'), '')
+        self.assertIn('<svg', self.manager.generate_service_area_content('Orlando'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,18 @@
+import os
+import tempfile
 import unittest
+from unittest import mock
 from hw_websites.server.generate_pages import EnhancedPageGenerator
+from hw_websites.server.utils.fragment_cache import FragmentCache
+from hw_websites.server.utils.location_manager import LocationManager
 
 class TestPageGenerator(unittest.TestCase):
     def setUp(self):
+        # Components keep their stores under ./.cache; give each test a scratch working directory
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(tmp_dir.name)
         self.generator = EnhancedPageGenerator()
 
     def test_seo_content_generation(self):
@@ -16,3 +26,47 @@ class TestPageGenerator(unittest.TestCase):
         self.assertIn('thumbnail', optimized)
         self.assertIn('medium', optimized)
         self.assertIn('large', optimized)
+
+    def test_components_load_on_first_use(self):
+        generator = EnhancedPageGenerator()
+        self.assertNotIn('review_generator', generator.__dict__)
+        review_generator = generator.review_generator
+        self.assertIs(generator.__dict__['review_generator'], review_generator)
+        self.assertIn('ReviewGenerator', generator.startup_report())
+
+class TestEnhancedPage(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.site_dir = os.path.join(self.tmp_dir.name, 'output', 'hwroads.com')
+
+        self.generator = EnhancedPageGenerator()
+        # Stand-ins for the model-backed components; the location manager is real
+        self.generator.seo_generator = mock.Mock(
+            generate_location_specific_content=lambda content, location, terms: content
+        )
+        self.generator.content_checker = mock.Mock()
+        self.generator.schema_generator = mock.Mock()
+        self.generator.review_generator = mock.Mock(generate_review_section=mock.Mock(return_value=''))
+        self.generator.location_manager = LocationManager(fragments=FragmentCache())
+
+    def test_service_area_assets_are_published_under_the_site_root(self):
+        data = {
+            'site_dir': self.site_dir,
+            'output_dir': os.path.join(self.site_dir, 'miami'),
+            'location': 'Miami',
+            'content': '',
+            'industry_terms': [],
+            'service': {},
+            'company_name': 'HW Roads',
+            'service_type': 'road construction',
+            'meta_description': '',
+            'optimized_images': {}
+        }
+        template = mock.Mock(render=lambda **context: context['content'])
+        content = self.generator.generate_enhanced_page(template, data)['content']
+
+        self.assertTrue(os.path.exists(os.path.join(self.site_dir, 'assets', 'js', 'service-area-map.js')))
+        payloads = os.listdir(os.path.join(self.site_dir, 'assets', 'data', 'service-areas'))
+        self.assertEqual(len(payloads), 1)
+        self.assertIn(f'data-service-area="/assets/data/service-areas/{payloads[0]}"', content)
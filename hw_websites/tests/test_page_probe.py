@@ -0,0 +1,114 @@
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from hw_websites.server.utils.page_probe import AsyncPageProbe
+from hw_websites.server.utils.performance_monitor import PerformanceMonitor
+
+class _SiteHandler(BaseHTTPRequestHandler):
+    # Keep-alive stand-in for the real site
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if self.path == '/slow':
+            time.sleep(1)
+        if self.path.startswith(('/queued', '/hop')):
+            time.sleep(0.2)
+        if self.path == '/hop':
+            self.send_response(302)
+            self.send_header('Location', '/hop-2')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if self.path == '/old':
+            self.send_response(301)
+            self.send_header('Location', '/page')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if self.path == '/chunked':
+            self.send_response(200)
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for chunk in (b'hello ', b'world'):
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+            self.wfile.write(b'0\r\n\r\n')
+            return
+
+        body = b'<html>page</html>'
+        self.send_response(200 if self.path != '/missing' else 404)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Link', '</assets/css/site.css>; rel=preload, </assets/js/scripts.js>; rel=preload')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class TestAsyncPageProbe(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), _SiteHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_batch_records_status_bytes_and_timings(self):
+        urls = [f"{self.base_url}/page", f"{self.base_url}/missing", f"{self.base_url}/chunked"]
+        results = AsyncPageProbe(timeout=5).run(urls)
+
+        self.assertEqual(results[urls[0]].status, 200)
+        self.assertEqual(results[urls[0]].bytes, len(b'<html>page</html>'))
+        self.assertEqual(results[urls[1]].status, 404)
+        self.assertEqual(results[urls[2]].bytes, len(b'hello world'))
+        for result in results.values():
+            self.assertIsNone(result.error)
+            self.assertLessEqual(result.ttfb, result.total_time)
+
+    def test_connections_are_reused_per_host(self):
+        urls = [f"{self.base_url}/page?{i}" for i in range(20)]
+        probe = AsyncPageProbe(timeout=5, per_host_limit=2)
+        results = probe.run(urls)
+
+        self.assertTrue(all(result.status == 200 for result in results.values()))
+        self.assertLessEqual(probe.connections_opened, 2)
+
+    def test_slow_pages_time_out_without_blocking_others(self):
+        urls = [f"{self.base_url}/slow", f"{self.base_url}/page"]
+        results = AsyncPageProbe(timeout=0.3).run(urls)
+
+        self.assertIn('Timed out', results[urls[0]].error)
+        self.assertEqual(results[urls[1]].status, 200)
+
+    def test_performance_monitor_follows_redirects(self):
+        url = f"{self.base_url}/old"
+        metrics = PerformanceMonitor(timeout=5).measure_page_performance(url)
+
+        self.assertEqual(metrics.status, 200)
+        self.assertEqual(metrics.resource_count, 2)
+        self.assertEqual(metrics.errors, [])
+
+    def test_time_queued_behind_the_host_limit_is_not_measured(self):
+        urls = [f"{self.base_url}/queued?{i}" for i in range(4)]
+        results = AsyncPageProbe(timeout=0.6, per_host_limit=1).run(urls)
+
+        for result in results.values():
+            self.assertIsNone(result.error)
+            self.assertLess(result.total_time, 0.6)
+
+    def test_timeout_covers_every_redirect_hop(self):
+        url = f"{self.base_url}/hop"
+        self.assertEqual(AsyncPageProbe(timeout=5).run([url])[url].status, 200)
+        self.assertIn('Timed out', AsyncPageProbe(timeout=0.3).run([url])[url].error)
+
+    def test_performance_monitor_keeps_failed_pages(self):
+        monitor = PerformanceMonitor(timeout=0.3)
+        url = f"{self.base_url}/slow"
+        metrics = monitor.measure_page_performance(url)
+
+        self.assertIn('Timed out', metrics.errors[0])
+        self.assertIs(monitor.metrics[url], metrics)
@@ -0,0 +1,33 @@
+import os
+import tempfile
+import unittest
+from hw_websites.server.utils.phrase_matcher import PhraseMatcher
+
+class TestPhraseMatcher(unittest.TestCase):
+    def test_finds_overlapping_phrases_with_offsets(self):
+        matcher = PhraseMatcher(['road construction', 'construction project', 'road'])
+        text = 'Our Road Construction Project starts soon.'
+        matches = matcher.find_all(text)
+        self.assertEqual(matches, [
+            (4, 8, 'road'),
+            (4, 21, 'road construction'),
+            (9, 29, 'construction project')
+        ])
+        self.assertEqual(text[4:21], 'Road Construction')
+
+    def test_whole_words_only(self):
+        matcher = PhraseMatcher(['road'])
+        self.assertEqual(matcher.find_phrases('railroads and crossroads'), set())
+        self.assertEqual(PhraseMatcher(['road'], whole_words=False).find_phrases('railroads'), {'road'})
+
+    def test_from_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'phrases.txt')
+            with open(path, 'w') as f:
+                f.write('# paving terms\nAsphalt Paving\n\nseal coating  # driveways\n')
+            matcher = PhraseMatcher.from_file(path)
+        self.assertEqual(matcher.phrases, ['asphalt paving', 'seal coating'])
+        self.assertEqual(matcher.find_phrases('Seal coating after asphalt paving'), {'asphalt paving', 'seal coating'})
+
+if __name__ == '__main__':
+    unittest.main()
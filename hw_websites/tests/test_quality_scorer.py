@@ -0,0 +1,25 @@
+import unittest
+from hw_websites.server.utils.quality_scorer import CorpusQualityScorer, corpus_features
+
+class TestCorpusQualityScorer(unittest.TestCase):
+    def test_counts_are_kept_per_page(self):
+        features = corpus_features([
+            '<p>Asphalt paving lasts. Call today!</p>',
+            '',
+            'Road construction'
+        ])
+        self.assertEqual(list(features['words']), [5, 0, 2])
+        self.assertEqual(list(features['sentences']), [2, 0, 1])
+        self.assertEqual(list(features['syllables']), [8, 0, 4])
+
+    def test_score_table_has_one_row_per_page(self):
+        table = CorpusQualityScorer().score({
+            'miami': 'We pave roads. We fix roads.',
+            'tampa': 'Comprehensive infrastructure rehabilitation.'
+        })
+        self.assertEqual(list(table.index), ['miami', 'tampa'])
+        self.assertAlmostEqual(table.loc['miami', 'words_per_sentence'], 3.0)
+        self.assertGreater(
+            table.loc['miami', 'flesch_reading_ease'],
+            table.loc['tampa', 'flesch_reading_ease']
+        )
@@ -0,0 +1,135 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from hw_websites.server.utils.fragment_cache import FragmentCache
+from hw_websites.server.utils.review_generator import ReviewGenerator
+from hw_websites.server.utils.review_store import ReviewStore
+
+def review(author, rating, date, city='', service=''):
+    return {
+        'author': author,
+        'text': f"Review by {author}",
+        'rating': rating,
+        'date': date,
+        'platform': 'Google',
+        'city': city,
+        'service': service,
+        'verified': True
+    }
+
+class TestReviewStore(unittest.TestCase):
+    def setUp(self):
+        self.store = ReviewStore(':memory:', seed_path=None)
+        self.store.add_reviews([
+            review('Ana', 5, '2024-01-10', 'Miami', 'asphalt paving'),
+            review('Ben', 3, '2024-02-01', 'Miami', 'asphalt paving'),
+            review('Cy', 4, '2024-03-05', 'Tampa', 'road construction'),
+            review('Di', 5, '2023-12-24')
+        ])
+
+    def test_aggregates_are_updated_incrementally(self):
+        self.assertEqual(self.store.aggregate()['count'], 4)
+        self.assertAlmostEqual(self.store.aggregate()['mean'], 4.25)
+        # Company-wide reviews count towards every city, as top_reviews lists them there
+        miami = self.store.aggregate('Miami')
+        self.assertEqual(miami['count'], 3)
+        self.assertEqual(miami['distribution'], {1: 0, 2: 0, 3: 1, 4: 0, 5: 2})
+
+        version = self.store.version
+        self.assertFalse(self.store.add_review(review('Ana', 5, '2024-01-10', 'Miami', 'asphalt paving')))
+        self.assertEqual(self.store.version, version)
+        self.assertTrue(self.store.add_review(review('Ed', 1, '2024-04-01', 'Miami')))
+        self.assertNotEqual(self.store.version, version)
+        self.assertEqual(self.store.aggregate('Miami')['count'], 4)
+        self.assertEqual(self.store.aggregate('Miami', 'asphalt paving')['count'], 4)
+        self.assertEqual(self.store.aggregate('Tampa', 'asphalt paving')['count'], 1)
+
+    def test_aggregate_counts_what_top_reviews_lists(self):
+        for city, service in (('Miami', 'asphalt paving'), ('Tampa', None), (None, 'road construction'), (None, None)):
+            listed = self.store.top_reviews(city, service, min_rating=1, limit=-1)
+            summary = self.store.aggregate(city, service)
+            self.assertEqual(summary['count'], len(listed))
+            self.assertAlmostEqual(summary['mean'], sum(r['rating'] for r in listed) / len(listed))
+
+    def test_edited_reviews_replace_the_original(self):
+        edited = review('Ben', 4, '2024-02-01', 'Miami', 'asphalt paving')
+        edited['text'] = 'Fixed a typo'
+        self.assertTrue(self.store.add_review(edited))
+        self.assertEqual(self.store.aggregate()['count'], 4)
+        self.assertAlmostEqual(self.store.aggregate()['mean'], 4.5)
+        self.assertEqual(self.store.aggregate('Miami', 'asphalt paving')['distribution'], {1: 0, 2: 0, 3: 0, 4: 1, 5: 2})
+
+    def test_version_follows_each_change(self):
+        version = self.store.version
+        self.assertEqual(self.store.sync_reviews([review('Ed', 1, '2024-04-01')], 'import'), 1)
+        self.assertNotEqual(self.store.version, version)
+        self.assertEqual(self.store.sync_reviews([], 'import'), 1)
+        self.assertEqual(self.store.version, version)
+
+    def test_version_is_a_content_hash(self):
+        other = ReviewStore(':memory:', seed_path=None)
+        other.add_reviews(reversed(self.store.top_reviews(min_rating=1, limit=-1)))
+        self.assertEqual(other.version, self.store.version)
+
+    def test_top_reviews_for_city_and_service(self):
+        reviews = self.store.top_reviews('Miami', 'asphalt paving', min_rating=4)
+        self.assertEqual([r['author'] for r in reviews], ['Ana', 'Di'])
+        self.assertEqual([r['author'] for r in self.store.top_reviews(min_rating=4, limit=2)], ['Cy', 'Ana'])
+
+    def test_review_section_shows_real_numbers(self):
+        generator = ReviewGenerator(store=self.store, fragments=FragmentCache())
+        section = generator.generate_review_section('HW Roads', 'Miami', 'asphalt paving')
+        # The header summarises the same Miami / asphalt paving reviews the section lists from
+        self.assertIn('>4.3</span>', section)
+        self.assertIn('(3 reviews)', section)
+        self.assertIn('January 10, 2024', section)
+        self.assertIs(section, generator.generate_review_section('HW Roads', 'Miami', 'asphalt paving'))
+
+    def test_packaged_reviews_are_seeded(self):
+        store = ReviewStore(':memory:')
+        self.assertEqual(store.aggregate()['count'], 4)
+        self.assertAlmostEqual(store.aggregate()['mean'], 4.75)
+
+class TestReviewSeed(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.db_path = os.path.join(self.tmp_dir.name, 'reviews.sqlite3')
+        self.seed_path = os.path.join(self.tmp_dir.name, 'reviews.jsonl')
+
+    def write_seed(self, reviews, mtime):
+        with open(self.seed_path, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(r) + '\n' for r in reviews)
+        os.utime(self.seed_path, (mtime, mtime))
+
+    def open_store(self):
+        store = ReviewStore(self.db_path, seed_path=self.seed_path)
+        self.addCleanup(store.close)
+        return store
+
+    def test_seed_edits_and_removals_are_synced(self):
+        ana, ben = review('Ana', 5, '2024-01-10', 'Miami'), review('Ben', 3, '2024-02-01', 'Miami')
+        self.write_seed([ana, ben], 1_000_000)
+        self.assertEqual(self.open_store().aggregate('Miami')['count'], 2)
+
+        ana['text'] = 'Fixed a typo'
+        self.write_seed([ana], 2_000_000)
+        store = self.open_store()
+        self.assertEqual(store.aggregate('Miami'), {
+            'count': 1,
+            'mean': 5.0,
+            'distribution': {1: 0, 2: 0, 3: 0, 4: 0, 5: 1}
+        })
+        self.assertEqual([r['text'] for r in store.top_reviews(min_rating=1)], ['Fixed a typo'])
+
+    def test_unchanged_seed_is_not_reread(self):
+        self.write_seed([review('Ana', 5, '2024-01-10')], 1_000_000)
+        version = self.open_store().version
+        with mock.patch.object(ReviewStore, '_sync_seed') as sync_seed:
+            self.assertEqual(self.open_store().version, version)
+        sync_seed.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+from hw_websites.server.utils.seo_content_generator import FAQ_ANSWER_MODEL, SEOContentGenerator
+
+class TestLocationSpecificContent(unittest.TestCase):
+    def setUp(self):
+        self.generator = SEOContentGenerator(cache_path=None)
+        self.terms = ['road construction', 'asphalt paving', 'road construction projects']
+
+    def test_terms_are_prefixed_once(self):
+        content = "We handle road construction projects and asphalt paving."
+        rewritten = self.generator.generate_location_specific_content(content, 'Miami', self.terms)
+        self.assertEqual(
+            rewritten,
+            "We handle Miami road construction projects and Miami asphalt paving."
+        )
+
+    def test_rewriting_is_idempotent(self):
+        content = "Miami road construction and road construction"
+        once = self.generator.generate_location_specific_content(content, 'Miami', self.terms)
+        twice = self.generator.generate_location_specific_content(once, 'Miami', self.terms)
+        self.assertEqual(once, "Miami road construction and Miami road construction")
+        self.assertEqual(twice, once)
+
+class TestFAQSection(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.generator = SEOContentGenerator(cache_path=os.path.join(self.tmp_dir.name, 'cache.sqlite3'))
+        self.content = (
+            "<h1>HW Roads</h1><p>We pave roads across South Florida. "
+            "A typical project takes two to four weeks. "
+            "Every estimate is free and comes within two days.</p>"
+        )
+
+    def tearDown(self):
+        self.generator.cache.close()
+        self.tmp_dir.cleanup()
+
+    def test_answers_come_from_matching_sentences(self):
+        faqs = {faq['question']: faq['answer'] for faq in self.generator.generate_faq_section(self.content)}
+        self.assertEqual(faqs["How long does a typical project take?"], "A typical project takes two to four weeks.")
+        self.assertEqual(faqs["Do you offer free estimates?"], "Every estimate is free and comes within two days.")
+        self.assertEqual(len(faqs), 5)
+
+    def test_answers_are_cached_under_their_own_model(self):
+        first = self.generator.generate_faq_section(self.content)
+        second = self.generator.generate_faq_section(self.content)
+
+        self.assertEqual(first, second)
+        stats = self.generator.cache.stats()
+        self.assertEqual(stats['models'], {FAQ_ANSWER_MODEL: 5})
+        self.assertEqual(stats['hits'], 5)
@@ -0,0 +1,18 @@
+import unittest
+from hw_websites.server.generate_pages import (
+    SiteLayout,
+    _render_page_source,
+    get_site_layout
+)
+
+class TestSiteLayout(unittest.TestCase):
+    def test_render_matches_full_page_source(self):
+        for site_name in ['hwroads.com', 'hwasphaltfl.com', 'example.com']:
+            layout = SiteLayout(site_name)
+            rendered = layout.render('Fort Lauderdale', '<h1>Blog</h1>')
+            expected = _render_page_source(site_name, 'Fort Lauderdale', '<h1>Blog</h1>')
+            self.assertEqual(rendered, expected)
+
+    def test_layout_is_compiled_once_per_site(self):
+        self.assertIs(get_site_layout('hwroads.com'), get_site_layout('hwroads.com'))
+        self.assertIsNot(get_site_layout('hwroads.com'), get_site_layout('hwasphaltfl.com'))
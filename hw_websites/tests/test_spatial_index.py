@@ -0,0 +1,41 @@
+import unittest
+import numpy as np
+from hw_websites.server.utils.spatial_index import GeoIndex, haversine_miles
+
+class TestGeoIndex(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.lats = rng.uniform(24.5, 31.0, 300)
+        self.lons = rng.uniform(-87.6, -80.0, 300)
+        self.names = [f"place-{i}" for i in range(300)]
+        self.index = GeoIndex(self.names, self.lats, self.lons)
+
+    def brute_force(self, position, radius):
+        distances = haversine_miles(self.lats[position], self.lons[position], self.lats, self.lons)
+        return sorted(
+            (distance, self.names[i])
+            for i, distance in enumerate(distances)
+            if i != position and distance <= radius
+        )
+
+    def test_neighbors_match_brute_force(self):
+        for position in (0, 17, 299):
+            expected = self.brute_force(position, 50)
+            found = self.index.neighbors(self.names[position], 50)
+            self.assertEqual([name for name, _ in found], [name for _, name in expected])
+            np.testing.assert_allclose([d for _, d in found], [d for d, _ in expected])
+
+    def test_distance_table_is_cached_per_radius(self):
+        self.assertIs(self.index.distance_table(50), self.index.distance_table(50))
+        self.assertGreater(self.index.distance_table(100).nnz, self.index.distance_table(50).nnz)
+
+    def test_query_radius_from_a_point(self):
+        found = self.index.query_radius(self.lats[5], self.lons[5], 30)
+        self.assertEqual(found[0], (5, 0.0))
+        self.assertEqual(len(found) - 1, len(self.brute_force(5, 30)))
+
+    def test_haversine_miami_to_fort_lauderdale(self):
+        self.assertAlmostEqual(float(haversine_miles(25.7617, -80.1918, 26.1224, -80.1373)), 25.2, places=1)
+
+if __name__ == '__main__':
+    unittest.main()
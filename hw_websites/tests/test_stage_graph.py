@@ -0,0 +1,46 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from hw_websites.server.utils.stage_graph import StageGraph
+
+class TestStageGraph(unittest.TestCase):
+    def setUp(self):
+        self.pool = ThreadPoolExecutor(max_workers=4)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_dependencies_receive_results(self):
+        graph = StageGraph(self.pool)
+        graph.add('content', lambda: 'text')
+        graph.add('reviews', lambda: ' and reviews')
+        graph.add('page', lambda content, reviews: content + reviews, deps=['content', 'reviews'])
+
+        self.assertEqual(graph.run()['page'], 'text and reviews')
+
+    def test_independent_stages_run_concurrently(self):
+        # Both stages must be running at the same time to pass the barrier
+        barrier = threading.Barrier(2, timeout=5)
+        graph = StageGraph(self.pool)
+        graph.add('images', barrier.wait)
+        graph.add('schema', barrier.wait)
+
+        self.assertEqual(set(graph.run()), {'images', 'schema'})
+
+    def test_invalid_graphs_are_rejected(self):
+        graph = StageGraph(self.pool)
+        graph.add('a', lambda b: b, deps=['b'])
+        graph.add('b', lambda a: a, deps=['a'])
+        with self.assertRaises(ValueError):
+            graph.run()
+
+        graph = StageGraph(self.pool)
+        graph.add('a', lambda missing: missing, deps=['missing'])
+        with self.assertRaises(ValueError):
+            graph.run()
+
+    def test_stage_errors_propagate(self):
+        graph = StageGraph(self.pool)
+        graph.add('broken', lambda: 1 / 0)
+        with self.assertRaises(ZeroDivisionError):
+            graph.run()
@@ -1,35 +1,55 @@
+import os
 import subprocess
 from pathlib import Path
 import shutil
 
+# Build state main.py writes next to the sites; never published
+BUILD_STATE_FILES = ('.build-manifest.json', 'quality-report.csv')
+
 class Deployer:
     def __init__(self):
         self.root_dir = Path(__file__).parent.parent
         self.build_dir = self.root_dir / 'build'
 
-    def build(self):
+    def build(self, incremental=False):
         """Build the project"""
-        # Clean build directory
-        if self.build_dir.exists():
-            shutil.rmtree(self.build_dir)
-        self.build_dir.mkdir()
+        # main.py writes the sites and the incremental manifest under the build directory
+        env = dict(os.environ, OUTPUT_ROOT=str(self.build_dir))
+        if incremental:
+            # Keep the previous build and only re-render changed pages
+            self.build_dir.mkdir(exist_ok=True)
+            env['INCREMENTAL_BUILD'] = '1'
+        else:
+            # Clean build directory
+            if self.build_dir.exists():
+                shutil.rmtree(self.build_dir)
+            self.build_dir.mkdir()
 
         # Generate sites
-        subprocess.run(['python', 'main.py'])
+        subprocess.run(['python', 'main.py'], env=env)
 
         # Optimize assets
         subprocess.run(['python', 'scripts/optimize_assets.py'])
 
-    def deploy(self, environment='staging'):
+    def deploy(self, environment='staging', incremental=False):
         """Deploy the project"""
-        self.build()
+        self.build(incremental)
 
         if environment == 'staging':
             # Deploy to staging server
-            subprocess.run(['rsync', '-avz', 'build/', 'user@staging-server:/var/www/'])
+            self.sync('user@staging-server:/var/www/', incremental)
         elif environment == 'production':
             # Deploy to production server
-            subprocess.run(['rsync', '-avz', 'build/', 'user@production-server:/var/www/'])
+            self.sync('user@production-server:/var/www/', incremental)
+
+    def sync(self, destination, incremental=False):
+        """Copy the built sites to a server, leaving out the build state"""
+        command = ['rsync', '-avz']
+        command += [f'--exclude=/{name}' for name in BUILD_STATE_FILES]
+        if incremental:
+            # The build directory mirrors the sites, so pages the build removed go too
+            command.append('--delete')
+        subprocess.run(command + [f'{self.build_dir}/', destination])
 
 if __name__ == "__main__":
     deployer = Deployer()
@@ -9,17 +9,16 @@ def install_requirements():
         'flask-mail',
         'wtforms',
         'pillow',
-        'folium',
-        'geocoder',
-        'geopy',
-        'beautifulsoup4',
         'spacy',
         'yake',
         'transformers',
         'language-tool-python',
         'textblob',
         'requests',
-        'python-dotenv'
+        'python-dotenv',
+        'numpy',
+        'pandas',
+        'scipy'
     ]
 
     print("Installing required packages...")